@@ -1,7 +1,36 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
+import asyncio
+import base64
+import binascii
+import json
+import uuid
+import zipfile
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form, Query, Request
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.config.services import Services, get_services
 from app.schemas import LostItemInput
-from typing import List
+from app.config.settings import settings
+from app.infra.database import db
+from app.infra.openai_client import openai_client
+from app.infra.tracing import DB_POOL_CONNECTIONS
+from app.infra.uploads import UploadTooLarge, spool_upload
+from app.infra.response_cache import response_cache
+from app.data_services.match_scope import MatchScope, scope_payload
+from app.pipelines.bulk_found import (
+    BulkImage,
+    ingest_found_images,
+    iter_zip_images,
+    summarize,
+)
+from app.pipelines.bulk_lost import import_lost_reports, iter_csv_rows, iter_lines, iter_ndjson_rows
+from app.pipelines.progress import import_progress
+from app.pipelines.found_item import run_found_item_pipeline
+from app.pipelines.hydrate import SEARCH_PAYLOAD_FIELDS, hydrate_found_matches
+from app.pipelines.stage_graph import StageFailed
+from app.pipelines.job_worker import enqueue_found_item_job, job_workers
+from app.pipelines.outbox_relay import outbox_relay
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
 
 router = APIRouter()
 
@@ -9,64 +38,156 @@ router = APIRouter()
 async def submit_found_item(
     image: UploadFile = File(...),
     location_hint: str = Form("unknown"),
+    async_mode: bool = Form(False),
     services: Services = Depends(get_services),
 ):
     try:
-        image_bytes = await image.read()
-        defaut_bucket = "found_item_images"
-
-        # Upload image
-        image_filename = image.filename or "uploaded_image.jpg"
-        path = await services.storage_service.upload_image(image_bytes, image_filename)
-
-        # Insert metadata to Postgres
-        item_data = {
-            "image_bucket": defaut_bucket,
-            "image_path": path,
-            "caption_text": "",  # fill in after model caption if needed
-            "location_hint": location_hint
-        }
-        found_item_id = await services.db_service.insert_found_item(item_data)
-
-        # Generate image embedding
-        result = await services.image_service.process_found_image(image_bytes)
-        embedding: List[float] = result["embedding"]
-
-        # Insert into Qdrant
-        await services.vector_service.insert_item_vector(found_item_id, embedding, {
-            "type": "found",
-            "image_bucket": defaut_bucket,
-            "image_path": path,
-            "location_hint": location_hint
-        })
-
-        # Search for similar lost items
-        matches = await services.vector_service.search_similar(
-            vector=embedding,
-            top_k=5,
-            filter_payload={"type": "lost"}
-        )
+        spooled = await spool_upload(image, settings.UPLOAD_MAX_BYTES, settings.UPLOAD_SPOOL_THRESHOLD)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        if async_mode:
+            # Store the image, queue the rest and answer right away; poll GET /jobs/{job_id}.
+            job_id = await enqueue_found_item_job(services, spooled, location_hint)
+            job_workers.notify()
+            return JSONResponse(
+                status_code=202,
+                content={"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"},
+            )
 
-        # Store matches in Postgres
-        match_records = [
-            {
-                "found_item_id": found_item_id,
-                "lost_report_id": m["id"],   # matches Qdrant payload id
-                "score": m["score"]
-            }
-            for m in matches
-        ]
-        # await services.db_service.insert_matches(match_records)
+        # Upload, caption/embed, insert, upsert and match search run as a stage graph,
+        # so independent stages overlap.
+        # Matches are stored by the graph's store_matches stage.
+        result = await run_found_item_pipeline(services, spooled, location_hint)
 
         return {
-            "found_item_id": found_item_id,
-            "image_bucket": defaut_bucket,
-            "image_path": path,
-            "top_matches": matches
+            "found_item_id": result["found_item_id"],
+            "image_bucket": result["image_bucket"],
+            "image_path": result["image_path"],
+            "top_matches": result["top_matches"]
         }
 
+    except StageFailed as e:
+        raise HTTPException(status_code=500, detail=str(e.error))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        spooled.close()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, services: Services = Depends(get_services)):
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        job = await services.job_queue.get_job(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    result = job.get("result") or {}
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "next_attempt_at": job["next_attempt_at"] if job["status"] == "queued" else None,
+        "stage_timings": job.get("stage_timings") or {},
+        "found_item_id": result.get("found_item_id"),
+        "image_path": result.get("image_path") or job["payload"].get("image_path"),
+        "top_matches": result.get("top_matches", []),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@router.post("/bulk/found_items")
+async def bulk_submit_found_items(
+    images: Optional[List[UploadFile]] = File(None),
+    archive: Optional[UploadFile] = File(None),
+    location_hint: str = Form("unknown"),
+    top_k: int = Form(5),
+    services: Services = Depends(get_services),
+):
+    """
+    Ingest many found-item photos at once, either as repeated `images` parts or as a zip `archive`.
+    Re-submitting the same batch is safe: already-ingested photos are reported as skipped.
+    """
+    if not images and archive is None:
+        raise HTTPException(status_code=400, detail="Provide `images` files or a zip `archive`.")
+
+    # Reject a batch with a known oversized part before ingesting any of it.
+    for upload in images or []:
+        if upload.size is not None and upload.size > settings.UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=str(UploadTooLarge(settings.UPLOAD_MAX_BYTES)))
+
+    async def request_images():
+        # Parts are spooled as the ingestion consumes them, with the same size limit as single
+        # uploads; zip members are decompressed in a thread. Neither blocks the event loop.
+        for upload in images or []:
+            spooled = await spool_upload(upload, settings.UPLOAD_MAX_BYTES, settings.UPLOAD_SPOOL_THRESHOLD)
+            yield BulkImage(filename=spooled.filename, data=spooled)
+        if archive is not None:
+            members = iter_zip_images(archive.file)
+            while (member := await asyncio.to_thread(next, members, None)) is not None:
+                yield member
+
+    try:
+        results = await ingest_found_images(services, request_images(), location_hint, top_k)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="`archive` is not a valid zip file.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "summary": summarize(results),
+        "items": [result.as_dict() for result in results],
+    }
+
+
+@router.post("/bulk/lost_reports")
+async def bulk_import_lost_reports(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    import_id: Optional[str] = Query(None),
+    match_top_k: int = Query(5, ge=0),
+    services: Services = Depends(get_services),
+):
+    """
+    Stream-import lost reports from an NDJSON or CSV request body (one report per line/row,
+    with `description` and optional `location_hint`, `lost_at`, `reporter_user_id`).
+    The body is parsed incrementally; poll GET /bulk/lost_reports/{import_id} for progress.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    import_id = import_id or str(uuid.uuid4())
+    if import_progress.get(import_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Import {import_id} already exists.")
+
+    lines = iter_lines(request.stream())
+    rows = iter_csv_rows(lines) if format == "csv" else iter_ndjson_rows(lines)
+    progress = import_progress.start(import_id)
+    try:
+        await import_lost_reports(services, rows, progress, match_top_k=match_top_k)
+    except Exception:
+        raise HTTPException(status_code=500, detail=progress.as_dict())
+    return progress.as_dict()
+
+
+@router.get("/bulk/lost_reports/{import_id}")
+async def bulk_import_status(import_id: str):
+    progress = import_progress.get(import_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return progress.as_dict()
 
 
 @router.post("/submit_lost_item")
@@ -75,44 +196,247 @@ async def submit_lost_item(
     services: Services = Depends(get_services),
 ):
     try:
-        # Insert lost report into Postgres
-        item_data = {
-            "description_text": item.description,
-            "location_hint": item.location_hint
-        }
-        lost_report_id = await services.db_service.insert_lost_report(item_data)
-
         # Generate embedding from text
         embedding = await services.text_service.embed_text(item.description)
 
-        # Insert into Qdrant
-        await services.vector_service.insert_item_vector(lost_report_id, embedding, {
-            "type": "lost",
-            "location_hint": item.location_hint
-        })
-
-        # Query for similar found items
-        matches = await services.vector_service.search_similar(
+        # Query for similar found items, nearby and recent first
+        matches = await services.vector_service.search_scoped(
             vector=embedding,
+            scope=MatchScope.around(item.location_hint, item.lost_at),
             top_k=5,
-            filter_payload={"type": "found"}
+            filter_payload={"type": "found"},
+            payload_fields=SEARCH_PAYLOAD_FIELDS,
+            query_text=item.description,
         )
 
-        # Store match records
-        match_records = [
-            {
-                "lost_report_id": lost_report_id,
-                "found_item_id": match["id"],
-                "score": match["score"]
-            }
-            for match in matches
-        ]
-        await services.db_service.insert_matches(match_records)
+        # Report row, outbox entry for its vector and match records commit together on one connection
+        async with services.db_service.unit_of_work() as uow:
+            lost_report_id = await uow.insert_lost_report({
+                "description_text": item.description,
+                "location_hint": item.location_hint,
+                "lost_at": item.lost_at,
+            })
+            await uow.enqueue_vector_upserts([{
+                "id": lost_report_id,
+                "vector": embedding,
+                "payload": {"type": "lost", **scope_payload(item.location_hint, item.lost_at)},
+                "text": item.description,
+            }])
+            await uow.insert_matches([
+                {
+                    "lost_report_id": lost_report_id,
+                    "found_item_id": match["id"],
+                    "score": match["score"]
+                }
+                for match in matches
+            ])
+        # One query for all matched found items, instead of a lookup per match from the client.
+        # Meanwhile wait (bounded) for the relay to make this report searchable: read-your-writes.
+        hydrated, _ = await asyncio.gather(
+            hydrate_found_matches(services, [matches]),
+            outbox_relay.wait_applied([lost_report_id]),
+        )
+        hydrated = hydrated[0]
 
         return {
             "lost_report_id": lost_report_id,
-            "matches": matches
+            "matches": hydrated
         }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---------- read API ----------
+
+def _encode_cursor(value: Any, row_id: Any) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str], parse: Callable[[Any], Any]) -> Optional[tuple]:
+    """(sort value, id) from an opaque page cursor; 400 if it was tampered with."""
+    if not cursor:
+        return None
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return parse(value), str(uuid.UUID(row_id))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(rows: List[dict], limit: int, sort_key: str) -> tuple:
+    """Split a limit+1 fetch into (page rows, cursor for the next page or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(rows[-1][sort_key], rows[-1]["id"])
+
+
+async def _cached_json(
+    request: Request, key: str, tags: Callable[[Any], Iterable[str]], load: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Serve `load()` through the response cache with an ETag; answers 304 when the client's
+    If-None-Match still matches. `tags(value)` names the rows the response was built from.
+    """
+    try:
+        entry = await response_cache.get_or_load(key, load, tags)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+@router.get("/found_items")
+async def list_found_items(
+    request: Request,
+    limit: int = Query(20, ge=1, le=settings.READ_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, pattern="^(active|claimed|archived)$"),
+    services: Services = Depends(get_services),
+):
+    before = _decode_cursor(cursor, datetime.fromisoformat)
+
+    async def load():
+        rows = await services.db_service.list_found_items(limit + 1, before, status)
+        items, next_cursor = _page(rows, limit, "created_at")
+        return {"items": items, "next_cursor": next_cursor}
+
+    return await _cached_json(
+        request,
+        f"found_items:{status}:{limit}:{cursor}",
+        lambda page: ["found_items", *(f"found_item:{item['id']}" for item in page["items"])],
+        load,
+    )
+
+
+@router.get("/found_items/{item_id}")
+async def get_found_item(request: Request, item_id: uuid.UUID, services: Services = Depends(get_services)):
+    return await _cached_json(
+        request,
+        f"found_item:{item_id}",
+        lambda item: [f"found_item:{item_id}"],
+        lambda: services.db_service.get_found_item_by_id(str(item_id)),
+    )
+
+
+@router.get("/lost_reports")
+async def list_lost_reports(
+    request: Request,
+    limit: int = Query(20, ge=1, le=settings.READ_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, pattern="^(open|resolved|archived)$"),
+    services: Services = Depends(get_services),
+):
+    before = _decode_cursor(cursor, datetime.fromisoformat)
+
+    async def load():
+        rows = await services.db_service.list_lost_reports(limit + 1, before, status)
+        reports, next_cursor = _page(rows, limit, "created_at")
+        return {"items": reports, "next_cursor": next_cursor}
+
+    return await _cached_json(
+        request,
+        f"lost_reports:{status}:{limit}:{cursor}",
+        lambda page: ["lost_reports", *(f"lost_report:{report['id']}" for report in page["items"])],
+        load,
+    )
+
+
+@router.get("/lost_reports/{report_id}")
+async def get_lost_report(request: Request, report_id: uuid.UUID, services: Services = Depends(get_services)):
+    return await _cached_json(
+        request,
+        f"lost_report:{report_id}",
+        lambda report: [f"lost_report:{report_id}"],
+        lambda: services.db_service.get_lost_report_by_id(str(report_id)),
+    )
+
+
+@router.get("/lost_reports/{report_id}/matches")
+async def list_report_matches(
+    request: Request,
+    report_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=settings.READ_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    services: Services = Depends(get_services),
+):
+    before = _decode_cursor(cursor, float)
+
+    async def load():
+        rows = await services.db_service.list_matches_for_lost_report(str(report_id), limit + 1, before)
+        matches, next_cursor = _page(rows, limit, "score")
+        found_items = await services.db_service.get_found_items_by_ids([str(m["found_item_id"]) for m in matches])
+        by_id = {str(item["id"]): item for item in found_items}
+        return {
+            "lost_report_id": str(report_id),
+            "matches": [
+                {
+                    "id": m["id"],
+                    "score": m["score"],
+                    "method": m["method"],
+                    "created_at": m["created_at"],
+                    "found_item": by_id.get(str(m["found_item_id"])),
+                }
+                for m in matches
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    return await _cached_json(
+        request,
+        f"matches:{report_id}:{limit}:{cursor}",
+        lambda page: [f"matches:{report_id}", *(f"found_item:{m['found_item']['id']}" for m in page["matches"] if m["found_item"])],
+        load,
+    )
+
+
+@router.get("/stats/cache")
+async def cache_stats(services: Services = Depends(get_services)):
+    cache = getattr(services.image_service, "cache", None)
+    preprocessor = getattr(services.image_service, "preprocessor", None)
+    return {
+        "image_cache": cache.stats() if cache else None,
+        "image_preprocess": preprocessor.stats() if preprocessor else None,
+        "embedding_cache": openai_client.embedding_cache_stats(),
+        "openai_limiter": openai_client.limiter_stats(),
+        "response_cache": response_cache.stats(),
+        "vector_outbox_relay": {
+            **outbox_relay.stats(),
+            "backlog": await services.vector_outbox.backlog(),
+            "parked": await services.vector_outbox.parked(),
+        },
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage and request latency histograms plus pool/limiter gauges."""
+    for state, count in (db.pool_stats() or {}).items():
+        DB_POOL_CONNECTIONS.labels(state).set(count)
+    openai_client.update_gauges()
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and its event loop is answering."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(services: Services = Depends(get_services)):
+    """
+    Readiness: 200 once startup and the warm-up have finished, 503 before that and again once
+    shutdown begins, so traffic only reaches a warm process.
+    """
+    if not services.ready:
+        return JSONResponse(status_code=503, content={"status": "not_ready", "startup": services.startup_timings})
+    return {"status": "ready", "startup": services.startup_timings}
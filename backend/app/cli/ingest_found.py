@@ -0,0 +1,70 @@
+"""
+Bulk-ingest found-item photos from a directory or zip archive.
+
+Usage (from backend/):
+    python -m app.cli.ingest_found PATH [--location-hint HINT] [--report results.jsonl]
+
+Re-running the same command resumes: photos that were already ingested are skipped.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from app.config.services import services
+from app.pipelines.bulk_found import ingest_found_images, iter_directory_images, iter_zip_images, summarize
+from app.pipelines.outbox_relay import outbox_relay
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-ingest found-item photos.")
+    parser.add_argument("path", help="Directory of images or a .zip archive")
+    parser.add_argument("--location-hint", default="unknown")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=None, help="Images per batch (default: BULK_CHUNK_SIZE)")
+    parser.add_argument("--report", default=None, help="Append per-item results as JSON lines to this file")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    await services.start()
+    await outbox_relay.start()
+    try:
+        if os.path.isdir(args.path):
+            results = await ingest_found_images(
+                services, iter_directory_images(args.path), args.location_hint, args.top_k, args.chunk_size
+            )
+        else:
+            with open(args.path, "rb") as archive:
+                results = await ingest_found_images(
+                    services, iter_zip_images(archive), args.location_hint, args.top_k, args.chunk_size
+                )
+    finally:
+        # Applies the remaining outbox entries before exiting.
+        await outbox_relay.stop()
+        await services.stop()
+
+    if args.report:
+        with open(args.report, "a") as report:
+            for result in results:
+                report.write(json.dumps(result.as_dict(), default=str) + "\n")
+
+    for result in results:
+        if result.status == "error":
+            logger.error(f"{result.filename}: {result.stage} failed: {result.error}")
+    summary = summarize(results)
+    logger.info(f"Bulk ingestion finished: {summary}")
+    return 1 if summary["error"] else 0
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Re-score all open lost reports against all active found items and store new or changed matches.
+
+Usage (from backend/):
+    python -m app.cli.rematch [--top-k K] [--min-score S] [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.config.services import services
+from app.pipelines.rematch import rematch_all
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Global all-pairs re-matching.")
+    parser.add_argument("--top-k", type=int, default=None, help="Matches kept per lost report (default: REMATCH_TOP_K)")
+    parser.add_argument("--min-score", type=float, default=None, help="Drop pairs below this cosine score (default: REMATCH_MIN_SCORE)")
+    parser.add_argument("--lost-chunk", type=int, default=None, help="Lost reports scored per step (default: REMATCH_LOST_CHUNK)")
+    parser.add_argument("--found-chunk", type=int, default=None, help="Found items per matrix block (default: REMATCH_FOUND_CHUNK)")
+    parser.add_argument("--dry-run", action="store_true", help="Score and report, but write nothing")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    await services.start()
+    try:
+        stats = await rematch_all(
+            services,
+            top_k=args.top_k,
+            min_score=args.min_score,
+            lost_chunk=args.lost_chunk,
+            found_chunk=args.found_chunk,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await services.stop()
+    logger.info(f"Re-matching finished: {json.dumps(stats.as_dict())}")
+    return 0
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,35 @@
+import asyncio
 import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
 from app.ml_services.base import ImageProcessingService, TextEmbeddingService
 from app.ml_services.openai_service import OpenAIImageService, OpenAITextService
+from app.ml_services.result_cache import ImageResultCache
+from app.ml_services.image_preprocess import ImagePreprocessor
 
 from app.data_services.base.postgres_db_interface import ItemRepository
 from app.data_services.base.storage_interface import ImageStorageService
 from app.data_services.base.vector_interface import VectorSearchService
+from app.data_services.base.job_queue_interface import JobQueue
+from app.data_services.base.outbox_interface import VectorOutbox
 
 from app.data_services.postgres_db import PostgresRepository
+from app.data_services.memory_db import InMemoryJobQueue, InMemoryRepository, InMemoryVectorOutbox, MemoryStore
+from app.data_services.postgres_image_cache import PostgresImageResultStore
+from app.data_services.postgres_job_queue import PostgresJobQueue
+from app.data_services.postgres_outbox import PostgresVectorOutbox
 from app.data_services.supabase_storage import SupabaseStorageService
+from app.data_services.local_storage import LocalStorageService
 from app.data_services.qdrant_service import QdrantVectorService
+from app.data_services.numpy_vector_service import NumpyVectorService
 
 from app.infra.database import db
 from app.infra.supabase_client import supabase_client
 from app.infra.qdrant_client import qdrant_client
 from app.infra.openai_client import openai_client
+from app.infra.response_cache import response_cache
+from app.infra.tracing import STARTUP_SECONDS, Traced
+from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,54 +40,186 @@ class Services:
         self._db_service = None
         self._storage_service = None
         self._vector_service = None
+        self._job_queue = None
+        self._vector_outbox = None
+        self._memory_store = None
+        self._traced: Dict[str, Any] = {}
+        # Seconds per startup phase (each init, "start", "warmup:<target>", "ready"), for /readyz and metrics.
+        self.startup_timings: Dict[str, float] = {}
+        self.ready = False
+        self._started_at: Optional[float] = None
+
+    def _trace(self, component: str, service: Any, backend: str) -> Any:
+        """The service behind a tracing proxy (one per component), unless tracing is off."""
+        if not settings.TRACING_ENABLED:
+            return service
+        traced = self._traced.get(component)
+        if traced is None:
+            traced = self._traced[component] = Traced(service, component, backend)
+        return traced
+
+    def _memory(self) -> MemoryStore:
+        """Tables for DB_BACKEND=memory, shared by the repository, outbox and job queue."""
+        if self._memory_store is None:
+            self._memory_store = MemoryStore()
+        return self._memory_store
+
+    def _record_startup(self, phase: str, seconds: float) -> None:
+        self.startup_timings[phase] = round(seconds, 4)
+        STARTUP_SECONDS.labels(phase).set(seconds)
+
+    async def _timed(self, phase: str, step: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+        try:
+            await step()
+        finally:
+            self._record_startup(phase, time.perf_counter() - started)
 
     async def start(self):
+        self._started_at = time.perf_counter()
+        self.ready = False
+        inits = {"openai": openai_client.init}
+        if settings.DB_BACKEND == "postgres":
+            inits["db"] = db.init
+        if settings.STORAGE_BACKEND == "supabase":
+            inits["storage"] = supabase_client.init
+        if settings.VECTOR_BACKEND == "qdrant":
+            inits["qdrant"] = qdrant_client.init
+        # The clients don't depend on each other, so startup waits for the slowest, not the sum.
+        results = await asyncio.gather(
+            *(self._timed(f"init:{name}", init) for name, init in inits.items()), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.error(f"Failed to initialize services: {errors[0]}")
+            raise errors[0]
+
         try:
-            await db.init()
-            supabase_client.init()
-            await qdrant_client.init()
-            await openai_client.init()
+            # Built now rather than by the first request that needs each one.
+            for component in (
+                "image_service", "text_service", "db_service", "storage_service",
+                "vector_service", "job_queue", "vector_outbox",
+            ):
+                getattr(self, component)
         except Exception as e:
-            logger.error(f"Failed to initialize services: {e}")
+            logger.error(f"Failed to construct services: {e}")
             raise
+        self._record_startup("start", time.perf_counter() - self._started_at)
+        logger.info(f"Services started in {self.startup_timings['start']:.3f}s: {self.startup_timings}")
+
+    async def warm(self) -> None:
+        """
+        Open keep-alive connections to OpenAI, Qdrant and storage, and start the image worker
+        processes, then mark the process ready. Best effort: a target that fails or times out is
+        logged and left cold, since a cold connection is slower, not broken.
+        """
+        targets: Dict[str, Callable[[], Awaitable[None]]] = {}
+        if settings.STARTUP_WARMUP_ENABLED:
+            connections = settings.STARTUP_WARM_CONNECTIONS
+            targets["openai"] = lambda: openai_client.warm(connections)
+            if settings.STORAGE_BACKEND == "supabase":
+                targets["storage"] = lambda: supabase_client.warm(connections)
+            if settings.VECTOR_BACKEND == "qdrant":
+                targets["qdrant"] = lambda: qdrant_client.warm(connections)
+            preprocessor = getattr(self._image_service, "preprocessor", None)
+            if preprocessor is not None:
+                targets["image_workers"] = preprocessor.warm
+
+        async def warm_target(name: str, step: Callable[[], Awaitable[None]]) -> None:
+            try:
+                await asyncio.wait_for(
+                    self._timed(f"warmup:{name}", step), timeout=settings.STARTUP_WARMUP_TIMEOUT_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} failed, continuing cold: {e!r}")
+
+        await asyncio.gather(*(warm_target(name, step) for name, step in targets.items()))
+        self.ready = True
+        if self._started_at is not None:
+            self._record_startup("ready", time.perf_counter() - self._started_at)
+        logger.info(f"Ready {self.startup_timings.get('ready', 0.0):.3f}s after startup began.")
     
     async def stop(self):
+        self.ready = False
+        preprocessor = getattr(self._image_service, "preprocessor", None)
+        if preprocessor is not None:
+            preprocessor.close()
         await db.close()
-        supabase_client.close()
+        await supabase_client.close()
+        if self._vector_service is not None:
+            # Saves the NumPy index.
+            await self._vector_service.close()
         await qdrant_client.close()
         await openai_client.close()
 
     @property
     def image_service(self) -> ImageProcessingService:
         if self._image_service is None:
-            self._image_service = OpenAIImageService()
-        return self._image_service
+            persistent = settings.IMAGE_CACHE_PERSISTENT and settings.DB_BACKEND == "postgres"
+            store = PostgresImageResultStore(db) if persistent else None
+            cache = ImageResultCache(settings.IMAGE_CACHE_SIZE, store=store)
+            preprocessor = ImagePreprocessor() if settings.IMAGE_PREPROCESS_ENABLED else None
+            self._image_service = OpenAIImageService(cache=cache, preprocessor=preprocessor)
+        return self._trace("image", self._image_service, "openai")
     
     @property
     def text_service(self) -> TextEmbeddingService:
         if self._text_service is None:
             self._text_service = OpenAITextService()
-        return self._text_service
+        return self._trace("text", self._text_service, "openai")
     
     @property
     def db_service(self) -> ItemRepository:
         if self._db_service is None:
-            if not db:
-                raise RuntimeError("Database not initialized. Call await services.start() first.")
-            self._db_service = PostgresRepository(db)
-        return self._db_service
+            if settings.DB_BACKEND == "postgres":
+                if not db:
+                    raise RuntimeError("Database not initialized. Call await services.start() first.")
+                self._db_service = PostgresRepository(db, response_cache=response_cache)
+            elif settings.DB_BACKEND == "memory":
+                self._db_service = InMemoryRepository(self._memory(), response_cache=response_cache)
+            else:
+                raise RuntimeError(f"Unknown DB_BACKEND '{settings.DB_BACKEND}'. Use 'postgres' or 'memory'.")
+        return self._trace("db", self._db_service, settings.DB_BACKEND)
     
     @property
     def storage_service(self) -> ImageStorageService:
         if self._storage_service is None:
-            self._storage_service = SupabaseStorageService()
-        return self._storage_service
+            if settings.STORAGE_BACKEND == "supabase":
+                self._storage_service = SupabaseStorageService()
+            elif settings.STORAGE_BACKEND == "local":
+                self._storage_service = LocalStorageService()
+            else:
+                raise RuntimeError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'. Use 'supabase' or 'local'.")
+        return self._trace("storage", self._storage_service, settings.STORAGE_BACKEND)
     
     @property
     def vector_service(self) -> VectorSearchService:
         if self._vector_service is None:
-            self._vector_service = QdrantVectorService()
-        return self._vector_service
+            if settings.VECTOR_BACKEND == "numpy":
+                self._vector_service = NumpyVectorService(settings.NUMPY_INDEX_PATH)
+            elif settings.VECTOR_BACKEND == "qdrant":
+                self._vector_service = QdrantVectorService()
+            else:
+                raise RuntimeError(f"Unknown VECTOR_BACKEND '{settings.VECTOR_BACKEND}'. Use 'qdrant' or 'numpy'.")
+        return self._trace("vector", self._vector_service, settings.VECTOR_BACKEND)
+
+    @property
+    def job_queue(self) -> JobQueue:
+        if self._job_queue is None:
+            if settings.DB_BACKEND == "memory":
+                self._job_queue = InMemoryJobQueue(self._memory())
+            else:
+                self._job_queue = PostgresJobQueue(db)
+        return self._trace("jobs", self._job_queue, settings.DB_BACKEND)
+
+    @property
+    def vector_outbox(self) -> VectorOutbox:
+        if self._vector_outbox is None:
+            if settings.DB_BACKEND == "memory":
+                self._vector_outbox = InMemoryVectorOutbox(self._memory())
+            else:
+                self._vector_outbox = PostgresVectorOutbox(db)
+        return self._trace("outbox", self._vector_outbox, settings.DB_BACKEND)
 
 
 # Singleton instance
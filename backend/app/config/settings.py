@@ -8,11 +8,71 @@ class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o")
     OPENAI_EMBED_MODEL: str = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-ada-002")
+    EMBED_BATCHING_ENABLED: bool = os.getenv("EMBED_BATCHING_ENABLED", "false").lower() in {"1","true","yes"}
+    EMBED_BATCH_MAX_SIZE: int = int(os.getenv("EMBED_BATCH_MAX_SIZE", "64"))
+    EMBED_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # e.g. a local fake server for load tests
+    # Per-call deadline covering queueing, retries and backoff
+    OPENAI_DEADLINE_SECONDS: float = float(os.getenv("OPENAI_DEADLINE_SECONDS", "60"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+    OPENAI_RETRY_BASE_SECONDS: float = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "0.5"))
+    OPENAI_RETRY_MAX_SECONDS: float = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "20"))
+    # Per-model rate limiting: request/token budgets (learned from x-ratelimit-* headers; these
+    # only seed them, 0 = unknown until the first response) and an AIMD concurrency limit
+    OPENAI_LIMITER_ENABLED: bool = os.getenv("OPENAI_LIMITER_ENABLED", "true").lower() in {"1", "true", "yes"}
+    OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "0"))
+    OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "0"))
+    OPENAI_CONCURRENCY_INITIAL: int = int(os.getenv("OPENAI_CONCURRENCY_INITIAL", "8"))
+    OPENAI_CONCURRENCY_MIN: int = int(os.getenv("OPENAI_CONCURRENCY_MIN", "1"))
+    OPENAI_CONCURRENCY_MAX: int = int(os.getenv("OPENAI_CONCURRENCY_MAX", "64"))
+    # Remaining budget (fraction of the limit) below which responses count as congestion
+    OPENAI_HEADROOM_FRACTION: float = float(os.getenv("OPENAI_HEADROOM_FRACTION", "0.05"))
+
+    # Vector search backend: "qdrant" or "numpy" (in-process index)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    NUMPY_INDEX_PATH: str = os.getenv("NUMPY_INDEX_PATH", "")
+    # Logged upserts after which the NumPy index is saved and its write-ahead log truncated.
+    NUMPY_SAVE_EVERY_UPSERTS: int = int(os.getenv("NUMPY_SAVE_EVERY_UPSERTS", "10000"))
+
+    # Matching: "dense" (embedding cosine only) or "hybrid" (dense + lexical, RRF-fused and reranked)
+    MATCH_MODE: str = os.getenv("MATCH_MODE", "dense").lower()
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "50"))
+    HYBRID_DENSE_WEIGHT: float = float(os.getenv("HYBRID_DENSE_WEIGHT", "0.7"))
+
+    # Match scope: search same-location, recent items first and widen only when too few come back
+    MATCH_SCOPE_ENABLED: bool = os.getenv("MATCH_SCOPE_ENABLED", "true").lower() in {"1", "true", "yes"}
+    MATCH_TIME_WINDOW_DAYS: float = float(os.getenv("MATCH_TIME_WINDOW_DAYS", "14"))
+    MATCH_WIDEN_FACTOR: float = float(os.getenv("MATCH_WIDEN_FACTOR", "4"))
+    MATCH_WIDEN_STEPS: int = int(os.getenv("MATCH_WIDEN_STEPS", "2"))
+    MATCH_MIN_CANDIDATES: int = int(os.getenv("MATCH_MIN_CANDIDATES", "0"))  # 0 = top_k
+    MATCH_SCOPE_FALLBACK_GLOBAL: bool = os.getenv("MATCH_SCOPE_FALLBACK_GLOBAL", "true").lower() in {"1", "true", "yes"}
+
+    # Global re-matching (all open lost reports x all active found items)
+    REMATCH_TOP_K: int = int(os.getenv("REMATCH_TOP_K", "5"))
+    REMATCH_MIN_SCORE: float = float(os.getenv("REMATCH_MIN_SCORE", "0.0"))
+    REMATCH_LOST_CHUNK: int = int(os.getenv("REMATCH_LOST_CHUNK", "2048"))
+    REMATCH_FOUND_CHUNK: int = int(os.getenv("REMATCH_FOUND_CHUNK", "8192"))
+    REMATCH_FETCH_BATCH: int = int(os.getenv("REMATCH_FETCH_BATCH", "1000"))
 
     # Qdrant
     QDRANT_URL: str = os.getenv("QDRANT_URL", "")
     QDRANT_API_KEY: str = os.getenv("QDRANT_API_KEY", "")
     QDRANT_COLLECTION: str = os.getenv("QDRANT_COLLECTION", "items")
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in {"1","true","yes"}
+    QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_UPSERT_BATCH_SIZE: int = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+    # Collection bootstrap: created/verified at startup from these settings
+    QDRANT_MANAGE_COLLECTION: bool = os.getenv("QDRANT_MANAGE_COLLECTION", "true").lower() in {"1","true","yes"}
+    QDRANT_VECTOR_SIZE: int = int(os.getenv("QDRANT_VECTOR_SIZE", "0"))  # 0 = derive from OPENAI_EMBED_MODEL
+    QDRANT_DISTANCE: str = os.getenv("QDRANT_DISTANCE", "Cosine")
+    QDRANT_HNSW_M: int = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT: int = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+    QDRANT_ON_DISK_VECTORS: bool = os.getenv("QDRANT_ON_DISK_VECTORS", "true").lower() in {"1","true","yes"}
+    QDRANT_QUANTIZATION: str = os.getenv("QDRANT_QUANTIZATION", "int8").lower()  # "int8" or "none"
+    QDRANT_QUANTIZATION_RESCORE: bool = os.getenv("QDRANT_QUANTIZATION_RESCORE", "true").lower() in {"1","true","yes"}
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+    QDRANT_KEYWORD_INDEXES: list = [f.strip() for f in os.getenv("QDRANT_KEYWORD_INDEXES", "type,location_key").split(",") if f.strip()]
+    QDRANT_FLOAT_INDEXES: list = [f.strip() for f in os.getenv("QDRANT_FLOAT_INDEXES", "event_at").split(",") if f.strip()]
 
     # Supabase
     SUPABASE_PROJECT_URL: str = os.getenv("SUPABASE_PROJECT_URL", "")
@@ -21,9 +81,84 @@ class Settings:
     SUPABASE_DB_DIRECT_URL: str = os.getenv("SUPABASE_DB_DIRECT_URL", "")
     SUPABASE_DB_POOLER_URL: str = os.getenv("SUPABASE_DB_POOLER_URL", "")
 
+    # Image storage: "supabase" (Storage REST API over a pooled HTTP client) or "local" (filesystem)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "supabase").lower()
+    STORAGE_LOCAL_PATH: str = os.getenv("STORAGE_LOCAL_PATH", "local_storage")
+    STORAGE_HTTP2: bool = os.getenv("STORAGE_HTTP2", "true").lower() in {"1", "true", "yes"}
+    STORAGE_MAX_CONNECTIONS: int = int(os.getenv("STORAGE_MAX_CONNECTIONS", "32"))
+    # HTTP/2 multiplexes uploads over a few connections, and httpcore scans every pooled
+    # connection per request, so keep only a handful idle.
+    STORAGE_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("STORAGE_MAX_KEEPALIVE_CONNECTIONS", "8"))
+    STORAGE_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("STORAGE_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    STORAGE_TIMEOUT_SECONDS: float = float(os.getenv("STORAGE_TIMEOUT_SECONDS", "60"))
+    STORAGE_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("STORAGE_CONNECT_TIMEOUT_SECONDS", "5"))
+
     # Database
+    # "postgres", or "memory" for an in-process store (load tests, local runs without a database)
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "postgres").lower()
     DB_FORCE_POOLER: bool = os.getenv("DB_FORCE_POOLER", "false").lower() in {"1","true","yes"}
     DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    # Connections opened when the pool is created, so the first burst doesn't pay for connection setup.
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "4"))
+
+    # Uploads
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    UPLOAD_SPOOL_THRESHOLD: int = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+
+    # Image preprocessing (before vision captioning)
+    IMAGE_PREPROCESS_ENABLED: bool = os.getenv("IMAGE_PREPROCESS_ENABLED", "true").lower() in {"1","true","yes"}
+    IMAGE_MAX_EDGE: int = int(os.getenv("IMAGE_MAX_EDGE", "1536"))
+    IMAGE_OUTPUT_FORMAT: str = os.getenv("IMAGE_OUTPUT_FORMAT", "jpeg").lower()
+    IMAGE_QUALITY: int = int(os.getenv("IMAGE_QUALITY", "85"))
+    IMAGE_PREPROCESS_WORKERS: int = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))
+
+    # Caching
+    IMAGE_CACHE_SIZE: int = int(os.getenv("IMAGE_CACHE_SIZE", "1024"))
+    IMAGE_CACHE_PERSISTENT: bool = os.getenv("IMAGE_CACHE_PERSISTENT", "false").lower() in {"1","true","yes"}
+    EMBED_CACHE_SIZE: int = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+    EMBED_CACHE_TTL_SECONDS: float = float(os.getenv("EMBED_CACHE_TTL_SECONDS", "86400"))
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+    READ_PAGE_SIZE_MAX: int = int(os.getenv("READ_PAGE_SIZE_MAX", "100"))
+
+    # Bulk ingestion
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "100"))
+    BULK_UPLOAD_CONCURRENCY: int = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "16"))
+    BULK_CAPTION_CONCURRENCY: int = int(os.getenv("BULK_CAPTION_CONCURRENCY", "8"))
+    LOST_IMPORT_BATCH_SIZE: int = int(os.getenv("LOST_IMPORT_BATCH_SIZE", "500"))
+
+    # Vector outbox: item rows and their pending vector upserts commit together and a relay applies
+    # them to the vector index. Only disable the relay where another process runs it.
+    OUTBOX_RELAY_ENABLED: bool = os.getenv("OUTBOX_RELAY_ENABLED", "true").lower() in {"1", "true", "yes"}
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "256"))
+    OUTBOX_POLL_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1.0"))
+    OUTBOX_RETRY_BASE_SECONDS: float = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "1"))
+    OUTBOX_RETRY_MAX_SECONDS: float = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "60"))
+    # How long a drain holds its claimed entries before another relay may take them over.
+    OUTBOX_LEASE_SECONDS: float = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+    # How long a submission waits for the relay to make its own vector searchable before it returns
+    # (read-your-writes); on timeout it returns anyway and the vector follows. 0 disables the wait.
+    OUTBOX_READ_YOUR_WRITES_TIMEOUT_SECONDS: float = float(os.getenv("OUTBOX_READ_YOUR_WRITES_TIMEOUT_SECONDS", "2"))
+    # Failed applies an entry may take before it is parked; failures during an index outage don't count.
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+
+    # Tracing: per-stage Prometheus histograms (/metrics) and Server-Timing response headers
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() in {"1", "true", "yes"}
+
+    # Async job workers
+    JOB_WORKERS_ENABLED: bool = os.getenv("JOB_WORKERS_ENABLED", "true").lower() in {"1","true","yes"}
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2.0"))
+    JOB_RETRY_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_MAX_SECONDS", "300"))
+
+    # Startup warm-up: /readyz fails until keep-alive connections to OpenAI, Qdrant and storage
+    # are open and the image worker processes are running (or the timeout passes).
+    STARTUP_WARMUP_ENABLED: bool = os.getenv("STARTUP_WARMUP_ENABLED", "true").lower() in {"1","true","yes"}
+    STARTUP_WARM_CONNECTIONS: int = int(os.getenv("STARTUP_WARM_CONNECTIONS", "4"))  # per upstream
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("STARTUP_WARMUP_TIMEOUT_SECONDS", "15"))
 
 # Singleton instance
 settings = Settings()
\ No newline at end of file
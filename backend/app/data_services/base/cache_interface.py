@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+class ImageResultStore(ABC):
+    @abstractmethod
+    async def get_result(self, cache_key: str) -> Optional[Dict]:
+        """
+        Fetch a cached image processing result (caption + embedding) by its content-addressed key.
+        """
+        pass
+
+    @abstractmethod
+    async def put_result(self, cache_key: str, result: Dict) -> None:
+        """
+        Persist an image processing result under its content-addressed key.
+        """
+        pass
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class JobQueue(ABC):
+    @abstractmethod
+    async def enqueue_job(self, kind: str, payload: Dict, max_attempts: int) -> str:
+        """
+        Record a queued job and return its ID (UUID).
+        """
+        pass
+
+    @abstractmethod
+    async def claim_jobs(self, kind: str, limit: int, lease_seconds: float) -> List[Dict]:
+        """
+        Atomically claim up to `limit` runnable jobs, marking them running.
+        Jobs whose lease expired (worker died mid-run) are runnable again.
+        """
+        pass
+
+    @abstractmethod
+    async def complete_job(self, job_id: str, result: Dict, stage_timings: Dict) -> None:
+        """
+        Mark a job succeeded and store its result and per-stage timings.
+        """
+        pass
+
+    @abstractmethod
+    async def fail_job(self, job_id: str, error: str, stage_timings: Dict, retry_at: Optional[datetime]) -> None:
+        """
+        Record a failed attempt. The job is requeued for `retry_at`, or marked failed if None.
+        """
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Fetch a job by ID.
+        """
+        pass
@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Statuses that say the vector index is unavailable or overloaded, not that the entry is bad.
+UNAVAILABLE_STATUSES = {408, 429, 502, 503, 504}
+
+
+class VectorOutbox(ABC):
+    @abstractmethod
+    async def drain(
+        self,
+        apply: Callable[[List[Dict]], Awaitable[None]],
+        limit: int,
+        retry_seconds: float,
+        max_attempts: int,
+        lease_seconds: float,
+    ) -> int:
+        """
+        Claim up to `limit` due outbox entries for `lease_seconds`, pass them to `apply` (dicts with id,
+        vector, payload, text; one per item, latest write wins) and delete them once it returns. No
+        transaction or connection is held while `apply` runs; entries of a relay that dies mid-batch
+        become due again when the lease runs out.
+
+        If the batch fails, its items are retried one at a time, so only the entries that fail on their
+        own are rescheduled `retry_seconds` later and charged an attempt; those reaching `max_attempts`
+        are parked instead. An error that says the index is unavailable (see `is_unavailable`) stops the
+        drain: the entries not yet applied are rescheduled without being charged and the error is
+        re-raised. Returns the number of entries handled.
+        """
+        pass
+
+    @abstractmethod
+    async def backlog(self) -> int:
+        """
+        Number of entries waiting in the outbox (parked entries excluded).
+        """
+        pass
+
+    @abstractmethod
+    async def parked(self) -> int:
+        """
+        Number of entries parked after `max_attempts` failures.
+        """
+        pass
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """
+    Whether `error` (or an error it wraps) means the index could not be reached or is overloaded:
+    connection failures, timeouts and 5xx/429 responses. Anything else is blamed on the entry.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError)):
+            return True
+        status = getattr(error, "status_code", None)
+        if isinstance(status, int) and (status >= 500 or status in UNAVAILABLE_STATUSES):
+            return True
+        # qdrant-client wraps transport errors in ResponseHandlingException(source).
+        error = getattr(error, "source", None) or error.__cause__
+    return False
+
+
+@dataclass
+class ApplyResult:
+    applied: List[str] = field(default_factory=list)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    # Set when the index is unavailable; items neither applied nor in `errors` were not tried.
+    outage: Optional[Exception] = None
+
+
+async def apply_isolating_failures(apply: Callable[[List[Dict]], Awaitable[None]], items: List[Dict]) -> ApplyResult:
+    """
+    Apply `items` as one batch, falling back to one item at a time if the batch fails. Stops at the
+    first error that says the index is unavailable, so an outage costs at most two calls.
+    """
+    result = ApplyResult()
+    try:
+        await apply(items)
+        result.applied = [item["id"] for item in items]
+        return result
+    except Exception as e:
+        if is_unavailable(e):
+            result.outage = e
+            return result
+        if len(items) == 1:
+            result.errors[items[0]["id"]] = e
+            return result
+    for item in items:
+        try:
+            await apply([item])
+            result.applied.append(item["id"])
+        except Exception as e:
+            if is_unavailable(e):
+                result.outage = e
+                return result
+            result.errors[item["id"]] = e
+    return result
@@ -1,11 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import AsyncContextManager, Dict, List, Optional, Tuple
 
 class ItemRepository(ABC):
+    @abstractmethod
+    def unit_of_work(self) -> AsyncContextManager["ItemRepository"]:
+        """
+        Async context manager yielding a repository whose writes all run on one connection in
+        one transaction, committed when the block exits cleanly and rolled back otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def enqueue_vector_upserts(self, items: List[Dict]) -> None:
+        """
+        Record vector upserts in the outbox for the relay to apply. Each dict contains: id, vector,
+        payload, and optionally text. Call inside unit_of_work so they commit with the item rows.
+        """
+        pass
+
     @abstractmethod
     async def insert_found_item(self, item_data: Dict) -> str:
         """
         Insert found item metadata into Postgres and return the new item ID (UUID).
+        A pre-assigned "id" makes the insert idempotent: re-inserting the same id is a no-op.
+        """
+        pass
+
+    @abstractmethod
+    async def insert_found_items(self, items: List[Dict]) -> List[str]:
+        """
+        Insert many found items in a single batch and return their IDs, in input order.
+        An item may carry a pre-assigned "id"; otherwise a new UUID is generated.
+        """
+        pass
+
+    @abstractmethod
+    async def get_found_item_ids_by_hashes(self, image_hashes: List[str]) -> Dict[str, str]:
+        """
+        Map image content hashes (sha256 hex) to the IDs of found items already stored with them.
         """
         pass
 
@@ -16,6 +49,13 @@ class ItemRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_found_items_by_ids(self, item_ids: List[str]) -> List[Dict]:
+        """
+        Fetch many found items in one query, in the order of `item_ids`; unknown IDs are skipped.
+        """
+        pass
+
     @abstractmethod
     async def insert_lost_report(self, report_data: Dict) -> str:
         """
@@ -23,6 +63,14 @@ class ItemRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def insert_lost_reports(self, reports: List[Dict]) -> List[str]:
+        """
+        Bulk-insert lost reports (via COPY) and return their IDs, in input order.
+        A report may carry a pre-assigned "id"; otherwise a new UUID is generated.
+        """
+        pass
+
     @abstractmethod
     async def get_lost_report_by_id(self, report_id: str) -> Optional[Dict]:
         """
@@ -30,10 +78,61 @@ class ItemRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_lost_reports_by_ids(self, report_ids: List[str]) -> List[Dict]:
+        """
+        Fetch many lost reports in one query, in the order of `report_ids`; unknown IDs are skipped.
+        """
+        pass
+
+    @abstractmethod
+    async def list_found_items(self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None) -> List[Dict]:
+        """
+        Newest-first page of found items. `before` is the (created_at, id) keyset cursor of the
+        last row of the previous page.
+        """
+        pass
+
+    @abstractmethod
+    async def list_lost_reports(self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None) -> List[Dict]:
+        """
+        Newest-first page of lost reports, keyset-paginated on (created_at, id) like list_found_items.
+        """
+        pass
+
+    @abstractmethod
+    async def list_matches_for_lost_report(self, report_id: str, limit: int, before: Optional[Tuple[float, str]] = None) -> List[Dict]:
+        """
+        Best-first page of a lost report's matches, keyset-paginated on (score, id).
+        """
+        pass
+
+    @abstractmethod
+    async def get_found_item_ids(self, status: str = "active") -> List[str]:
+        """
+        IDs of all found items with the given status.
+        """
+        pass
+
+    @abstractmethod
+    async def get_lost_report_ids(self, status: str = "open") -> List[str]:
+        """
+        IDs of all lost reports with the given status.
+        """
+        pass
+
+    @abstractmethod
+    async def get_match_scores(self, lost_report_ids: List[str]) -> Dict[Tuple[str, str], float]:
+        """
+        Best stored score per (lost_report_id, found_item_id) pair for the given lost reports.
+        """
+        pass
+
     @abstractmethod
     async def insert_matches(self, matches: List[Dict]) -> None:
         """
-        Insert match results into the matches table.
-        Each dict contains: found_item_id, lost_item_id, score
+        Upsert match results into the matches table.
+        Each dict contains: found_item_id, lost_report_id, score, and optionally method.
+        A pair that already exists keeps the higher of its stored and new score, so re-runs are idempotent.
         """
         pass
\ No newline at end of file
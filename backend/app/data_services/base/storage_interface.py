@@ -1,9 +1,27 @@
 from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional, Union
 
 class ImageStorageService(ABC):
     @abstractmethod
-    async def upload_image(self, file_bytes: bytes, filename: str) -> str:
+    async def upload_image(
+        self,
+        file_bytes: Union[bytes, BinaryIO],
+        filename: str,
+        content_type: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> str:
         """
-        Upload image bytes and return the public URL.
+        Upload image bytes (or stream them from an open binary file) and return the public URL.
+        `content_type` is what the client declared; backends that need one fall back to sniffing.
+        `key` stores the object under that name, overwriting whatever is there (e.g. a name derived
+        from the content hash, so a retried upload replaces the object instead of orphaning it);
+        when omitted, a unique name is generated from `filename`.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def download_image(self, path: str) -> bytes:
+        """
+        Download image bytes previously stored with upload_image (accepts the returned URL).
+        """
+        pass
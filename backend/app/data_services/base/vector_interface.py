@@ -1,18 +1,87 @@
-
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 
+from app.config.settings import settings
+from app.data_services.match_scope import MatchScope, widening_steps
+
 class VectorSearchService(ABC):
     @abstractmethod
-    async def insert_item_vector(self, item_id: int, vector: List[float], payload: Dict) -> None:
+    async def insert_item_vector(self, item_id: int, vector: List[float], payload: Dict, text: Optional[str] = None) -> None:
         """
         Insert an item vector with associated metadata payload.
+        `text` (caption or description) feeds lexical retrieval in backends that support hybrid search.
+        """
+        pass
+
+    @abstractmethod
+    async def insert_item_vectors(self, items: List[Dict]) -> None:
+        """
+        Insert many item vectors at once. Each dict contains: id, vector, payload, and optionally text
         """
         pass
 
     @abstractmethod
-    async def search_similar(self, vector: List[float], top_k: int = 5, filter_payload: Optional[Dict] = None) -> List[Dict]:
+    async def search_similar(self, vector: List[float], top_k: int = 5, filter_payload: Optional[Dict] = None, payload_fields: Optional[List[str]] = None, query_text: Optional[str] = None, scope: Optional[MatchScope] = None) -> List[Dict]:
         """
         Search for similar vectors and return top-K matches with their metadata.
+        `payload_fields` limits the returned payload to those keys (None returns it all, [] none).
+        With `query_text`, hybrid-capable backends fuse dense and lexical retrieval.
+        `scope` restricts candidates to one location key and an event time range.
+        """
+        pass
+
+    @abstractmethod
+    async def search_similar_batch(self, vectors: List[List[float]], top_k: int = 5, filter_payload: Optional[Dict] = None, payload_fields: Optional[List[str]] = None, query_texts: Optional[List[str]] = None, scopes: Optional[List[Optional[MatchScope]]] = None) -> List[List[Dict]]:
+        """
+        Run one similarity search per query vector in a single round-trip; results are in query order.
+        `scopes` gives each query its own MatchScope (None entries are unscoped).
+        """
+        pass
+
+    @abstractmethod
+    async def get_vectors(self, item_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Fetch stored dense vectors by item ID; IDs without a vector are left out.
+        """
+        pass
+
+    async def search_scoped(self, vector: List[float], scope: Optional[MatchScope], top_k: int = 5, filter_payload: Optional[Dict] = None, payload_fields: Optional[List[str]] = None, query_text: Optional[str] = None) -> List[Dict]:
+        """
+        Search the narrowest scope first, widening (see widening_steps) until enough candidates come back.
+        """
+        results = await self.search_scoped_batch(
+            [vector], [scope], top_k, filter_payload, payload_fields,
+            [query_text] if query_text is not None else None,
+        )
+        return results[0]
+
+    async def search_scoped_batch(self, vectors: List[List[float]], scopes: List[Optional[MatchScope]], top_k: int = 5, filter_payload: Optional[Dict] = None, payload_fields: Optional[List[str]] = None, query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Batched search_scoped: each round re-runs only the queries that are still short of
+        MATCH_MIN_CANDIDATES (default top_k) results, at their next wider scope.
+        """
+        min_candidates = min(settings.MATCH_MIN_CANDIDATES or top_k, top_k)
+        steps = [widening_steps(scope) for scope in scopes]
+        results: List[List[Dict]] = [[] for _ in vectors]
+        pending = list(range(len(vectors)))
+        level = 0
+        while pending:
+            batch = await self.search_similar_batch(
+                [vectors[i] for i in pending],
+                top_k=top_k,
+                filter_payload=filter_payload,
+                payload_fields=payload_fields,
+                query_texts=[query_texts[i] for i in pending] if query_texts is not None else None,
+                scopes=[steps[i][level] for i in pending],
+            )
+            for i, hits in zip(pending, batch):
+                results[i] = hits
+            level += 1
+            pending = [i for i in pending if len(results[i]) < min_candidates and level < len(steps[i])]
+        return results
+
+    async def close(self) -> None:
+        """
+        Persist state and release resources. Optional for backends that hold nothing.
         """
         pass
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from app.config.settings import settings
+from app.data_services.base.storage_interface import ImageStorageService
+
+
+class LocalStorageService(ImageStorageService):
+    """
+    Stores images under a local directory and returns file:// URLs. A stand-in for Supabase
+    storage in offline development and benchmarks; not meant to be shared between hosts.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.STORAGE_LOCAL_PATH).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, target: Path, file_bytes: Union[bytes, BinaryIO]) -> None:
+        with open(target, "wb") as out:
+            if isinstance(file_bytes, bytes):
+                out.write(file_bytes)
+            else:
+                shutil.copyfileobj(file_bytes, out)
+
+    async def upload_image(
+        self,
+        file_bytes: Union[bytes, BinaryIO],
+        filename: str,
+        content_type: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        name = os.path.basename(key) if key else f"{uuid.uuid4()}_{os.path.basename(filename)}"
+        target = self.root / name
+        try:
+            await asyncio.to_thread(self._write, target, file_bytes)
+        except Exception as e:
+            raise Exception(f"Image upload failed: {e}")
+        return target.as_uri()
+
+    async def download_image(self, path: str) -> bytes:
+        parsed = urlparse(path)
+        target = Path(unquote(parsed.path)) if parsed.scheme == "file" else self.root / path
+        if self.root not in target.resolve().parents:
+            raise Exception(f"Image download failed: {path} is outside {self.root}")
+        try:
+            return await asyncio.to_thread(target.read_bytes)
+        except Exception as e:
+            raise Exception(f"Image download failed: {e}")
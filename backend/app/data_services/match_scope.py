@@ -0,0 +1,97 @@
+import re
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+from app.config.settings import settings
+
+# Payload fields written with every vector and used to narrow match searches.
+LOCATION_KEY_FIELD = "location_key"
+EVENT_AT_FIELD = "event_at"
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_UNKNOWN_LOCATIONS = {"", "unknown", "none", "na", "n a"}
+
+
+def normalize_location(location_hint: Optional[str]) -> Optional[str]:
+    """Lowercased, punctuation-free location key; None when the hint carries no location."""
+    if not location_hint:
+        return None
+    key = _NON_ALNUM.sub(" ", location_hint.lower()).strip()
+    key = " ".join(key.split())
+    return None if key in _UNKNOWN_LOCATIONS else key
+
+
+def to_epoch(at: Union[datetime, str, float, None]) -> float:
+    """Epoch seconds for a timestamp; naive datetimes are taken as UTC and None means now."""
+    if at is None:
+        return time.time()
+    if isinstance(at, (int, float)):
+        return float(at)
+    if isinstance(at, str):
+        at = datetime.fromisoformat(at)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+def scope_payload(location_hint: Optional[str], at: Union[datetime, str, float, None] = None) -> Dict:
+    """Payload fields that let searches prune by location and time."""
+    payload: Dict = {EVENT_AT_FIELD: to_epoch(at)}
+    location_key = normalize_location(location_hint)
+    if location_key:
+        payload[LOCATION_KEY_FIELD] = location_key
+    return payload
+
+
+@dataclass(frozen=True)
+class MatchScope:
+    """
+    Where and when to look for matches: same `location_key` (None = anywhere) and
+    `event_at` within ±`window_seconds` of the query item (None = any time).
+    """
+    location_key: Optional[str] = None
+    event_at: Optional[float] = None
+    window_seconds: Optional[float] = None
+
+    @classmethod
+    def around(cls, location_hint: Optional[str], at: Union[datetime, str, float, None] = None) -> Optional["MatchScope"]:
+        """Configured starting scope for an item, or None when scoping is disabled."""
+        if not settings.MATCH_SCOPE_ENABLED:
+            return None
+        return cls(
+            location_key=normalize_location(location_hint),
+            event_at=to_epoch(at),
+            window_seconds=settings.MATCH_TIME_WINDOW_DAYS * 86400 if settings.MATCH_TIME_WINDOW_DAYS > 0 else None,
+        )
+
+    @property
+    def time_range(self) -> Optional[tuple]:
+        if self.event_at is None or self.window_seconds is None:
+            return None
+        return self.event_at - self.window_seconds, self.event_at + self.window_seconds
+
+    def is_global(self) -> bool:
+        return self.location_key is None and self.time_range is None
+
+
+def widening_steps(scope: Optional[MatchScope]) -> List[Optional[MatchScope]]:
+    """
+    Progressively wider scopes to try in order: the time window grows by MATCH_WIDEN_FACTOR
+    per step at the same location, then the location is dropped, and finally (when
+    MATCH_SCOPE_FALLBACK_GLOBAL) the search runs unscoped. None stands for "no scope".
+    """
+    if scope is None or scope.is_global():
+        return [None]
+    steps: List[Optional[MatchScope]] = [scope]
+    current = scope
+    if current.window_seconds is not None:
+        for _ in range(max(settings.MATCH_WIDEN_STEPS, 0)):
+            current = replace(current, window_seconds=current.window_seconds * settings.MATCH_WIDEN_FACTOR)
+            steps.append(current)
+    if current.location_key is not None and current.time_range is not None:
+        steps.append(replace(current, location_key=None))
+    if settings.MATCH_SCOPE_FALLBACK_GLOBAL:
+        steps.append(None)
+    return steps
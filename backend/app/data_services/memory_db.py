@@ -0,0 +1,430 @@
+import json
+import time
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.data_services.base.job_queue_interface import JobQueue
+from app.data_services.base.outbox_interface import VectorOutbox, apply_isolating_failures
+from app.data_services.base.postgres_db_interface import ItemRepository
+from app.infra.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryStore:
+    """
+    The tables behind DB_BACKEND=memory: found items, lost reports, matches, the vector outbox
+    and the job queue, held in dicts for the life of the process. Everything runs on one event
+    loop and no mutation awaits, so each write is atomic without locks.
+    """
+
+    def __init__(self):
+        self.found_items: Dict[str, Dict] = {}
+        self.lost_reports: Dict[str, Dict] = {}
+        self.matches: Dict[Tuple[str, str], Dict] = {}
+        self.outbox: Dict[int, Dict] = {}
+        self.jobs: Dict[str, Dict] = {}
+        self._outbox_seq = 0
+
+    def next_outbox_id(self) -> int:
+        self._outbox_seq += 1
+        return self._outbox_seq
+
+
+class InMemoryRepository(ItemRepository):
+    """
+    ItemRepository over a MemoryStore, for load tests and local runs without Postgres. Rows come
+    back as the same dicts PostgresRepository returns (ids as strings). A unit of work buffers its
+    writes and applies them together on a clean exit, so a failure part-way leaves nothing behind.
+    """
+
+    def __init__(self, store: MemoryStore, response_cache: Optional[ResponseCache] = None):
+        self._store = store
+        self._response_cache = response_cache
+        # Inside a unit of work, writes (and their cache invalidations) wait for the commit.
+        self._pending: Optional[List[Callable[[], None]]] = None
+        self._pending_tags: List[str] = []
+
+    def _write(self, apply: Callable[[], None], *tags: str) -> None:
+        if self._pending is not None:
+            self._pending.append(apply)
+            self._pending_tags.extend(tags)
+            return
+        apply()
+        if self._response_cache is not None:
+            self._response_cache.invalidate(*tags)
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        uow = InMemoryRepository(self._store)
+        uow._pending = []
+        yield uow
+        # Reads inside the unit of work see committed rows only; nothing in the app reads its own writes.
+        for apply in uow._pending:
+            apply()
+        if self._response_cache is not None:
+            self._response_cache.invalidate(*uow._pending_tags)
+
+    def _check_new(self, table: Dict, ids: List[str], kind: str) -> None:
+        """Duplicate keys fail the whole batch, as COPY into the primary key would."""
+        duplicates = [i for i in ids if i in table]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"duplicate {kind} id: {duplicates[0] if duplicates else 'within batch'}")
+
+    async def enqueue_vector_upserts(self, items: List[Dict]) -> None:
+        if not items:
+            return
+        entries = [
+            {
+                "item_id": str(item["id"]),
+                "vector": [float(v) for v in item["vector"]],
+                "payload": json.loads(json.dumps(item["payload"])),
+                "text": item.get("text"),
+            }
+            for item in items
+        ]
+
+        def apply():
+            due = time.monotonic()
+            for entry in entries:
+                entry_id = self._store.next_outbox_id()
+                self._store.outbox[entry_id] = {
+                    **entry, "id": entry_id, "attempts": 0, "next_attempt_at": due, "failed_at": None,
+                }
+
+        self._write(apply)
+
+    def _found_row(self, item_id: str, item: Dict, now: datetime) -> Dict:
+        return {
+            "id": item_id,
+            "finder_user_id": item.get("finder_user_id"),
+            "image_bucket": item["image_bucket"],
+            "image_path": item["image_path"],
+            "image_sha256": item.get("image_sha256"),
+            "caption_text": item["caption_text"],
+            "caption_model": item.get("caption_model"),
+            "found_at": item.get("found_at"),
+            "location_hint": item.get("location_hint"),
+            "status": item.get("status", "active"),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    def _lost_row(self, report_id: str, report: Dict, now: datetime) -> Dict:
+        return {
+            "id": report_id,
+            "reporter_user_id": report.get("reporter_user_id"),
+            "description_text": report["description_text"],
+            "lost_at": report.get("lost_at"),
+            "location_hint": report.get("location_hint"),
+            "status": report.get("status", "open"),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def insert_found_item(self, item_data: Dict) -> str:
+        item_id = str(item_data.get("id") or uuid.uuid4())
+
+        def apply():
+            # ON CONFLICT (id) DO NOTHING: a retried job re-inserting its item is a no-op.
+            if item_id not in self._store.found_items:
+                self._store.found_items[item_id] = self._found_row(item_id, item_data, _now())
+
+        self._write(apply, "found_items", f"found_item:{item_id}")
+        return item_id
+
+    async def insert_found_items(self, items: List[Dict]) -> List[str]:
+        if not items:
+            return []
+        item_ids = [str(item.get("id") or uuid.uuid4()) for item in items]
+        try:
+            self._check_new(self._store.found_items, item_ids, "found item")
+        except Exception as e:
+            logger.error(f"Failed to insert {len(items)} found items: {e}")
+            raise
+
+        def apply():
+            now = _now()
+            for item_id, item in zip(item_ids, items):
+                self._store.found_items[item_id] = self._found_row(item_id, item, now)
+
+        self._write(apply, "found_items", *(f"found_item:{item_id}" for item_id in item_ids))
+        return item_ids
+
+    async def get_found_item_ids_by_hashes(self, image_hashes: List[str]) -> Dict[str, str]:
+        wanted = set(image_hashes)
+        if not wanted:
+            return {}
+        earliest: Dict[str, Dict] = {}
+        for row in self._store.found_items.values():
+            digest = row["image_sha256"]
+            if digest in wanted and (digest not in earliest or row["created_at"] < earliest[digest]["created_at"]):
+                earliest[digest] = row
+        return {digest: row["id"] for digest, row in earliest.items()}
+
+    async def get_found_item_by_id(self, item_id: str) -> Optional[Dict]:
+        row = self._store.found_items.get(str(item_id))
+        return dict(row) if row else None
+
+    async def get_found_items_by_ids(self, item_ids: List[str]) -> List[Dict]:
+        rows = (self._store.found_items.get(str(i)) for i in item_ids)
+        return [dict(row) for row in rows if row]
+
+    async def insert_lost_report(self, report_data: Dict) -> str:
+        report_id = str(uuid.uuid4())
+
+        def apply():
+            self._store.lost_reports[report_id] = self._lost_row(report_id, report_data, _now())
+
+        self._write(apply, "lost_reports", f"lost_report:{report_id}")
+        return report_id
+
+    async def insert_lost_reports(self, reports: List[Dict]) -> List[str]:
+        if not reports:
+            return []
+        report_ids = [str(report.get("id") or uuid.uuid4()) for report in reports]
+        try:
+            self._check_new(self._store.lost_reports, report_ids, "lost report")
+        except Exception as e:
+            logger.error(f"Failed to insert {len(reports)} lost reports: {e}")
+            raise
+
+        def apply():
+            now = _now()
+            for report_id, report in zip(report_ids, reports):
+                self._store.lost_reports[report_id] = self._lost_row(report_id, report, now)
+
+        self._write(apply, "lost_reports", *(f"lost_report:{report_id}" for report_id in report_ids))
+        return report_ids
+
+    async def get_lost_report_by_id(self, report_id: str) -> Optional[Dict]:
+        row = self._store.lost_reports.get(str(report_id))
+        return dict(row) if row else None
+
+    async def get_lost_reports_by_ids(self, report_ids: List[str]) -> List[Dict]:
+        rows = (self._store.lost_reports.get(str(i)) for i in report_ids)
+        return [dict(row) for row in rows if row]
+
+    def _newest_first(
+        self, table: Dict[str, Dict], limit: int, before: Optional[Tuple[datetime, str]], status: Optional[str]
+    ) -> List[Dict]:
+        rows = [
+            row
+            for row in table.values()
+            if (status is None or row["status"] == status)
+            and (before is None or (row["created_at"], row["id"]) < (before[0], str(before[1])))
+        ]
+        rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        return [dict(row) for row in rows[:limit]]
+
+    async def list_found_items(
+        self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None
+    ) -> List[Dict]:
+        return self._newest_first(self._store.found_items, limit, before, status)
+
+    async def list_lost_reports(
+        self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None
+    ) -> List[Dict]:
+        return self._newest_first(self._store.lost_reports, limit, before, status)
+
+    async def list_matches_for_lost_report(
+        self, report_id: str, limit: int, before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict]:
+        report_id = str(report_id)
+        rows = [
+            row
+            for (lost_report_id, _), row in self._store.matches.items()
+            if lost_report_id == report_id
+            and (before is None or (row["score"], row["id"]) < (before[0], str(before[1])))
+        ]
+        rows.sort(key=lambda row: (row["score"], row["id"]), reverse=True)
+        return [dict(row) for row in rows[:limit]]
+
+    async def get_found_item_ids(self, status: str = "active") -> List[str]:
+        return [row["id"] for row in self._store.found_items.values() if row["status"] == status]
+
+    async def get_lost_report_ids(self, status: str = "open") -> List[str]:
+        return [row["id"] for row in self._store.lost_reports.values() if row["status"] == status]
+
+    async def get_match_scores(self, lost_report_ids: List[str]) -> Dict[Tuple[str, str], float]:
+        wanted = {str(i) for i in lost_report_ids}
+        return {key: row["score"] for key, row in self._store.matches.items() if key[0] in wanted}
+
+    async def insert_matches(self, matches: List[Dict]) -> None:
+        if not matches:
+            return
+        best: Dict[Tuple[str, str], Dict] = {}
+        for m in matches:
+            key = (str(m["lost_report_id"]), str(m["found_item_id"]))
+            if key not in best or m["score"] > best[key]["score"]:
+                best[key] = m
+
+        def apply():
+            now = _now()
+            for (lost_report_id, found_item_id), m in best.items():
+                score = float(m["score"])
+                row = self._store.matches.get((lost_report_id, found_item_id))
+                if row is None:
+                    self._store.matches[(lost_report_id, found_item_id)] = {
+                        "id": str(uuid.uuid4()),
+                        "lost_report_id": lost_report_id,
+                        "found_item_id": found_item_id,
+                        "score": score,
+                        "method": m.get("method"),
+                        "created_at": now,
+                    }
+                elif score > row["score"]:
+                    # Same upsert as Postgres: keep the best score, and the method that produced it.
+                    row["score"], row["method"] = score, m.get("method")
+
+        self._write(apply, *{f"matches:{lost_report_id}" for lost_report_id, _ in best})
+
+
+class InMemoryVectorOutbox(VectorOutbox):
+    """Relay side of MemoryStore.outbox, with the same leasing, ordering, retry and parking rules as Postgres."""
+
+    def __init__(self, store: MemoryStore):
+        self._store = store
+
+    async def drain(
+        self,
+        apply: Callable[[List[Dict]], Awaitable[None]],
+        limit: int,
+        retry_seconds: float,
+        max_attempts: int,
+        lease_seconds: float,
+    ) -> int:
+        now = time.monotonic()
+        entries = []
+        for entry_id in sorted(self._store.outbox):
+            if len(entries) >= limit:
+                break
+            entry = self._store.outbox[entry_id]
+            if entry["failed_at"] is None and entry["next_attempt_at"] <= now:
+                entries.append(entry)
+        if not entries:
+            return 0
+        for entry in entries:
+            entry["next_attempt_at"] = now + lease_seconds
+        latest: Dict[str, Dict] = {}
+        for entry in entries:
+            latest[entry["item_id"]] = {
+                "id": entry["item_id"],
+                "vector": entry["vector"],
+                "payload": entry["payload"],
+                "text": entry["text"],
+            }
+        result = await apply_isolating_failures(apply, list(latest.values()))
+
+        applied = set(result.applied)
+        retry_at = time.monotonic() + retry_seconds
+        parked = set()
+        for entry in entries:
+            if entry["item_id"] in applied:
+                self._store.outbox.pop(entry["id"], None)
+                continue
+            error = result.errors.get(entry["item_id"])
+            if error is None and result.outage is None:
+                continue
+            entry["next_attempt_at"] = retry_at
+            entry["last_error"] = str(error or result.outage)
+            if error is not None:
+                entry["attempts"] += 1
+                if entry["attempts"] >= max_attempts:
+                    entry["failed_at"] = _now()
+                    parked.add(entry["item_id"])
+        if parked:
+            logger.error(f"Parked outbox entries of {len(parked)} items after {max_attempts} failed attempts: {sorted(parked)}")
+        if result.outage is not None:
+            logger.error(f"Vector index unavailable; rescheduled {len(latest) - len(applied)} outbox items: {result.outage}")
+            raise result.outage
+        return len(entries)
+
+    async def backlog(self) -> int:
+        return sum(1 for entry in self._store.outbox.values() if entry["failed_at"] is None)
+
+    async def parked(self) -> int:
+        return sum(1 for entry in self._store.outbox.values() if entry["failed_at"] is not None)
+
+
+class InMemoryJobQueue(JobQueue):
+    """JobQueue over MemoryStore.jobs. Payloads and results go through JSON, as they do in jsonb."""
+
+    def __init__(self, store: MemoryStore):
+        self._store = store
+
+    async def enqueue_job(self, kind: str, payload: Dict, max_attempts: int) -> str:
+        job_id = str(uuid.uuid4())
+        now = _now()
+        self._store.jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "payload": json.loads(json.dumps(payload)),
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "next_attempt_at": now,
+            "locked_at": None,
+            "stage_timings": {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        return job_id
+
+    async def claim_jobs(self, kind: str, limit: int, lease_seconds: float) -> List[Dict]:
+        now = _now()
+        expired = now - timedelta(seconds=lease_seconds)
+        runnable = [
+            job
+            for job in self._store.jobs.values()
+            if job["kind"] == kind
+            and (
+                (job["status"] == "queued" and job["next_attempt_at"] <= now)
+                or (job["status"] == "running" and job["locked_at"] < expired)
+            )
+        ]
+        runnable.sort(key=lambda job: job["next_attempt_at"])
+        claimed = []
+        for job in runnable[:limit]:
+            job.update(status="running", attempts=job["attempts"] + 1, locked_at=now, updated_at=now)
+            claimed.append({key: job[key] for key in ("id", "kind", "payload", "attempts", "max_attempts", "stage_timings")})
+        return claimed
+
+    async def complete_job(self, job_id: str, result: Dict, stage_timings: Dict) -> None:
+        job = self._store.jobs.get(job_id)
+        if job is None:
+            return
+        job.update(
+            status="succeeded",
+            result=json.loads(json.dumps(result, default=str)),
+            stage_timings=dict(stage_timings),
+            error=None,
+            locked_at=None,
+            updated_at=_now(),
+        )
+
+    async def fail_job(self, job_id: str, error: str, stage_timings: Dict, retry_at: Optional[datetime]) -> None:
+        job = self._store.jobs.get(job_id)
+        if job is None:
+            return
+        job.update(
+            status="failed" if retry_at is None else "queued",
+            next_attempt_at=retry_at or job["next_attempt_at"],
+            error=error,
+            stage_timings=dict(stage_timings),
+            locked_at=None,
+            updated_at=_now(),
+        )
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        job = self._store.jobs.get(job_id)
+        return dict(job) if job else None
@@ -0,0 +1,445 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.settings import settings
+from app.data_services.base.vector_interface import VectorSearchService
+from app.data_services.match_scope import EVENT_AT_FIELD, LOCATION_KEY_FIELD, MatchScope
+
+logger = logging.getLogger(__name__)
+
+# Above this many rows a search is moved off the event loop (NumPy releases the GIL in matmul).
+_THREAD_OFFLOAD_ROWS = 50_000
+
+
+@dataclass(frozen=True)
+class _IndexSnapshot:
+    count: int
+    vectors: np.ndarray
+    masks: Dict[Tuple[str, Hashable], np.ndarray]
+    event_at: np.ndarray
+    ids: List[str]
+    payloads: List[Dict]
+
+
+def _is_indexable(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _has_mask(key: str, value) -> bool:
+    # Timestamps are near-unique, so they get a range column instead of one mask per value.
+    return key != EVENT_AT_FIELD and _is_indexable(value)
+
+
+class NumpyVectorService(VectorSearchService):
+    """
+    In-process vector index for single-site deployments and tests.
+
+    Vectors are kept L2-normalized in one contiguous float32 matrix, with ids and payloads
+    in parallel arrays, so a cosine search is a single matrix-vector product followed by an
+    `argpartition` top-k. Every indexable (key, value) payload pair has a precomputed boolean
+    row mask, so `filter_payload` is a few vectorized ANDs instead of a scan over payloads;
+    `event_at` is also kept as a float column so a scope's time range is one vectorized compare.
+    Search is dense-only; item and query texts are accepted and ignored.
+
+    With a `path`, the index is saved as an .npy matrix, an .npz of the filter masks and the
+    event_at column, and a JSON sidecar, and reopened memory-mapped (copy-on-write), so startup
+    reads neither the whole matrix nor every payload up front. Every batch of upserts is appended
+    to a write-ahead log (fsynced) before it is acknowledged, so an outbox entry is only deleted
+    once its vector is on disk; load() replays the log on top of the last save. After
+    `save_every` upserts the index is saved and the log truncated.
+    """
+
+    def __init__(self, path: Optional[str] = None, initial_capacity: int = 1024, save_every: Optional[int] = None):
+        self.path = path or None
+        self.save_every = save_every if save_every is not None else settings.NUMPY_SAVE_EVERY_UPSERTS
+        self._dim: Optional[int] = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._count = 0
+        self._ids: List[str] = []
+        self._payloads: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._masks: Dict[Tuple[str, Hashable], np.ndarray] = {}
+        self._event_at = np.empty(0, dtype=np.float64)
+        self._initial_capacity = initial_capacity
+        self._dirty = False
+        self._unsaved = 0
+        # Serializes logged upserts with saves, so a save never races a write and the log it
+        # truncates holds nothing the save missed. Searches don't take it.
+        self._write_lock = asyncio.Lock()
+        self._saving: Optional[asyncio.Task] = None
+        if self.path:
+            self.load()
+
+    # ---------- persistence ----------
+
+    def _files(self) -> Tuple[str, str, str, str]:
+        return (
+            f"{self.path}.vectors.npy",
+            f"{self.path}.masks.npz",
+            f"{self.path}.meta.json",
+            f"{self.path}.wal.jsonl",
+        )
+
+    def load(self) -> None:
+        vectors_file, masks_file, meta_file, wal_file = self._files()
+        if os.path.exists(vectors_file) and os.path.exists(meta_file):
+            with open(meta_file) as f:
+                meta = json.load(f)
+            # Copy-on-write mapping: loads instantly, pages are read on first touch,
+            # and in-process updates never write back to the file until save().
+            self._vectors = np.load(vectors_file, mmap_mode="c")
+            self._dim = meta["dim"]
+            self._count = len(meta["ids"])
+            self._ids = meta["ids"]
+            self._payloads = meta["payloads"]
+            self._rows = dict(zip(self._ids, range(self._count)))
+            if not self._load_masks(masks_file, meta.get("masks")):
+                # Index saved without masks (or a mismatched set): rebuild them from the payloads.
+                self._masks = {}
+                self._event_at = np.full(self._vectors.shape[0], np.nan)
+                for row, payload in enumerate(self._payloads):
+                    self._index_payload(row, payload)
+            logger.info(f"Loaded vector index with {self._count} vectors from {self.path}.")
+        else:
+            logger.info(f"No saved vector index at {self.path}; starting empty.")
+        replayed = self._replay_log(wal_file)
+        if replayed:
+            logger.info(f"Replayed {replayed} logged upserts into the vector index from {wal_file}.")
+
+    def _load_masks(self, masks_file: str, keys: Optional[List]) -> bool:
+        if keys is None or not os.path.exists(masks_file):
+            return False
+        with np.load(masks_file) as saved:
+            if int(saved["count"]) != self._count:
+                logger.warning(f"Masks in {masks_file} don't match the saved vectors; rebuilding them.")
+                return False
+            capacity = self._vectors.shape[0]
+            self._event_at = np.full(capacity, np.nan)
+            self._event_at[: self._count] = saved["event_at"]
+            self._masks = {}
+            for i, (key, value) in enumerate(keys):
+                mask = np.zeros(capacity, dtype=bool)
+                mask[: self._count] = np.unpackbits(saved[f"mask_{i}"], count=self._count).view(bool)
+                self._masks[(key, value)] = mask
+        return True
+
+    def _replay_log(self, wal_file: str) -> int:
+        if not os.path.exists(wal_file):
+            return 0
+        replayed = 0
+        with open(wal_file, "r+b") as f:
+            for line in iter(f.readline, b""):
+                try:
+                    entry = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    entry = None
+                if entry is None:
+                    # A crash mid-append leaves a torn last line; that batch was never acknowledged.
+                    # Cut it off so later appends aren't hidden behind it.
+                    logger.warning(f"Dropping a torn entry at the end of {wal_file}.")
+                    f.truncate(f.tell() - len(line))
+                    break
+                self._upsert(entry["id"], entry["vector"], entry["payload"])
+                replayed += 1
+        self._unsaved = replayed
+        return replayed
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        vectors_file, masks_file, meta_file, wal_file = self._files()
+        directory = os.path.dirname(os.path.abspath(vectors_file))
+        os.makedirs(directory, exist_ok=True)
+        count = self._count
+        keys = list(self._masks)
+        # Write to temp files and rename, so a crash never leaves a half-written index.
+        np.save(f"{vectors_file}.tmp.npy", np.ascontiguousarray(self._vectors[:count]))
+        np.savez(
+            f"{masks_file}.tmp.npz",
+            count=np.int64(count),
+            event_at=self._event_at[:count],
+            **{f"mask_{i}": np.packbits(self._masks[key][:count]) for i, key in enumerate(keys)},
+        )
+        with open(f"{meta_file}.tmp", "w") as f:
+            json.dump(
+                {"dim": self._dim, "ids": self._ids[:count], "payloads": self._payloads[:count], "masks": keys},
+                f,
+                default=str,
+            )
+        os.replace(f"{vectors_file}.tmp.npy", vectors_file)
+        os.replace(f"{masks_file}.tmp.npz", masks_file)
+        os.replace(f"{meta_file}.tmp", meta_file)
+        # Everything logged so far is in the files now.
+        if os.path.exists(wal_file):
+            os.remove(wal_file)
+        self._dirty = False
+        self._unsaved = 0
+        logger.info(f"Saved vector index with {count} vectors to {self.path}.")
+
+    def _append_log(self, items: List[Dict]) -> None:
+        *_, wal_file = self._files()
+        os.makedirs(os.path.dirname(os.path.abspath(wal_file)), exist_ok=True)
+        lines = "".join(
+            json.dumps({"id": str(item["id"]), "vector": [float(v) for v in item["vector"]], "payload": item["payload"]}, default=str)
+            + "\n"
+            for item in items
+        )
+        with open(wal_file, "a") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _save_locked(self) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self.save)
+
+    async def close(self) -> None:
+        if self._saving is not None:
+            await asyncio.gather(self._saving, return_exceptions=True)
+        await self._save_locked()
+
+    # ---------- writes ----------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, self._initial_capacity)
+        vectors = np.zeros((new_capacity, self._dim), dtype=np.float32)
+        vectors[: self._count] = self._vectors[: self._count]
+        self._vectors = vectors
+        for key, mask in self._masks.items():
+            grown = np.zeros(new_capacity, dtype=bool)
+            grown[: mask.shape[0]] = mask
+            self._masks[key] = grown
+        event_at = np.full(new_capacity, np.nan)
+        event_at[: self._event_at.shape[0]] = self._event_at
+        self._event_at = event_at
+
+    def _index_payload(self, row: int, payload: Dict) -> None:
+        capacity = max(self._vectors.shape[0], row + 1)
+        for key, value in payload.items():
+            if not _has_mask(key, value):
+                continue
+            mask = self._masks.get((key, value))
+            if mask is None:
+                mask = self._masks[(key, value)] = np.zeros(capacity, dtype=bool)
+            mask[row] = True
+        value = payload.get(EVENT_AT_FIELD)
+        self._event_at[row] = float(value) if isinstance(value, (int, float)) else np.nan
+
+    def _unindex_payload(self, row: int, payload: Dict) -> None:
+        for key, value in payload.items():
+            if _has_mask(key, value) and (key, value) in self._masks:
+                self._masks[(key, value)][row] = False
+
+    def _upsert(self, item_id: str, vector: List[float], payload: Dict) -> None:
+        v = np.asarray(vector, dtype=np.float32)
+        if self._dim is None:
+            self._dim = v.shape[0]
+            self._vectors = np.zeros((0, self._dim), dtype=np.float32)
+        if v.shape != (self._dim,):
+            raise ValueError(f"Vector for {item_id} has dimension {v.shape[0]}, index expects {self._dim}")
+        norm = np.linalg.norm(v)
+        if norm > 0:
+            v = v / norm
+
+        row = self._rows.get(item_id)
+        if row is None:
+            row = self._count
+            self._ensure_capacity(row + 1)
+            self._vectors[row] = v
+            self._index_payload(row, payload)
+            self._ids.append(item_id)
+            self._payloads.append(payload)
+            self._rows[item_id] = row
+            # Publish the row last: a search in a worker thread only reads rows below its _count snapshot.
+            self._count += 1
+        else:
+            self._unindex_payload(row, self._payloads[row])
+            self._payloads[row] = payload
+            self._vectors[row] = v
+            self._index_payload(row, payload)
+        self._dirty = True
+
+    async def _write(self, items: List[Dict]) -> None:
+        async with self._write_lock:
+            for item in items:
+                self._upsert(str(item["id"]), item["vector"], item["payload"])
+            if not self.path:
+                return
+            # Acknowledged only once logged, so the caller (the outbox relay) may forget them.
+            await asyncio.to_thread(self._append_log, items)
+            self._unsaved += len(items)
+        if self._unsaved >= self.save_every > 0 and (self._saving is None or self._saving.done()):
+            self._saving = asyncio.create_task(self._save_locked())
+
+    async def insert_item_vector(
+        self, item_id: int, vector: List[float], payload: Dict, text: Optional[str] = None
+    ) -> None:
+        try:
+            await self._write([{"id": item_id, "vector": vector, "payload": payload}])
+        except Exception as e:
+            logger.error(f"Failed to upsert vector {item_id}: {e}")
+            raise
+
+    async def insert_item_vectors(self, items: List[Dict]) -> None:
+        try:
+            await self._write(items)
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(items)} vectors: {e}")
+            raise
+
+    # ---------- search ----------
+
+    def _snapshot(self) -> _IndexSnapshot:
+        """
+        The index as of now. Large searches run in a worker thread while upserts keep running on
+        the event loop and may reallocate the arrays, so a search reads only this snapshot: arrays
+        are replaced rather than resized, and rows at or past `count` are ignored.
+        """
+        return _IndexSnapshot(
+            count=self._count,
+            vectors=self._vectors,
+            masks=dict(self._masks),
+            event_at=self._event_at,
+            ids=self._ids,
+            payloads=self._payloads,
+        )
+
+    @staticmethod
+    def _candidate_rows(
+        index: _IndexSnapshot, filter_payload: Optional[Dict], scope: Optional[MatchScope] = None
+    ) -> Optional[np.ndarray]:
+        """Row indices passing the filter and scope, or None when there is neither."""
+        filter_payload = dict(filter_payload or {})
+        if scope is not None and scope.location_key is not None:
+            filter_payload[LOCATION_KEY_FIELD] = scope.location_key
+        time_range = scope.time_range if scope is not None else None
+        if not filter_payload and time_range is None:
+            return None
+        combined: Optional[np.ndarray] = None
+        for key, value in filter_payload.items():
+            mask = index.masks.get((key, value)) if _has_mask(key, value) else None
+            if mask is None:
+                return np.empty(0, dtype=np.int64)
+            mask = mask[: index.count]
+            combined = mask.copy() if combined is None else (combined & mask)
+        if time_range is not None:
+            event_at = index.event_at[: index.count]
+            # NaN (no timestamp) compares False, so undated rows only appear in unscoped searches.
+            in_range = (event_at >= time_range[0]) & (event_at <= time_range[1])
+            combined = in_range if combined is None else (combined & in_range)
+        return np.flatnonzero(combined)
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        filter_payload: Optional[Dict],
+        payload_fields: Optional[List[str]],
+        scope: Optional[MatchScope] = None,
+    ) -> List[List[Dict]]:
+        index = self._snapshot()
+        if index.count == 0 or top_k <= 0:
+            return [[] for _ in range(queries.shape[0])]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        rows = self._candidate_rows(index, filter_payload, scope)
+        matrix = index.vectors[: index.count] if rows is None else index.vectors[rows]
+        if matrix.shape[0] == 0:
+            return [[] for _ in range(queries.shape[0])]
+        scores = queries @ matrix.T  # (queries, candidates)
+
+        k = min(top_k, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), (scores.shape[0], k))
+        results = []
+        for qi in range(scores.shape[0]):
+            order = top[qi][np.argsort(-scores[qi, top[qi]])]
+            hits = []
+            for local in order:
+                row = int(local if rows is None else rows[local])
+                payload = index.payloads[row]
+                if payload_fields is not None:
+                    payload = {k: payload[k] for k in payload_fields if k in payload}
+                hits.append({"id": index.ids[row], "score": float(scores[qi, local]), "payload": payload})
+            results.append(hits)
+        return results
+
+    async def _run_search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        filter_payload: Optional[Dict],
+        payload_fields: Optional[List[str]],
+        scope: Optional[MatchScope] = None,
+    ) -> List[List[Dict]]:
+        if self._count * queries.shape[0] > _THREAD_OFFLOAD_ROWS:
+            return await asyncio.to_thread(self._search, queries, top_k, filter_payload, payload_fields, scope)
+        return self._search(queries, top_k, filter_payload, payload_fields, scope)
+
+    async def search_similar(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        filter_payload: Optional[Dict] = None,
+        payload_fields: Optional[List[str]] = None,
+        query_text: Optional[str] = None,
+        scope: Optional[MatchScope] = None,
+    ) -> List[Dict]:
+        try:
+            queries = np.asarray([vector], dtype=np.float32)
+            return (await self._run_search(queries, top_k, filter_payload, payload_fields, scope))[0]
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            raise
+
+    async def search_similar_batch(
+        self,
+        vectors: List[List[float]],
+        top_k: int = 5,
+        filter_payload: Optional[Dict] = None,
+        payload_fields: Optional[List[str]] = None,
+        query_texts: Optional[List[str]] = None,
+        scopes: Optional[List[Optional[MatchScope]]] = None,
+    ) -> List[List[Dict]]:
+        if not vectors:
+            return []
+        try:
+            queries = np.asarray(vectors, dtype=np.float32)
+            if not scopes:
+                return await self._run_search(queries, top_k, filter_payload, payload_fields)
+            # Queries sharing a scope share a candidate set, so each group is one matrix product.
+            groups: Dict[Optional[MatchScope], List[int]] = {}
+            for i, scope in enumerate(scopes):
+                groups.setdefault(scope, []).append(i)
+            results: List[List[Dict]] = [[] for _ in vectors]
+            for scope, indices in groups.items():
+                hits = await self._run_search(queries[indices], top_k, filter_payload, payload_fields, scope)
+                for i, item_hits in zip(indices, hits):
+                    results[i] = item_hits
+            return results
+        except Exception as e:
+            logger.error(f"Batch search of {len(vectors)} queries failed: {e}")
+            raise
+
+    async def get_vectors(self, item_ids: List[str]) -> Dict[str, List[float]]:
+        # Stored vectors are unit-length; for cosine matching that is equivalent to the originals.
+        return {
+            str(item_id): self._vectors[self._rows[str(item_id)]].tolist()
+            for item_id in item_ids
+            if str(item_id) in self._rows
+        }
+
+    def __len__(self) -> int:
+        return self._count
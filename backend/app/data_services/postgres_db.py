@@ -1,19 +1,84 @@
+import json
 import uuid
 import logging
-from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 
 from app.data_services.base.postgres_db_interface import ItemRepository
 from app.infra.database import Database
+from app.infra.response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Below this many match rows, staging through COPY costs more round-trips than it saves.
+_MATCH_COPY_MIN_ROWS = 200
+
+
+def _in_id_order(rows, ids: List[str]) -> List[Dict]:
+    """Rows as dicts in the order of `ids` (ANY() returns them in arbitrary order)."""
+    by_id = {str(row["id"]): dict(row) for row in rows}
+    return [by_id[str(i)] for i in ids if str(i) in by_id]
+
+
+class _ConnectionScope:
+    """Stands in for Database inside a unit of work: every get_connection() is the same connection."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    @asynccontextmanager
+    async def get_connection(self):
+        yield self._conn
+
 
 class PostgresRepository(ItemRepository):
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, response_cache: Optional[ResponseCache] = None):
         self._db = db
+        self._response_cache = response_cache
+        # Inside a unit of work, cache invalidations wait for the commit.
+        self._pending_tags: Optional[List[str]] = None
+
+    def _invalidate(self, *tags: str) -> None:
+        """Drop cached read responses built from rows this write touched."""
+        if self._pending_tags is not None:
+            self._pending_tags.extend(tags)
+        elif self._response_cache is not None:
+            self._response_cache.invalidate(*tags)
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        async with self._db.get_connection() as conn:
+            async with conn.transaction():
+                uow = PostgresRepository(_ConnectionScope(conn))
+                uow._pending_tags = []
+                yield uow
+        self._invalidate(*uow._pending_tags)
+
+    async def enqueue_vector_upserts(self, items: List[Dict]) -> None:
+        if not items:
+            return
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.copy_records_to_table(
+                    "vector_outbox",
+                    columns=["item_id", "vector", "payload", "text"],
+                    records=[
+                        (
+                            str(item["id"]),
+                            [float(v) for v in item["vector"]],
+                            json.dumps(item["payload"]),
+                            item.get("text"),
+                        )
+                        for item in items
+                    ],
+                )
+        except Exception as e:
+            logger.error(f"Failed to enqueue {len(items)} vector upserts: {e}")
+            raise
 
     async def insert_found_item(self, item_data: Dict) -> str:
-        item_id = str(uuid.uuid4())
+        item_id = item_data.get("id") or str(uuid.uuid4())
         try:
             async with self._db.get_connection() as conn:
                 await conn.execute(
@@ -23,29 +88,96 @@ class PostgresRepository(ItemRepository):
                         finder_user_id, 
                         image_bucket, 
                         image_path,
+                        image_sha256,
                         caption_text, 
                         caption_model, 
                         found_at, 
                         location_hint, 
                         status
                     )
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    ON CONFLICT (id) DO NOTHING
                     """,
                     item_id,
                     item_data.get("finder_user_id"),
                     item_data["image_bucket"],
                     item_data["image_path"],
+                    item_data.get("image_sha256"),
                     item_data["caption_text"],
                     item_data.get("caption_model"),
                     item_data.get("found_at"),
                     item_data.get("location_hint"),
                     item_data.get("status", "active"),
                 )
+            self._invalidate("found_items", f"found_item:{item_id}")
             return item_id
         except Exception as e:
             logger.error(f"Failed to insert found item: {e}")
             raise
 
+    async def insert_found_items(self, items: List[Dict]) -> List[str]:
+        if not items:
+            return []
+        item_ids = [item.get("id") or str(uuid.uuid4()) for item in items]
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.copy_records_to_table(
+                    "found_items",
+                    columns=[
+                        "id",
+                        "finder_user_id",
+                        "image_bucket",
+                        "image_path",
+                        "image_sha256",
+                        "caption_text",
+                        "caption_model",
+                        "found_at",
+                        "location_hint",
+                        "status",
+                    ],
+                    records=[
+                        (
+                            item_id,
+                            item.get("finder_user_id"),
+                            item["image_bucket"],
+                            item["image_path"],
+                            item.get("image_sha256"),
+                            item["caption_text"],
+                            item.get("caption_model"),
+                            item.get("found_at"),
+                            item.get("location_hint"),
+                            item.get("status", "active"),
+                        )
+                        for item_id, item in zip(item_ids, items)
+                    ],
+                )
+            self._invalidate("found_items", *(f"found_item:{item_id}" for item_id in item_ids))
+            return item_ids
+        except Exception as e:
+            logger.error(f"Failed to insert {len(items)} found items: {e}")
+            raise
+
+    async def get_found_item_ids_by_hashes(self, image_hashes: List[str]) -> Dict[str, str]:
+        if not image_hashes:
+            return {}
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT DISTINCT ON (image_sha256)
+                        image_sha256, 
+                        id
+                    FROM found_items
+                    WHERE image_sha256 = ANY($1::text[])
+                    ORDER BY image_sha256, created_at
+                    """,
+                    image_hashes,
+                )
+                return {row["image_sha256"]: str(row["id"]) for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to look up found items by image hash: {e}")
+            raise
+
     async def get_found_item_by_id(self, item_id: str) -> Optional[Dict]:
         try:
             async with self._db.get_connection() as conn:
@@ -56,6 +188,7 @@ class PostgresRepository(ItemRepository):
                         finder_user_id, 
                         image_bucket, 
                         image_path,
+                        image_sha256,
                         caption_text, 
                         caption_model, 
                         found_at, 
@@ -73,6 +206,36 @@ class PostgresRepository(ItemRepository):
             logger.error(f"Failed to get found item {item_id}: {e}")
             raise
 
+    async def get_found_items_by_ids(self, item_ids: List[str]) -> List[Dict]:
+        if not item_ids:
+            return []
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT 
+                        id, 
+                        finder_user_id, 
+                        image_bucket, 
+                        image_path,
+                        image_sha256,
+                        caption_text, 
+                        caption_model, 
+                        found_at, 
+                        location_hint, 
+                        status,
+                        created_at, 
+                        updated_at
+                    FROM found_items
+                    WHERE id = ANY($1::uuid[])
+                    """,
+                    list(item_ids),
+                )
+                return _in_id_order(rows, item_ids)
+        except Exception as e:
+            logger.error(f"Failed to get {len(item_ids)} found items: {e}")
+            raise
+
     async def insert_lost_report(self, report_data: Dict) -> str:
         report_id = str(uuid.uuid4())
         try:
@@ -96,11 +259,46 @@ class PostgresRepository(ItemRepository):
                     report_data.get("location_hint"),
                     report_data.get("status", "open"),
                 )
+            self._invalidate("lost_reports", f"lost_report:{report_id}")
             return report_id
         except Exception as e:
             logger.error(f"Failed to insert lost report: {e}")
             raise
 
+    async def insert_lost_reports(self, reports: List[Dict]) -> List[str]:
+        if not reports:
+            return []
+        report_ids = [report.get("id") or str(uuid.uuid4()) for report in reports]
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.copy_records_to_table(
+                    "lost_reports",
+                    columns=[
+                        "id",
+                        "reporter_user_id",
+                        "description_text",
+                        "lost_at",
+                        "location_hint",
+                        "status",
+                    ],
+                    records=[
+                        (
+                            report_id,
+                            report.get("reporter_user_id"),
+                            report["description_text"],
+                            report.get("lost_at"),
+                            report.get("location_hint"),
+                            report.get("status", "open"),
+                        )
+                        for report_id, report in zip(report_ids, reports)
+                    ],
+                )
+            self._invalidate("lost_reports", *(f"lost_report:{report_id}" for report_id in report_ids))
+            return report_ids
+        except Exception as e:
+            logger.error(f"Failed to insert {len(reports)} lost reports: {e}")
+            raise
+
     async def get_lost_report_by_id(self, report_id: str) -> Optional[Dict]:
         try:
             async with self._db.get_connection() as conn:
@@ -125,34 +323,224 @@ class PostgresRepository(ItemRepository):
             logger.error(f"Failed to get lost report {report_id}: {e}")
             raise
 
+    async def get_lost_reports_by_ids(self, report_ids: List[str]) -> List[Dict]:
+        if not report_ids:
+            return []
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT 
+                        id, 
+                        reporter_user_id, 
+                        description_text,
+                        lost_at, 
+                        location_hint, 
+                        status,
+                        created_at, 
+                        updated_at
+                    FROM lost_reports
+                    WHERE id = ANY($1::uuid[])
+                    """,
+                    list(report_ids),
+                )
+                return _in_id_order(rows, report_ids)
+        except Exception as e:
+            logger.error(f"Failed to get {len(report_ids)} lost reports: {e}")
+            raise
+
+    async def list_found_items(
+        self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None
+    ) -> List[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT 
+                        id, 
+                        finder_user_id, 
+                        image_bucket, 
+                        image_path,
+                        image_sha256,
+                        caption_text, 
+                        caption_model, 
+                        found_at, 
+                        location_hint, 
+                        status,
+                        created_at, 
+                        updated_at
+                    FROM found_items
+                    WHERE ($1::text IS NULL OR status = $1)
+                      AND ($2::timestamptz IS NULL OR (created_at, id) < ($2, $3::uuid))
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT $4
+                    """,
+                    status,
+                    before[0] if before else None,
+                    before[1] if before else None,
+                    limit,
+                )
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list found items: {e}")
+            raise
+
+    async def list_lost_reports(
+        self, limit: int, before: Optional[Tuple[datetime, str]] = None, status: Optional[str] = None
+    ) -> List[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT 
+                        id, 
+                        reporter_user_id, 
+                        description_text,
+                        lost_at, 
+                        location_hint, 
+                        status,
+                        created_at, 
+                        updated_at
+                    FROM lost_reports
+                    WHERE ($1::text IS NULL OR status = $1)
+                      AND ($2::timestamptz IS NULL OR (created_at, id) < ($2, $3::uuid))
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT $4
+                    """,
+                    status,
+                    before[0] if before else None,
+                    before[1] if before else None,
+                    limit,
+                )
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list lost reports: {e}")
+            raise
+
+    async def list_matches_for_lost_report(
+        self, report_id: str, limit: int, before: Optional[Tuple[float, str]] = None
+    ) -> List[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT 
+                        id, 
+                        lost_report_id, 
+                        found_item_id, 
+                        score, 
+                        method, 
+                        created_at
+                    FROM matches
+                    WHERE lost_report_id = $1
+                      AND ($2::float8 IS NULL OR (score, id) < ($2, $3::uuid))
+                    ORDER BY score DESC, id DESC
+                    LIMIT $4
+                    """,
+                    report_id,
+                    before[0] if before else None,
+                    before[1] if before else None,
+                    limit,
+                )
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list matches for lost report {report_id}: {e}")
+            raise
+
+    async def get_found_item_ids(self, status: str = "active") -> List[str]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch("SELECT id FROM found_items WHERE status = $1", status)
+                return [str(row["id"]) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list {status} found items: {e}")
+            raise
+
+    async def get_lost_report_ids(self, status: str = "open") -> List[str]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch("SELECT id FROM lost_reports WHERE status = $1", status)
+                return [str(row["id"]) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to list {status} lost reports: {e}")
+            raise
+
+    async def get_match_scores(self, lost_report_ids: List[str]) -> Dict[Tuple[str, str], float]:
+        if not lost_report_ids:
+            return {}
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT lost_report_id, found_item_id, MAX(score) AS score
+                    FROM matches
+                    WHERE lost_report_id = ANY($1::uuid[])
+                    GROUP BY lost_report_id, found_item_id
+                    """,
+                    lost_report_ids,
+                )
+                return {(str(row["lost_report_id"]), str(row["found_item_id"])): row["score"] for row in rows}
+        except Exception as e:
+            logger.error(f"Failed to get match scores for {len(lost_report_ids)} lost reports: {e}")
+            raise
+
     async def insert_matches(self, matches: List[Dict]) -> None:
         if not matches:
             return
+        # One row per (lost, found) pair: Postgres can't update the same row twice in one
+        # INSERT ... ON CONFLICT, so duplicates in the batch collapse to their best score.
+        best: Dict[Tuple[str, str], Dict] = {}
+        for m in matches:
+            key = (str(m["lost_report_id"]), str(m["found_item_id"]))
+            if key not in best or m["score"] > best[key]["score"]:
+                best[key] = m
+        records = [
+            (found_item_id, lost_report_id, float(m["score"]), m.get("method"))
+            for (lost_report_id, found_item_id), m in best.items()
+        ]
         try:
             async with self._db.get_connection() as conn:
                 async with conn.transaction():
-                    await conn.executemany(
-                        """
-                        INSERT INTO matches (
-                            id, 
-                            found_item_id, 
-                            lost_report_id, 
-                            score, 
-                            method
+                    if len(records) >= _MATCH_COPY_MIN_ROWS:
+                        # Temp table lives for this transaction only, so it is safe behind a transaction pooler.
+                        await conn.execute(
+                            """
+                            CREATE TEMP TABLE matches_stage (
+                                found_item_id uuid,
+                                lost_report_id uuid,
+                                score double precision,
+                                method varchar(50)
+                            ) ON COMMIT DROP
+                            """
+                        )
+                        await conn.copy_records_to_table(
+                            "matches_stage",
+                            records=records,
+                            columns=["found_item_id", "lost_report_id", "score", "method"],
                         )
-                        VALUES ($1, $2, $3, $4, $5)
+                        source = "SELECT found_item_id, lost_report_id, score, method FROM matches_stage"
+                        args = ()
+                        cleanup = "DROP TABLE matches_stage"
+                    else:
+                        source = "SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::float8[], $4::varchar[])"
+                        args = tuple(list(column) for column in zip(*records))
+                        cleanup = None
+                    await conn.execute(
+                        f"""
+                        INSERT INTO matches (id, found_item_id, lost_report_id, score, method)
+                        SELECT gen_random_uuid(), s.found_item_id, s.lost_report_id, s.score, s.method
+                        FROM ({source}) AS s (found_item_id, lost_report_id, score, method)
+                        ON CONFLICT (lost_report_id, found_item_id) DO UPDATE
+                        SET score = GREATEST(matches.score, EXCLUDED.score),
+                            method = CASE WHEN EXCLUDED.score > matches.score
+                                          THEN EXCLUDED.method ELSE matches.method END
                         """,
-                        [
-                            (
-                                str(uuid.uuid4()),
-                                m["found_item_id"],
-                                m["lost_report_id"],
-                                m["score"],
-                                m.get("method"),
-                            )
-                            for m in matches
-                        ],
+                        *args,
                     )
+                    if cleanup:
+                        # Dropped explicitly too, so a unit of work can call this more than once.
+                        await conn.execute(cleanup)
+            self._invalidate(*{f"matches:{lost_report_id}" for lost_report_id, _ in best})
         except Exception as e:
-            logger.error(f"Failed to insert matches: {e}")
+            logger.error(f"Failed to insert {len(records)} matches: {e}")
             raise
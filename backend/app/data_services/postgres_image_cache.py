@@ -0,0 +1,57 @@
+import logging
+from typing import Dict, Optional
+
+from app.data_services.base.cache_interface import ImageResultStore
+from app.infra.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresImageResultStore(ImageResultStore):
+    def __init__(self, db: Database):
+        self._db = db
+
+    async def get_result(self, cache_key: str) -> Optional[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT 
+                        caption_text, 
+                        embedding
+                    FROM image_caption_cache
+                    WHERE cache_key = $1
+                    """,
+                    cache_key,
+                )
+                if not row:
+                    return None
+                return {
+                    "type": "text",
+                    "embedding": list(row["embedding"]),
+                    "metadata": {"caption": row["caption_text"]},
+                }
+        except Exception as e:
+            logger.error(f"Failed to read image cache entry {cache_key}: {e}")
+            raise
+
+    async def put_result(self, cache_key: str, result: Dict) -> None:
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO image_caption_cache (
+                        cache_key, 
+                        caption_text, 
+                        embedding
+                    )
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (cache_key) DO NOTHING
+                    """,
+                    cache_key,
+                    result["metadata"]["caption"],
+                    result["embedding"],
+                )
+        except Exception as e:
+            logger.error(f"Failed to write image cache entry {cache_key}: {e}")
+            raise
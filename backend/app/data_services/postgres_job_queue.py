@@ -0,0 +1,157 @@
+import json
+import uuid
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.data_services.base.job_queue_interface import JobQueue
+from app.infra.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+def _job_from_row(row) -> Dict:
+    job = dict(row)
+    job["id"] = str(job["id"])
+    for key in ("payload", "stage_timings", "result"):
+        if isinstance(job.get(key), str):
+            job[key] = json.loads(job[key])
+    return job
+
+
+class PostgresJobQueue(JobQueue):
+    def __init__(self, db: Database):
+        self._db = db
+
+    async def enqueue_job(self, kind: str, payload: Dict, max_attempts: int) -> str:
+        job_id = str(uuid.uuid4())
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO ingest_jobs (
+                        id, 
+                        kind, 
+                        status, 
+                        payload, 
+                        max_attempts
+                    )
+                    VALUES ($1, $2, 'queued', $3::jsonb, $4)
+                    """,
+                    job_id,
+                    kind,
+                    json.dumps(payload),
+                    max_attempts,
+                )
+            return job_id
+        except Exception as e:
+            logger.error(f"Failed to enqueue {kind} job: {e}")
+            raise
+
+    async def claim_jobs(self, kind: str, limit: int, lease_seconds: float) -> List[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    WITH claimable AS (
+                        SELECT id
+                        FROM ingest_jobs
+                        WHERE kind = $1
+                          AND (
+                                (status = 'queued' AND next_attempt_at <= now())
+                             OR (status = 'running' AND locked_at < now() - make_interval(secs => $3))
+                          )
+                        ORDER BY next_attempt_at
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    UPDATE ingest_jobs j
+                    SET status = 'running',
+                        attempts = j.attempts + 1,
+                        locked_at = now(),
+                        updated_at = now()
+                    FROM claimable
+                    WHERE j.id = claimable.id
+                    RETURNING j.id, j.kind, j.payload, j.attempts, j.max_attempts, j.stage_timings
+                    """,
+                    kind,
+                    limit,
+                    float(lease_seconds),
+                )
+                return [_job_from_row(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to claim {kind} jobs: {e}")
+            raise
+
+    async def complete_job(self, job_id: str, result: Dict, stage_timings: Dict) -> None:
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.execute(
+                    """
+                    UPDATE ingest_jobs
+                    SET status = 'succeeded',
+                        result = $2::jsonb,
+                        stage_timings = $3::jsonb,
+                        error = NULL,
+                        locked_at = NULL,
+                        updated_at = now()
+                    WHERE id = $1
+                    """,
+                    job_id,
+                    json.dumps(result, default=str),
+                    json.dumps(stage_timings),
+                )
+        except Exception as e:
+            logger.error(f"Failed to complete job {job_id}: {e}")
+            raise
+
+    async def fail_job(self, job_id: str, error: str, stage_timings: Dict, retry_at: Optional[datetime]) -> None:
+        try:
+            async with self._db.get_connection() as conn:
+                await conn.execute(
+                    """
+                    UPDATE ingest_jobs
+                    SET status = CASE WHEN $4::timestamptz IS NULL THEN 'failed' ELSE 'queued' END,
+                        next_attempt_at = COALESCE($4::timestamptz, next_attempt_at),
+                        error = $2,
+                        stage_timings = $3::jsonb,
+                        locked_at = NULL,
+                        updated_at = now()
+                    WHERE id = $1
+                    """,
+                    job_id,
+                    error,
+                    json.dumps(stage_timings),
+                    retry_at,
+                )
+        except Exception as e:
+            logger.error(f"Failed to record failure for job {job_id}: {e}")
+            raise
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        try:
+            async with self._db.get_connection() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT 
+                        id, 
+                        kind, 
+                        status, 
+                        payload, 
+                        attempts, 
+                        max_attempts,
+                        next_attempt_at, 
+                        stage_timings, 
+                        result, 
+                        error,
+                        created_at, 
+                        updated_at
+                    FROM ingest_jobs
+                    WHERE id = $1
+                    """,
+                    job_id,
+                )
+                return _job_from_row(row) if row else None
+        except Exception as e:
+            logger.error(f"Failed to get job {job_id}: {e}")
+            raise
@@ -0,0 +1,128 @@
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+from app.data_services.base.outbox_interface import VectorOutbox, apply_isolating_failures
+from app.infra.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresVectorOutbox(VectorOutbox):
+    """
+    Relay side of the vector_outbox table. A drain claims due entries with FOR UPDATE SKIP LOCKED
+    and leases them by pushing next_attempt_at past the lease, so several relays can drain
+    concurrently, then commits before calling the vector index. A second short transaction deletes
+    the entries the index acknowledged and reschedules or parks the rest, so no connection or row
+    lock is held across network calls. Entries that keep failing on their own are parked
+    (failed_at) after `max_attempts`, so they stop being retried.
+    """
+
+    def __init__(self, db: Database):
+        self._db = db
+
+    async def drain(
+        self,
+        apply: Callable[[List[Dict]], Awaitable[None]],
+        limit: int,
+        retry_seconds: float,
+        max_attempts: int,
+        lease_seconds: float,
+    ) -> int:
+        async with self._db.get_connection() as conn:
+            rows = await conn.fetch(
+                """
+                WITH due AS (
+                    SELECT id
+                    FROM vector_outbox
+                    WHERE failed_at IS NULL
+                      AND next_attempt_at <= now()
+                    ORDER BY id
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE vector_outbox o
+                SET next_attempt_at = now() + make_interval(secs => $2)
+                FROM due
+                WHERE o.id = due.id
+                RETURNING o.id, o.item_id, o.vector, o.payload, o.text, o.attempts
+                """,
+                limit,
+                float(lease_seconds),
+            )
+        if not rows:
+            return 0
+        # Applied in write order, so a later upsert of the same item replaces an earlier one.
+        latest: Dict[str, Dict] = {}
+        entry_ids: Dict[str, List[int]] = {}
+        attempts: Dict[str, int] = {}
+        for row in sorted(rows, key=lambda row: row["id"]):
+            item_id = str(row["item_id"])
+            payload = row["payload"]
+            latest[item_id] = {
+                "id": item_id,
+                "vector": list(row["vector"]),
+                "payload": json.loads(payload) if isinstance(payload, str) else payload,
+                "text": row["text"],
+            }
+            entry_ids.setdefault(item_id, []).append(row["id"])
+            attempts[item_id] = max(attempts.get(item_id, 0), row["attempts"])
+
+        result = await apply_isolating_failures(apply, list(latest.values()))
+
+        done = [entry_id for item_id in result.applied for entry_id in entry_ids[item_id]]
+        parked = [item_id for item_id in result.errors if attempts[item_id] + 1 >= max_attempts]
+        retry = float(retry_seconds)
+        # (entry ids, attempts charged, retry seconds, error, park); items not tried during an outage aren't charged.
+        retries = [
+            (entry_ids[item_id], 1, retry, str(error), item_id in parked) for item_id, error in result.errors.items()
+        ]
+        if result.outage is not None:
+            retries += [
+                (entry_ids[item_id], 0, retry, str(result.outage), False)
+                for item_id in latest
+                if item_id not in result.errors and item_id not in result.applied
+            ]
+        async with self._db.get_connection() as conn:
+            async with conn.transaction():
+                if done:
+                    await conn.execute("DELETE FROM vector_outbox WHERE id = ANY($1::bigint[])", done)
+                if retries:
+                    await conn.executemany(
+                        """
+                        UPDATE vector_outbox
+                        SET attempts = attempts + $2,
+                            next_attempt_at = now() + make_interval(secs => $3),
+                            last_error = $4,
+                            failed_at = CASE WHEN $5::boolean THEN now() END
+                        WHERE id = ANY($1::bigint[])
+                        """,
+                        retries,
+                    )
+        if parked:
+            logger.error(
+                f"Parked outbox entries of {len(parked)} items after {max_attempts} failed attempts: "
+                + "; ".join(f"{item_id}: {result.errors[item_id]}" for item_id in parked)
+            )
+        if result.outage is not None:
+            logger.error(f"Vector index unavailable; rescheduled {len(latest) - len(result.applied)} outbox items: {result.outage}")
+            raise result.outage
+        if result.errors:
+            logger.warning(f"{len(result.errors)} of {len(latest)} outbox items failed and were rescheduled or parked.")
+        return len(rows)
+
+    async def backlog(self) -> int:
+        try:
+            async with self._db.get_connection() as conn:
+                return await conn.fetchval("SELECT count(*) FROM vector_outbox WHERE failed_at IS NULL")
+        except Exception as e:
+            logger.error(f"Failed to count outbox entries: {e}")
+            raise
+
+    async def parked(self) -> int:
+        try:
+            async with self._db.get_connection() as conn:
+                return await conn.fetchval("SELECT count(*) FROM vector_outbox WHERE failed_at IS NOT NULL")
+        except Exception as e:
+            logger.error(f"Failed to count parked outbox entries: {e}")
+            raise
@@ -1,9 +1,25 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import logging
-from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue, Condition
+import numpy as np
+from qdrant_client.models import (
+    PointStruct,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    Condition,
+    Fusion,
+    FusionQuery,
+    Prefetch,
+    Range,
+    QueryRequest,
+    ScoredPoint,
+    SparseVector,
+)
 from app.config.settings import settings
-from app.infra.qdrant_client import qdrant_client
+from app.infra.qdrant_client import qdrant_client, search_params, SPARSE_VECTOR_NAME
 from app.data_services.base.vector_interface import VectorSearchService
+from app.data_services.match_scope import EVENT_AT_FIELD, LOCATION_KEY_FIELD, MatchScope
+from app.ml_services.lexical import LexicalVector, lexical_scores, lexical_vector
 
 logger = logging.getLogger(__name__)
 
@@ -12,35 +28,238 @@ class QdrantVectorService(VectorSearchService):
     def __init__(self, collection: str = settings.QDRANT_COLLECTION):
         self.client = qdrant_client.get_client()
         self.collection = collection
+        self.search_params = search_params()
+        self.hybrid = settings.MATCH_MODE == "hybrid"
 
-    async def insert_item_vector(self, item_id: int, vector: List[float], payload: Dict) -> None:
+    @staticmethod
+    def _build_filter(filter_payload: Optional[Dict], scope: Optional[MatchScope] = None) -> Optional[Filter]:
+        conditions: List[Condition] = [
+            FieldCondition(key=k, match=MatchValue(value=v))
+            for k, v in (filter_payload or {}).items()
+        ]
+        if scope is not None:
+            # Both fields are payload-indexed, so Qdrant narrows to the local, recent slice before HNSW.
+            if scope.location_key is not None:
+                conditions.append(FieldCondition(key=LOCATION_KEY_FIELD, match=MatchValue(value=scope.location_key)))
+            if scope.time_range is not None:
+                start, end = scope.time_range
+                conditions.append(FieldCondition(key=EVENT_AT_FIELD, range=Range(gte=start, lte=end)))
+        if not conditions:
+            return None
+        return Filter(must=conditions)
+
+    @staticmethod
+    def _with_payload(payload_fields: Optional[List[str]]) -> Union[bool, List[str]]:
+        if payload_fields is None:
+            return True
+        return payload_fields or False
+
+    @staticmethod
+    def _to_match(hit: ScoredPoint) -> Dict:
+        return {"id": str(hit.id), "score": hit.score, "payload": hit.payload}
+
+    def _point(self, item_id, vector: List[float], payload: Dict, text: Optional[str]) -> PointStruct:
+        if not self.hybrid:
+            return PointStruct(id=item_id, vector=vector, payload=payload)
+        vectors: Dict = {"": vector}
+        if text:
+            lexical = lexical_vector(text)
+            if lexical.indices:
+                vectors[SPARSE_VECTOR_NAME] = SparseVector(indices=lexical.indices, values=lexical.values)
+        return PointStruct(id=item_id, vector=vectors, payload=payload)
+
+    async def insert_item_vector(
+        self, item_id: int, vector: List[float], payload: Dict, text: Optional[str] = None
+    ) -> None:
         try:
-            point = PointStruct(id=item_id, vector=vector, payload=payload)
+            point = self._point(item_id, vector, payload, text)
             await self.client.upsert(collection_name=self.collection, points=[point])
         except Exception as e:
             logger.error(f"Failed to upsert vector {item_id}: {e}")
             raise
 
+    async def insert_item_vectors(self, items: List[Dict]) -> None:
+        if not items:
+            return
+        try:
+            points = [
+                self._point(item["id"], item["vector"], item["payload"], item.get("text"))
+                for item in items
+            ]
+            batch_size = settings.QDRANT_UPSERT_BATCH_SIZE
+            for start in range(0, len(points), batch_size):
+                await self.client.upsert(
+                    collection_name=self.collection,
+                    points=points[start:start + batch_size],
+                )
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(items)} vectors: {e}")
+            raise
+
+    # ---------- hybrid retrieval ----------
+
+    def _hybrid_request(
+        self, vector: List[float], lexical: LexicalVector, top_k: int, query_filter: Optional[Filter]
+    ) -> Dict:
+        """Dense and sparse candidate lists, fused with reciprocal-rank fusion."""
+        candidates = max(settings.HYBRID_CANDIDATES, top_k)
+        prefetch = [Prefetch(query=vector, filter=query_filter, params=self.search_params, limit=candidates)]
+        if lexical.indices:
+            prefetch.append(Prefetch(
+                query=SparseVector(indices=lexical.indices, values=lexical.values),
+                using=SPARSE_VECTOR_NAME,
+                filter=query_filter,
+                limit=candidates,
+            ))
+        return {"prefetch": prefetch, "query": FusionQuery(fusion=Fusion.RRF), "limit": candidates}
+
+    def _rerank(
+        self,
+        vector: List[float],
+        lexical: LexicalVector,
+        hits: List[ScoredPoint],
+        top_k: int,
+        payload_fields: Optional[List[str]],
+    ) -> List[Dict]:
+        """
+        Rescore the fused candidates in-process: exact cosine against the candidates' dense
+        vectors plus their lexical overlap with the query, both computed for all candidates at once.
+        """
+        if not hits:
+            return []
+        dense = np.asarray([hit.vector[""] for hit in hits], dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32)
+        dense_scores = dense @ query / (np.linalg.norm(dense, axis=1) * np.linalg.norm(query) + 1e-12)
+
+        candidate_lexical = []
+        for hit in hits:
+            sparse = hit.vector.get(SPARSE_VECTOR_NAME)
+            candidate_lexical.append(
+                LexicalVector(indices=list(sparse.indices), values=list(sparse.values)) if sparse else LexicalVector([], [])
+            )
+        lex = lexical_scores(lexical, candidate_lexical)
+        lex_norm = lex / lex.max() if lex.max() > 0 else lex
+
+        weight = settings.HYBRID_DENSE_WEIGHT
+        final = weight * dense_scores + (1 - weight) * lex_norm
+        order = np.argsort(-final)[:top_k]
+        results = []
+        for i in order:
+            hit = hits[i]
+            payload = hit.payload or {}
+            if payload_fields is not None:
+                payload = {k: payload[k] for k in payload_fields if k in payload}
+            results.append({
+                "id": str(hit.id),
+                "score": float(final[i]),
+                "fused_score": hit.score,
+                "dense_score": float(dense_scores[i]),
+                "lexical_score": float(lex[i]),
+                "payload": payload,
+            })
+        return results
+
+    # ---------- search ----------
+
     async def search_similar(
-        self, vector: List[float], top_k: int = 5, filter_payload: Optional[Dict] = None
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        filter_payload: Optional[Dict] = None,
+        payload_fields: Optional[List[str]] = None,
+        query_text: Optional[str] = None,
+        scope: Optional[MatchScope] = None,
     ) -> List[Dict]:
         try:
-            query_filter = None
-            if filter_payload:
-                conditions: List[Condition] = [
-                    FieldCondition(key=k, match=MatchValue(value=v))
-                    for k, v in filter_payload.items()
-                ]
-                query_filter = Filter(must=conditions)
+            query_filter = self._build_filter(filter_payload, scope)
+            if self.hybrid and query_text:
+                lexical = lexical_vector(query_text)
+                response = await self.client.query_points(
+                    collection_name=self.collection,
+                    **self._hybrid_request(vector, lexical, top_k, query_filter),
+                    with_payload=self._with_payload(payload_fields),
+                    with_vectors=True,
+                )
+                return self._rerank(vector, lexical, response.points, top_k, payload_fields)
 
-            hits = await self.client.search(
+            response = await self.client.query_points(
                 collection_name=self.collection,
-                query_vector=vector,
+                query=vector,
                 limit=top_k,
                 query_filter=query_filter,
+                search_params=self.search_params,
+                with_payload=self._with_payload(payload_fields),
+                with_vectors=False,
             )
 
-            return [{"id": str(hit.id), "score": hit.score, "payload": hit.payload} for hit in hits]
+            return [self._to_match(hit) for hit in response.points]
         except Exception as e:
             logger.error(f"Search failed: {e}")
             raise
+
+    async def search_similar_batch(
+        self,
+        vectors: List[List[float]],
+        top_k: int = 5,
+        filter_payload: Optional[Dict] = None,
+        payload_fields: Optional[List[str]] = None,
+        query_texts: Optional[List[str]] = None,
+        scopes: Optional[List[Optional[MatchScope]]] = None,
+    ) -> List[List[Dict]]:
+        if not vectors:
+            return []
+        try:
+            filters = [self._build_filter(filter_payload, scope) for scope in (scopes or [None] * len(vectors))]
+            with_payload = self._with_payload(payload_fields)
+            if self.hybrid and query_texts:
+                lexicals = [lexical_vector(text or "") for text in query_texts]
+                requests = [
+                    QueryRequest(
+                        **self._hybrid_request(vector, lexical, top_k, query_filter),
+                        with_payload=with_payload,
+                        with_vector=True,
+                    )
+                    for vector, lexical, query_filter in zip(vectors, lexicals, filters)
+                ]
+                responses = await self.client.query_batch_points(collection_name=self.collection, requests=requests)
+                return [
+                    self._rerank(vector, lexical, response.points, top_k, payload_fields)
+                    for vector, lexical, response in zip(vectors, lexicals, responses)
+                ]
+
+            requests = [
+                QueryRequest(
+                    query=vector,
+                    limit=top_k,
+                    filter=query_filter,
+                    params=self.search_params,
+                    with_payload=with_payload,
+                    with_vector=False,
+                )
+                for vector, query_filter in zip(vectors, filters)
+            ]
+            # One round-trip for the whole chunk of queries.
+            responses = await self.client.query_batch_points(collection_name=self.collection, requests=requests)
+
+            return [[self._to_match(hit) for hit in response.points] for response in responses]
+        except Exception as e:
+            logger.error(f"Batch search of {len(vectors)} queries failed: {e}")
+            raise
+
+    async def get_vectors(self, item_ids: List[str]) -> Dict[str, List[float]]:
+        if not item_ids:
+            return {}
+        try:
+            records = await self.client.retrieve(
+                collection_name=self.collection,
+                ids=item_ids,
+                with_payload=False,
+                with_vectors=[""] if self.hybrid else True,
+            )
+            return {
+                str(record.id): record.vector[""] if isinstance(record.vector, dict) else record.vector
+                for record in records
+            }
+        except Exception as e:
+            logger.error(f"Failed to retrieve {len(item_ids)} vectors: {e}")
+            raise
@@ -1,24 +1,114 @@
+import mimetypes
+import os
 import uuid
-import asyncio
+from typing import AsyncIterator, BinaryIO, Optional, Union
+from urllib.parse import quote, unquote
+
+import httpx
+
 from app.config.settings import settings
 from app.data_services.base.storage_interface import ImageStorageService
 from app.infra.supabase_client import supabase_client
 
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Leading bytes of the image formats we accept, for when neither the client nor the
+# filename says what the upload is.
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+
+def image_content_type(head: bytes, filename: str, declared: Optional[str] = None) -> str:
+    """Content type for an upload: the declared image type, else sniffed, else guessed from the name."""
+    if declared and declared.startswith("image/"):
+        return declared
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+async def _stream(file: BinaryIO) -> AsyncIterator[bytes]:
+    # Spooled uploads are temp files that were just written, so these are page-cache reads,
+    # too short to be worth handing to a thread.
+    while True:
+        chunk = file.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
 class SupabaseStorageService(ImageStorageService):
-    async def upload_image(self, file_bytes: bytes, filename: str) -> str:
-        loop = asyncio.get_running_loop()
-        client = supabase_client.get_client()
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        path = f"{unique_filename}"
+    """Uploads and downloads through the Storage REST API on the shared pooled HTTP client."""
+
+    def __init__(self, bucket: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
+        self.bucket = bucket or settings.SUPABASE_BUCKET
+        self._client = client
+
+    def _http(self) -> httpx.AsyncClient:
+        return self._client or supabase_client.get_client()
+
+    async def upload_image(
+        self,
+        file_bytes: Union[bytes, BinaryIO],
+        filename: str,
+        content_type: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        client = self._http()
+        # Caller-chosen keys are overwritten in place; generated ones are unique, so never upsert those.
+        upsert = key is not None
+        key = quote(key or f"{uuid.uuid4()}_{filename}")
+
+        if isinstance(file_bytes, bytes):
+            body, size, head = file_bytes, len(file_bytes), file_bytes[:16]
+        elif hasattr(file_bytes, "fileno"):
+            # Stream files from disk instead of reading them into memory first.
+            start = file_bytes.tell()
+            size = os.fstat(file_bytes.fileno()).st_size - start
+            head = file_bytes.read(16)
+            file_bytes.seek(start)
+            body = _stream(file_bytes)
+        else:
+            body = file_bytes.read()
+            size, head = len(body), body[:16]
 
         try:
-            await loop.run_in_executor(
-                None,
-                lambda: client.storage.from_(settings.SUPABASE_BUCKET).upload(
-                    path, file_bytes, {"content-type": "image/jpeg"}
-                ),
+            response = await client.post(
+                f"/object/{self.bucket}/{key}",
+                content=body,
+                headers={
+                    "content-type": image_content_type(head, filename, content_type),
+                    "content-length": str(size),
+                    "cache-control": "max-age=3600",
+                    "x-upsert": "true" if upsert else "false",
+                },
             )
+            response.raise_for_status()
         except Exception as e:
             raise Exception(f"Image upload failed: {e}")
 
-        return client.storage.from_(settings.SUPABASE_BUCKET).get_public_url(path)
+        return supabase_client.public_url(self.bucket, key)
+
+    async def download_image(self, path: str) -> bytes:
+        client = self._http()
+        # upload_image returns the public URL; the object key is whatever follows the bucket name.
+        marker = f"/{self.bucket}/"
+        key = path.split(marker, 1)[1] if marker in path else path
+        key = quote(unquote(key.split("?", 1)[0]))
+
+        try:
+            response = await client.get(f"/object/{self.bucket}/{key}")
+            response.raise_for_status()
+        except Exception as e:
+            raise Exception(f"Image download failed: {e}")
+        return response.content
@@ -1,7 +1,7 @@
 # app/infra/database.py
 import asyncpg
 import logging
-from typing import Optional
+from typing import Dict, Optional
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -34,7 +34,7 @@ class Database:
             try:
                 self._pool = await asyncpg.create_pool(
                     dsn,
-                    min_size=1,
+                    min_size=max(1, min(settings.DB_POOL_MIN_SIZE, settings.DB_POOL_SIZE)),
                     max_size=settings.DB_POOL_SIZE
                 )
                 self._active_dsn = dsn
@@ -65,6 +65,13 @@ class Database:
             raise RuntimeError("Database pool not initialized. Call `await db.init()` first.")
         return self._pool.acquire()
 
+    def pool_stats(self) -> Optional[Dict[str, int]]:
+        """Connection counts of the pool by state, or None before init."""
+        if not self._pool:
+            return None
+        size, idle = self._pool.get_size(), self._pool.get_idle_size()
+        return {"in_use": size - idle, "idle": idle, "max": self._pool.get_max_size()}
+
 # The singleton instance of the Database class.
 # Other parts of the application should import this `db` object.
 db = Database()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FetchBatch = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into one batched embeddings call.
+
+    A batch is sent as soon as `max_batch_size` texts are pending, or `max_wait_ms` after the
+    first text of the batch arrived, whichever comes first. Each caller gets back the vector
+    for its own input; an upstream failure is propagated to every caller in that batch.
+    """
+
+    def __init__(self, fetch_batch: FetchBatch, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self._fetch_batch = fetch_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    async def submit(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Callers that gave up (cancelled) don't need a slot in the upstream request.
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches_sent += 1
+        self.texts_sent += len(batch)
+        try:
+            vectors = await self._fetch_batch([text for text, _ in batch])
+            if len(vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(vectors)}")
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def close(self) -> None:
+        """Send anything still pending and wait for in-flight batches to finish."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches_sent": self.batches_sent,
+            "texts_sent": self.texts_sent,
+            "avg_batch_size": self.texts_sent / self.batches_sent if self.batches_sent else 0.0,
+            "pending": len(self._pending),
+        }
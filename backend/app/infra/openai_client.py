@@ -1,6 +1,140 @@
-from typing import List, Optional
+import asyncio
+import logging
+import random
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
 from app.config.settings import settings
-from openai import AsyncOpenAI
+from app.infra.cache import LRUCache, SingleFlight
+from app.infra.embedding_batcher import EmbeddingBatcher
+from app.infra.rate_limit import AdaptiveConcurrency, TokenBucket, parse_duration
+from app.infra.tracing import OPENAI_CONCURRENCY_LIMIT, OPENAI_IN_FLIGHT, OPENAI_QUEUED, OPENAI_RETRIES, Span
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on inputs per embeddings.create request accepted by the API.
+MAX_EMBEDDING_INPUTS = 2048
+
+# Token estimates charged before a call; corrected from the response's usage afterwards.
+CAPTION_TOKENS_ESTIMATE = 1200  # image (up to ~1100 at detail=auto) + prompt + description
+CHARS_PER_TOKEN = 4
+
+# Statuses worth retrying (the same set the SDK's own retry logic uses).
+RETRYABLE_STATUSES = {408, 409, 429}
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Canonical form used both as the embedding cache key and as the text actually embedded."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    if not headers:
+        return None
+    retry_after_ms = _header_float(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0
+    return _header_float(headers, "retry-after")
+
+
+def _remaining(deadline: float) -> float:
+    return max(deadline - time.monotonic(), 0.0)
+
+
+class ModelRateLimiter:
+    """
+    Client-side limits for one model: request and token budgets (per-minute token buckets,
+    synced from the x-ratelimit-* headers of every response) and an AIMD concurrency limit
+    that shrinks on 429s or an exhausted budget, and grows back while there is headroom.
+    """
+
+    def __init__(self):
+        self.requests = TokenBucket(settings.OPENAI_RPM / 60.0, settings.OPENAI_RPM) if settings.OPENAI_RPM else TokenBucket()
+        self.tokens = TokenBucket(settings.OPENAI_TPM / 60.0, settings.OPENAI_TPM) if settings.OPENAI_TPM else TokenBucket()
+        self.concurrency = AdaptiveConcurrency(
+            settings.OPENAI_CONCURRENCY_INITIAL, settings.OPENAI_CONCURRENCY_MIN, settings.OPENAI_CONCURRENCY_MAX
+        )
+        self.throttled = 0
+        self._tokens_in_flight = 0
+
+    async def acquire(self, tokens: int, deadline: float) -> None:
+        await self.requests.acquire(1, _remaining(deadline))
+        try:
+            await self.tokens.acquire(tokens, _remaining(deadline))
+        except BaseException:
+            self.requests.adjust(-1)
+            raise
+        try:
+            await self.concurrency.acquire(_remaining(deadline))
+        except BaseException:
+            self.requests.adjust(-1)
+            self.tokens.adjust(-tokens)
+            raise
+        self._tokens_in_flight += tokens
+
+    def release(self, tokens: int) -> None:
+        self._tokens_in_flight -= tokens
+        self.concurrency.release()
+
+    def _sync(self, headers: Mapping[str, str], tokens: int) -> Tuple[bool, bool]:
+        """
+        Adopt the reported budgets; returns (a budget is exhausted, a budget is running low).
+        The headers describe the budget when this call was admitted, so the other calls still
+        in flight (admitted since, or about to be) are taken off what they report as remaining.
+        """
+        exhausted = low = False
+        others = {
+            "requests": self.concurrency.in_flight - 1,
+            "tokens": self._tokens_in_flight - tokens,
+        }
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = _header_float(headers, f"x-ratelimit-limit-{kind}")
+            remaining = _header_float(headers, f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            bucket.sync(limit, None if remaining is None else remaining - max(others[kind], 0), reset)
+            if limit and remaining is not None:
+                exhausted = exhausted or remaining <= 0
+                low = low or remaining < limit * settings.OPENAI_HEADROOM_FRACTION
+        return exhausted, low
+
+    def on_success(self, headers: Mapping[str, str], tokens: int, token_correction: int) -> None:
+        self.tokens.adjust(token_correction)
+        exhausted, low = self._sync(headers, tokens)
+        # Near the limit the buckets already pace calls, so only an empty budget shrinks
+        # concurrency; growing it back waits until there is headroom again.
+        if exhausted:
+            self.concurrency.on_congestion()
+        elif not low:
+            self.concurrency.on_success()
+
+    def on_throttled(self, headers: Optional[Mapping[str, str]], tokens: int) -> None:
+        self.throttled += 1
+        if headers:
+            self._sync(headers, tokens)
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            # A 429 that doesn't say what is left means the budget is spent as far as we know.
+            if not headers or _header_float(headers, f"x-ratelimit-remaining-{kind}") is None:
+                bucket.drain()
+        self.concurrency.on_congestion()
+
+    def stats(self) -> Dict:
+        return {
+            **self.concurrency.stats(),
+            "throttled": self.throttled,
+            "requests_per_minute": round(self.requests.rate * 60) if self.requests.rate else None,
+            "requests_available": round(self.requests.level, 1) if self.requests.rate else None,
+            "tokens_per_minute": round(self.tokens.rate * 60) if self.tokens.rate else None,
+            "tokens_available": round(self.tokens.level) if self.tokens.rate else None,
+        }
+
 
 class OpenAIClient:
     _client: Optional[AsyncOpenAI] = None
@@ -8,40 +142,84 @@ class OpenAIClient:
     Someone found this item and submitted a photo to a lost-and-found system. Write a clear, specific description of the item to help its owner recognize it. Include what the item is, its color, material, any logos, text, or labels, and any visible signs of wear, damage, or customization. Ignore the background. Keep the description under 500 characters.
     """
 
+    def __init__(self):
+        self._embedding_cache = LRUCache(
+            settings.EMBED_CACHE_SIZE, ttl_seconds=settings.EMBED_CACHE_TTL_SECONDS or None
+        )
+        self._embedding_flight = SingleFlight()
+        self._batcher: Optional[EmbeddingBatcher] = None
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+        self.calls = 0
+        self.retries = 0
+        self.deadline_exceeded = 0
+
     async def init(self) -> None:
         """Initialize AsyncOpenAI client (call once at startup or will be lazy-initialized)."""
         if self._client:
             return
-        # creating AsyncOpenAI is synchronous, but keep init async for symmetry with infra clients
-        self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # creating AsyncOpenAI is synchronous, but keep init async for symmetry with infra clients.
+        # Retries are handled by `_request` (limiter-aware, bounded by the call deadline).
+        self._client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL or None, max_retries=0
+        )
+        if settings.EMBED_BATCHING_ENABLED:
+            model = settings.OPENAI_EMBED_MODEL
+            self._batcher = EmbeddingBatcher(
+                lambda texts: self._create_embeddings(model, texts),
+                max_batch_size=min(settings.EMBED_BATCH_MAX_SIZE, MAX_EMBEDDING_INPUTS),
+                max_wait_ms=settings.EMBED_BATCH_MAX_WAIT_MS,
+            )
 
     def get_client(self) -> AsyncOpenAI:
         if not self._client:
             raise RuntimeError("OpenAI client not initialized. Call `await openai_client.init()` first.")
         return self._client
+
+    async def warm(self, connections: int) -> None:
+        """
+        Open `connections` keep-alive connections (TCP and TLS) ahead of the first real call,
+        with concurrent model lookups, which cost no tokens.
+        """
+        client = self.get_client()
+
+        async def touch() -> None:
+            try:
+                await client.models.retrieve(settings.OPENAI_MODEL, timeout=settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+            except APIStatusError:
+                pass  # any HTTP answer means the connection is up
+
+        await asyncio.gather(*(touch() for _ in range(connections)))
     
-    async def caption_image_base64(self, image_base64: bytes, prompt: str = default_prompt) -> str:
+    async def caption_image_base64(
+        self, image_base64: bytes, prompt: str = default_prompt, mime_type: str = "image/jpeg"
+    ) -> str:
         """
         Use GPT-4o (or other OpenAI vision model) to caption the image.
         """
         client = self.get_client()
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt.strip()},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64.decode()}"
+        response = await self._request(
+            "chat",
+            settings.OPENAI_MODEL,
+            CAPTION_TOKENS_ESTIMATE + len(prompt) // CHARS_PER_TOKEN,
+            lambda timeout: client.chat.completions.with_raw_response.create(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt.strip()},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:{mime_type};base64,{image_base64.decode()}"
+                                },
                             },
-                        },
-                    ],
-                }
-            ],
-            temperature=0.2,
+                        ],
+                    }
+                ],
+                temperature=0.2,
+                timeout=timeout,
+            ),
         )
 
         content = response.choices[0].message.content
@@ -50,18 +228,188 @@ class OpenAIClient:
         return content.strip()
 
 
-    async def get_text_embedding(self,text: str) -> List[float]:
+    async def get_text_embedding(self, text: str) -> List[float]:
         """
         Get a text embedding from OpenAI using the configured model.
+        Results are cached by (model, normalized text), and concurrent requests for the same
+        text share a single upstream call.
+        """
+        normalized = normalize_embedding_text(text)
+        key: Tuple[str, str] = (settings.OPENAI_EMBED_MODEL, normalized)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        embedding = await self._embedding_flight.do(key, lambda: self._fetch_embedding(key))
+        return list(embedding)
+
+    async def get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts at once, in input order. Cached texts are served locally and the rest
+        are sent in as few embeddings.create calls as the API allows.
         """
+        model = settings.OPENAI_EMBED_MODEL
+        keys = [(model, normalize_embedding_text(t)) for t in texts]
+        results: Dict[Tuple[str, str], Tuple[float, ...]] = {}
+        missing: List[str] = []
+        seen = set()
+        for key in keys:
+            if key in seen:
+                continue
+            seen.add(key)
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                missing.append(key[1])
+
+        for start in range(0, len(missing), MAX_EMBEDDING_INPUTS):
+            chunk = missing[start:start + MAX_EMBEDDING_INPUTS]
+            vectors = await self._create_embeddings(model, chunk)
+            for text, vector in zip(chunk, vectors):
+                key = (model, text)
+                results[key] = tuple(vector)
+                self._embedding_cache.set(key, results[key])
+
+        return [list(results[key]) for key in keys]
+
+    async def _fetch_embedding(self, key: Tuple[str, str]) -> Tuple[float, ...]:
+        model, text = key
+        if self._batcher is not None:
+            vector = await self._batcher.submit(text)
+        else:
+            vector = (await self._create_embeddings(model, [text]))[0]
+        embedding = tuple(vector)
+        self._embedding_cache.set(key, embedding)
+        return embedding
+
+    async def _create_embeddings(self, model: str, texts: List[str]) -> List[List[float]]:
         client = self.get_client()
-        response = await client.embeddings.create(
-            model=settings.OPENAI_EMBED_MODEL,  # e.g. "text-embedding-3-small"
-            input=text,
+        response = await self._request(
+            "embeddings",
+            model,
+            sum(len(text) // CHARS_PER_TOKEN + 1 for text in texts),
+            lambda timeout: client.embeddings.with_raw_response.create(
+                model=model,  # e.g. "text-embedding-3-small"
+                input=texts,
+                timeout=timeout,
+            ),
         )
-        return response.data[0].embedding
+        # The API returns one item per input, tagged with its position.
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    def _limiter(self, model: str) -> Optional[ModelRateLimiter]:
+        if not settings.OPENAI_LIMITER_ENABLED:
+            return None
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = self._limiters[model] = ModelRateLimiter()
+        return limiter
+
+    async def _request(
+        self,
+        operation: str,
+        model: str,
+        estimated_tokens: int,
+        create: Callable[[float], Awaitable[Any]],
+        deadline_seconds: Optional[float] = None,
+    ) -> Any:
+        """
+        Run one API call (`create(timeout)` returning a raw response) through the model's
+        limiter, retrying throttled, timed-out and 5xx attempts with jittered exponential
+        backoff (or the server's retry-after). Queueing, attempts and backoff all count against
+        the deadline; TimeoutError if it passes while queued, otherwise the last error is raised.
+        Queueing and each attempt are traced as "openai.<operation>.queue" / "openai.<operation>".
+        """
+        deadline = time.monotonic() + (deadline_seconds or settings.OPENAI_DEADLINE_SECONDS)
+        limiter = self._limiter(model)
+        in_flight, queued = OPENAI_IN_FLIGHT.labels(model), OPENAI_QUEUED.labels(model)
+        self.calls += 1
+        attempt = 0
+        while True:
+            if limiter is not None:
+                queued.inc()
+                try:
+                    with Span(f"openai.{operation}.queue", model):
+                        await limiter.acquire(estimated_tokens, deadline)
+                except TimeoutError:
+                    self.deadline_exceeded += 1
+                    raise
+                finally:
+                    queued.dec()
+            try:
+                in_flight.inc()
+                try:
+                    with Span(f"openai.{operation}", model):
+                        raw = await create(max(_remaining(deadline), 0.001))
+                finally:
+                    in_flight.dec()
+                response = raw.parse()
+            except (APIStatusError, APIConnectionError) as e:
+                headers = e.response.headers if isinstance(e, APIStatusError) else None
+                status = e.status_code if isinstance(e, APIStatusError) else None
+                if limiter is not None and status == 429:
+                    limiter.on_throttled(headers, estimated_tokens)
+                # An exhausted quota is a 429 too, but waiting doesn't fix it.
+                retryable = (status is None or status in RETRYABLE_STATUSES or status >= 500) and getattr(
+                    e, "code", None
+                ) != "insufficient_quota"
+                if not retryable or attempt >= settings.OPENAI_MAX_RETRIES:
+                    raise
+                delay = self._backoff(attempt, _retry_after(headers))
+                if delay >= _remaining(deadline):
+                    self.deadline_exceeded += 1
+                    raise
+                logger.warning(f"OpenAI {model} call failed ({status or type(e).__name__}); retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if limiter is not None:
+                    usage = getattr(response, "usage", None)
+                    actual = getattr(usage, "total_tokens", None)
+                    limiter.on_success(raw.headers, estimated_tokens, actual - estimated_tokens if actual is not None else 0)
+                return response
+            finally:
+                if limiter is not None:
+                    limiter.release(estimated_tokens)
+            attempt += 1
+            self.retries += 1
+            OPENAI_RETRIES.labels(model).inc()
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return retry_after + random.uniform(0, settings.OPENAI_RETRY_BASE_SECONDS)
+        # Full jitter keeps throttled callers from retrying in lockstep.
+        return random.uniform(0, min(settings.OPENAI_RETRY_MAX_SECONDS, settings.OPENAI_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    def update_gauges(self) -> None:
+        """Refresh the scrape-time limiter gauges."""
+        for model, limiter in self._limiters.items():
+            OPENAI_CONCURRENCY_LIMIT.labels(model).set(limiter.concurrency.limit)
+
+    def limiter_stats(self) -> Dict:
+        return {
+            "enabled": settings.OPENAI_LIMITER_ENABLED,
+            "calls": self.calls,
+            "retries": self.retries,
+            "deadline_exceeded": self.deadline_exceeded,
+            "models": {model: limiter.stats() for model, limiter in self._limiters.items()},
+        }
+
+    def embedding_cache_stats(self) -> Dict:
+        return {
+            **self._embedding_cache.stats.as_dict(),
+            "size": len(self._embedding_cache),
+            "max_size": self._embedding_cache.max_size,
+            "upstream_calls": self._embedding_flight.started,
+            "deduplicated_calls": self._embedding_flight.shared,
+            "in_flight": len(self._embedding_flight),
+            "batching": self._batcher.stats() if self._batcher else None,
+        }
 
     async def close(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.close()
+            self._batcher = None
         # AsyncOpenAI doesn't require explicit close, but null it for cleanup
         self._client = None
 
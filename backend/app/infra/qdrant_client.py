@@ -1,10 +1,75 @@
+import asyncio
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 from qdrant_client.async_qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    HnswConfigDiff,
+    Modifier,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseVectorParams,
+    VectorParams,
+)
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Named sparse vector holding lexical (BM25-style) term weights for hybrid matching.
+SPARSE_VECTOR_NAME = "text"
+
+# Output dimensions of the OpenAI embedding models we may be configured with.
+EMBEDDING_DIMENSIONS: Dict[str, int] = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+def vector_size() -> int:
+    if settings.QDRANT_VECTOR_SIZE:
+        return settings.QDRANT_VECTOR_SIZE
+    try:
+        return EMBEDDING_DIMENSIONS[settings.OPENAI_EMBED_MODEL]
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown vector size for embedding model '{settings.OPENAI_EMBED_MODEL}'. Set QDRANT_VECTOR_SIZE."
+        )
+
+
+def quantization_config() -> Optional[ScalarQuantization]:
+    if settings.QDRANT_QUANTIZATION == "none":
+        return None
+    if settings.QDRANT_QUANTIZATION != "int8":
+        raise RuntimeError(f"Unsupported QDRANT_QUANTIZATION '{settings.QDRANT_QUANTIZATION}'. Use 'int8' or 'none'.")
+    # Quantized vectors stay in RAM while the float32 originals live on disk for rescoring.
+    return ScalarQuantization(
+        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+    )
+
+
+def sparse_vectors_config() -> Optional[Dict[str, SparseVectorParams]]:
+    if settings.MATCH_MODE != "hybrid":
+        return None
+    # Qdrant maintains collection-wide document frequencies and applies IDF at query time.
+    return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def search_params() -> Optional[SearchParams]:
+    """Search-time parameters matching the collection's quantization setup."""
+    if settings.QDRANT_QUANTIZATION == "none":
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=settings.QDRANT_QUANTIZATION_RESCORE,
+            oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING,
+        )
+    )
+
 
 class QdrantClient:
     _client: Optional[AsyncQdrantClient] = None
@@ -14,17 +79,90 @@ class QdrantClient:
         if self._client:
             return
         try:
-            self._client = AsyncQdrantClient(
-                url=settings.QDRANT_URL,
-                api_key=settings.QDRANT_API_KEY,
-            )
+            if settings.QDRANT_URL == ":memory:":
+                # Embedded local mode for tests and offline benchmarks (no server, no payload indexes).
+                self._client = AsyncQdrantClient(location=":memory:")
+            else:
+                self._client = AsyncQdrantClient(
+                    url=settings.QDRANT_URL,
+                    api_key=settings.QDRANT_API_KEY,
+                    # gRPC avoids JSON encoding of float vectors and multiplexes calls over one HTTP/2 connection.
+                    prefer_grpc=settings.QDRANT_PREFER_GRPC,
+                    grpc_port=settings.QDRANT_GRPC_PORT,
+                )
             # Quick health check
             await self._client.get_collections()
-            logger.info("Connected to Qdrant successfully.")
+            transport = "gRPC" if settings.QDRANT_PREFER_GRPC else "REST"
+            logger.info(f"Connected to Qdrant successfully ({transport}).")
+            if settings.QDRANT_MANAGE_COLLECTION:
+                await self.ensure_collection(settings.QDRANT_COLLECTION)
         except Exception as e:
             logger.error(f"Failed to connect to Qdrant: {e}")
             raise
 
+    async def warm(self, connections: int) -> None:
+        """Open keep-alive REST connections before traffic arrives (gRPC multiplexes over one channel)."""
+        if settings.QDRANT_URL == ":memory:":
+            return
+        client = self.get_client()
+        count = 1 if settings.QDRANT_PREFER_GRPC else connections
+        await asyncio.gather(*(client.collection_exists(settings.QDRANT_COLLECTION) for _ in range(count)))
+
+    async def ensure_collection(self, name: str) -> None:
+        """
+        Create the collection from settings if it is missing, otherwise verify that its vector
+        size and distance match what we will write. Missing keyword payload indexes are created
+        either way, since every search filters on them.
+        """
+        client = self.get_client()
+        size = vector_size()
+        distance = Distance(settings.QDRANT_DISTANCE)
+
+        if not await client.collection_exists(name):
+            await client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=size, distance=distance, on_disk=settings.QDRANT_ON_DISK_VECTORS),
+                hnsw_config=HnswConfigDiff(m=settings.QDRANT_HNSW_M, ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT),
+                quantization_config=quantization_config(),
+                sparse_vectors_config=sparse_vectors_config(),
+            )
+            logger.info(f"Created Qdrant collection '{name}' (size={size}, distance={distance.value}).")
+        else:
+            info = await client.get_collection(name)
+            vectors = info.config.params.vectors
+            if isinstance(vectors, VectorParams):
+                if vectors.size != size or vectors.distance != distance:
+                    raise RuntimeError(
+                        f"Qdrant collection '{name}' has size={vectors.size}, distance={vectors.distance}; "
+                        f"expected size={size}, distance={distance.value}."
+                    )
+            hnsw = info.config.hnsw_config
+            if hnsw.m != settings.QDRANT_HNSW_M or hnsw.ef_construct != settings.QDRANT_HNSW_EF_CONSTRUCT:
+                logger.warning(
+                    f"Qdrant collection '{name}' uses HNSW m={hnsw.m}, ef_construct={hnsw.ef_construct}; "
+                    f"settings ask for m={settings.QDRANT_HNSW_M}, ef_construct={settings.QDRANT_HNSW_EF_CONSTRUCT}."
+                )
+            if sparse_vectors_config() and SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+                raise RuntimeError(
+                    f"MATCH_MODE=hybrid needs a sparse vector '{SPARSE_VECTOR_NAME}' in Qdrant collection '{name}'. "
+                    f"Recreate the collection (or use a new QDRANT_COLLECTION) and re-index."
+                )
+            if (info.config.quantization_config is None) != (quantization_config() is None):
+                logger.warning(f"Qdrant collection '{name}' quantization differs from QDRANT_QUANTIZATION.")
+
+        await self.ensure_payload_indexes(name, settings.QDRANT_KEYWORD_INDEXES, PayloadSchemaType.KEYWORD)
+        await self.ensure_payload_indexes(name, settings.QDRANT_FLOAT_INDEXES, PayloadSchemaType.FLOAT)
+
+    async def ensure_payload_indexes(self, name: str, fields: List[str], schema: PayloadSchemaType) -> None:
+        client = self.get_client()
+        info = await client.get_collection(name)
+        existing = set((info.payload_schema or {}).keys())
+        for field in fields:
+            if field in existing:
+                continue
+            await client.create_payload_index(collection_name=name, field_name=field, field_schema=schema)
+            logger.info(f"Created {schema.value} payload index on '{field}' in '{name}'.")
+
     def get_client(self) -> AsyncQdrantClient:
         if not self._client:
             raise RuntimeError("Qdrant client not initialized. Call init() first.")
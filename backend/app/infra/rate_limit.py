@@ -0,0 +1,195 @@
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate-limit reset header ("1s", "6m0s", "20ms", "1h2m3.5s"); None if unparseable."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Token bucket with `capacity` tokens refilled at `rate` tokens/second. A bucket with no
+    rate yet (limit not known) never blocks. Waiters are served in arrival order, and a
+    request larger than the capacity waits for a full bucket rather than forever.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._level = self.capacity or 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate:
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def level(self) -> Optional[float]:
+        if not self.rate:
+            return None
+        self._refill()
+        return self._level
+
+    async def acquire(self, amount: float, timeout: Optional[float] = None) -> None:
+        """Take `amount` tokens, waiting for the refill; TimeoutError if that takes over `timeout` seconds."""
+        if not self.rate:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(self._lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timed out queueing for rate-limit budget") from None
+        try:
+            while True:
+                self._refill()
+                if not self.rate:
+                    return
+                needed = min(amount, self.capacity)
+                if self._level >= needed:
+                    self._level -= amount
+                    return
+                wait = (needed - self._level) / self.rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    raise TimeoutError(f"Rate-limit budget not available within {timeout:.2f}s")
+                await asyncio.sleep(wait)
+        finally:
+            self._lock.release()
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact; the level may go negative."""
+        if not self.rate:
+            return
+        self._refill()
+        self._level = min(self.capacity, self._level - amount)
+
+    def sync(
+        self,
+        limit: Optional[float],
+        remaining: Optional[float],
+        reset_seconds: Optional[float] = None,
+        window_seconds: float = 60.0,
+    ) -> None:
+        """
+        Adopt a server-reported limit (per `window_seconds`) and cap the level at what it says is
+        left. `reset_seconds`, the time until the server's budget is full again, caps the level
+        so that refilling at `rate` reaches the capacity no sooner than the server's does.
+        """
+        if limit:
+            self._refill()
+            if not self.rate:
+                self._level = limit
+            self.rate = limit / window_seconds
+            self.capacity = limit
+        if remaining is not None and self.rate:
+            self._refill()
+            self._level = min(self._level, remaining)
+        if reset_seconds is not None and self.rate:
+            self._refill()
+            self._level = min(self._level, self.capacity - reset_seconds * self.rate)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after a 429, so the next acquire waits for the refill."""
+        if self.rate:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted by AIMD: each success while the limit is in use adds
+    1/limit (about +1 per round of requests), each congestion signal multiplies the limit by
+    `backoff`. Decreases are spaced at least `cooldown` seconds apart, so a burst of 429s from
+    one overloaded window counts once.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, backoff: float = 0.5, cooldown: float = 1.0):
+        if not 1 <= minimum <= maximum:
+            raise ValueError("need 1 <= minimum <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _slots(self) -> int:
+        return max(int(self.limit), 1)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        if self.in_flight < self._slots() and not self._waiters:
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._discard(future)
+            raise TimeoutError("Timed out waiting for a concurrency slot") from None
+        except BaseException:
+            self._discard(future)
+            raise
+
+    def _discard(self, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # The slot was granted just as the waiter gave up.
+            self.release()
+        elif future in self._waiters:
+            self._waiters.remove(future)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self._slots():
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def on_success(self) -> None:
+        # Only grow when the current limit is actually the bottleneck.
+        if self.in_flight + 1 >= self._slots() and self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self.increases += 1
+            self._wake()
+
+    def on_congestion(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        self.decreases += 1
+
+    def stats(self) -> Dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from app.config.settings import settings
+from app.infra.cache import LRUCache, SingleFlight
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True when an If-None-Match header names this entry's ETag (weak comparison)."""
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or self.etag in candidates
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses with strong ETags, in a TTL + LRU cache.
+
+    Each entry is registered under one or more tags ("found_item:<id>", "lost_reports", ...)
+    and the repository calls `invalidate` with the tags a write touches. Writes made by other
+    processes are only picked up when the TTL expires. Concurrent misses for the same key
+    share one load, unless a write lands between them.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float]):
+        self._entries = LRUCache(max_size, ttl_seconds)
+        self._tags: Dict[str, Set[str]] = {}
+        self._tagged_keys = 0
+        self._loads = SingleFlight()
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    @staticmethod
+    def serialize(value: Any) -> CachedResponse:
+        body = json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+        return CachedResponse(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+    def set(self, key: str, value: Any, tags: Iterable[str]) -> CachedResponse:
+        entry = self.serialize(value)
+        self._entries.set(key, entry)
+        for tag in tags:
+            keys = self._tags.setdefault(tag, set())
+            if key not in keys:
+                keys.add(key)
+                self._tagged_keys += 1
+        if self._tagged_keys > 4 * max(self._entries.max_size, 1):
+            self._prune_tags()
+        return entry
+
+    async def get_or_load(
+        self, key: str, load: Callable[[], Awaitable[Any]], tags: Callable[[Any], Iterable[str]]
+    ) -> Optional[CachedResponse]:
+        """
+        Cached entry for `key`, loading and caching it on a miss under `tags(value)`.
+        A None value (e.g. not found) is not cached.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        invalidations = self.invalidations
+
+        async def load_and_store() -> Optional[CachedResponse]:
+            value = await load()
+            if value is None:
+                return None
+            if self.invalidations != invalidations:
+                # A write landed while loading; serve this result but don't cache it.
+                return self.serialize(value)
+            return self.set(key, value, tags(value))
+
+        # Keyed on the invalidation count too, so a request arriving after a write never joins
+        # a load that started before it (and would return the pre-write body).
+        return await self._loads.do((key, invalidations), load_and_store)
+
+    def invalidate(self, *tags: str) -> None:
+        # Counted even when nothing is cached under the tag, so in-flight loads see the write.
+        self.invalidations += len(tags)
+        for tag in tags:
+            keys = self._tags.pop(tag, None)
+            if not keys:
+                continue
+            self._tagged_keys -= len(keys)
+            for key in keys:
+                self._entries.delete(key)
+
+    def _prune_tags(self) -> None:
+        # Evicted and expired entries leave their keys behind in the tag index; drop those.
+        for tag in list(self._tags):
+            live = {key for key in self._tags[tag] if key in self._entries}
+            self._tagged_keys -= len(self._tags[tag]) - len(live)
+            if live:
+                self._tags[tag] = live
+            else:
+                del self._tags[tag]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._tagged_keys = 0
+
+    def stats(self) -> Dict:
+        return {
+            **self._entries.stats.as_dict(),
+            "size": len(self._entries),
+            "tags": len(self._tags),
+            "invalidations": self.invalidations,
+            "loads_shared": self._loads.shared,
+        }
+
+
+# Singleton
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS or None)
@@ -1,38 +1,78 @@
+import asyncio
 import logging
 from typing import Optional
-from supabase import create_client, Client
+
+import httpx
+
 from app.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+def create_storage_http_client() -> httpx.AsyncClient:
+    """An httpx client for the project's Storage API, pooled and authenticated per settings."""
+    return httpx.AsyncClient(
+        base_url=f"{settings.SUPABASE_PROJECT_URL.rstrip('/')}/storage/v1",
+        headers={
+            # use service role for backend ops
+            "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+            "apikey": settings.SUPABASE_KEY,
+        },
+        http2=settings.STORAGE_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.STORAGE_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(settings.STORAGE_TIMEOUT_SECONDS, connect=settings.STORAGE_CONNECT_TIMEOUT_SECONDS),
+    )
+
+
 class SupabaseClient:
-    _client: Optional[Client] = None
+    """
+    Long-lived HTTP client for the Supabase Storage REST API: one keep-alive (HTTP/2 when
+    enabled) connection pool shared by every upload and download, authenticated with the
+    service key.
+    """
 
-    def init(self) -> None:
-        """Initialize the Supabase client."""
+    _client: Optional[httpx.AsyncClient] = None
+
+    async def init(self) -> None:
+        """Create the pooled Storage API client."""
         if self._client:
             return
+        if not settings.SUPABASE_PROJECT_URL:
+            raise RuntimeError("SUPABASE_PROJECT_URL is not set.")
 
         try:
-            self._client = create_client(
-                settings.SUPABASE_PROJECT_URL,
-                settings.SUPABASE_KEY  # use service role for backend ops
-            )
-            logger.info("Supabase client initialized successfully.")
+            self._client = create_storage_http_client()
+            logger.info("Supabase storage client initialized successfully.")
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             raise
 
-    def get_client(self) -> Client:
+    def get_client(self) -> httpx.AsyncClient:
         if not self._client:
-            raise RuntimeError("Supabase client not initialized. Call `supabase_client.init()` first.")
+            raise RuntimeError("Supabase client not initialized. Call `await supabase_client.init()` first.")
         return self._client
 
-    def close(self) -> None:
-        """No-op because supabase-py is HTTP based (no persistent connections)."""
-        self._client = None
-        logger.info("Supabase client closed.")
+    async def warm(self, connections: int) -> None:
+        """Open keep-alive connections to the Storage API (one suffices over HTTP/2) before traffic arrives."""
+        client = self.get_client()
+        # Any HTTP answer, even an error status, means the connection is up.
+        await asyncio.gather(
+            *(client.get(f"/bucket/{settings.SUPABASE_BUCKET}") for _ in range(1 if settings.STORAGE_HTTP2 else connections))
+        )
+
+    def public_url(self, bucket: str, key: str) -> str:
+        return f"{settings.SUPABASE_PROJECT_URL.rstrip('/')}/storage/v1/object/public/{bucket}/{key}"
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Supabase client closed.")
 
 
 # Singleton instance
@@ -0,0 +1,216 @@
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Spans finished during the current HTTP request, as (name, seconds); None outside requests.
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "foundit_stage_duration_seconds",
+    "Duration of service calls, by stage (component.method), backend and outcome.",
+    ["stage", "backend", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "foundit_http_request_duration_seconds",
+    "HTTP request duration by route template, method and status.",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+OPENAI_IN_FLIGHT = Gauge("foundit_openai_in_flight", "OpenAI API calls currently on the wire.", ["model"])
+OPENAI_QUEUED = Gauge("foundit_openai_queued", "OpenAI calls waiting for the rate limiter.", ["model"])
+OPENAI_CONCURRENCY_LIMIT = Gauge("foundit_openai_concurrency_limit", "Current adaptive concurrency limit.", ["model"])
+OPENAI_RETRIES = Counter("foundit_openai_retries", "Retried OpenAI call attempts.", ["model"])
+DB_POOL_CONNECTIONS = Gauge("foundit_db_pool_connections", "asyncpg pool connections by state.", ["state"])
+OUTBOX_APPLY_SECONDS = Histogram(
+    "foundit_outbox_apply_seconds",
+    "Duration of each batched upsert the outbox relay sends to the vector index, by outcome.",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOX_APPLY_ITEMS = Histogram(
+    "foundit_outbox_apply_items",
+    "Items per batched upsert the outbox relay sends to the vector index.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+STARTUP_SECONDS = Gauge("foundit_startup_seconds", "Duration of each startup phase of this process.", ["phase"])
+
+
+_histograms: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+
+def _stage_histograms(name: str, backend: str) -> Tuple[Any, Any]:
+    """(ok, error) histogram children for a stage; resolved once, so observing is one call."""
+    children = _histograms.get((name, backend))
+    if children is None:
+        children = _histograms[(name, backend)] = (
+            STAGE_SECONDS.labels(name, backend, "ok"),
+            STAGE_SECONDS.labels(name, backend, "error"),
+        )
+    return children
+
+
+class Span:
+    """
+    Times a `with` block as stage `name` on `backend`. The observation goes to the stage
+    histogram and, inside an HTTP request, to that request's Server-Timing header.
+    """
+
+    __slots__ = ("name", "_ok", "_error", "_started")
+
+    def __init__(self, name: str, backend: str):
+        self.name = name
+        self._ok, self._error = _stage_histograms(name, backend)
+        self._started = 0.0
+
+    def __enter__(self) -> "Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _record(self.name, self._error if exc_type else self._ok, time.perf_counter() - self._started)
+
+
+def _record(name: str, histogram, seconds: float) -> None:
+    histogram.observe(seconds)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+def _traced_coroutine(fn: Callable, name: str, backend: str) -> Callable:
+    ok, error = _stage_histograms(name, backend)
+
+    async def call(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException:
+            _record(name, error, time.perf_counter() - started)
+            raise
+        _record(name, ok, time.perf_counter() - started)
+        return result
+
+    return call
+
+
+class _TracedContext:
+    """Times an async context manager (e.g. a unit of work) and traces what it yields."""
+
+    def __init__(self, context: Any, name: str, component: str, backend: str):
+        self._context = context
+        self._span = Span(name, backend)
+        self._component = component
+        self._backend = backend
+
+    async def __aenter__(self):
+        self._span.__enter__()
+        try:
+            value = await self._context.__aenter__()
+        except BaseException as e:
+            self._span.__exit__(type(e), e, None)
+            raise
+        return Traced(value, self._component, self._backend) if value is not None else None
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self._context.__aexit__(exc_type, exc, tb)
+        finally:
+            self._span.__exit__(exc_type, exc, tb)
+
+
+def _traced_callable(fn: Callable, name: str, component: str, backend: str) -> Callable:
+    def call(*args, **kwargs):
+        result = fn(*args, **kwargs)
+        if hasattr(result, "__aenter__"):
+            return _TracedContext(result, name, component, backend)
+        return result
+
+    return call
+
+
+class Traced:
+    """
+    Proxy that records every coroutine method call (and async context manager returned by
+    a method) on `target` as stage "<component>.<method>". Other attributes pass through.
+    Wrappers are built on first access and cached on the proxy.
+    """
+
+    def __init__(self, target: Any, component: str, backend: str):
+        self.__dict__["_target"] = target
+        self.__dict__["_component"] = component
+        self.__dict__["_backend"] = backend
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._target, attr)
+        if attr.startswith("_") or not callable(value):
+            return value
+        name = f"{self._component}.{attr}"
+        if inspect.iscoroutinefunction(value):
+            wrapped = _traced_coroutine(value, name, self._backend)
+        else:
+            wrapped = _traced_callable(value, name, self._component, self._backend)
+        self.__dict__[attr] = wrapped
+        return wrapped
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._target, attr, value)
+
+    def __repr__(self) -> str:
+        return f"Traced({self._target!r})"
+
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing header value; repeated stages are summed, with the call count as desc."""
+    totals: Dict[str, List[float]] = {}
+    for name, seconds in spans:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = [
+        f'{name};dur={seconds * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+        for name, (seconds, count) in totals.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the spans of each HTTP request into a Server-Timing response header and records
+    the request duration by route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: List[Tuple[str, float]] = []
+        token = _request_spans.set(spans)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(spans, time.perf_counter() - started).encode("latin-1")
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+            # The route template (not the raw path) keeps label cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(route, scope["method"], str(status)).observe(time.perf_counter() - started)
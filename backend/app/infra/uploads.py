@@ -0,0 +1,160 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Iterable, Optional, Union
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class SpooledImage:
+    """
+    An uploaded image held in memory when small, or in a named temp file once it grows
+    past the spool threshold. The content hash is computed while the data streams in,
+    so the full image never has to be in memory just to be hashed.
+
+    Call `close()` when done to remove the temp file.
+    """
+
+    def __init__(self, filename: str, content_type: Optional[str] = None):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self.path: Optional[str] = None
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file: Optional[BinaryIO] = None
+        self._hash = hashlib.sha256()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str, content_type: Optional[str] = None) -> "SpooledImage":
+        image = cls(filename, content_type)
+        image._write(data, spool_threshold=len(data))
+        image._finish()
+        return image
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def _write(self, chunk: bytes, spool_threshold: int) -> None:
+        self.size += len(chunk)
+        self._hash.update(chunk)
+        if self._buffer is not None and self.size > spool_threshold:
+            handle, self.path = tempfile.mkstemp(prefix="upload_", suffix=os.path.splitext(self.filename)[1])
+            self._file = os.fdopen(handle, "wb")
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+        if self._buffer is not None:
+            self._buffer.write(chunk)
+        else:
+            self._file.write(chunk)
+
+    def _finish(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read_bytes(self) -> bytes:
+        """Materialize the whole image in memory. Prefer `open()` or `path` for large images."""
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def open(self) -> Union[bytes, BinaryIO]:
+        """The image as bytes when in memory, otherwise as a buffered reader over the temp file."""
+        if self._buffer is not None:
+            return self._buffer.getvalue()
+        return open(self.path, "rb")
+
+    def close(self) -> None:
+        self._finish()
+        self._buffer = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, spool_threshold: int) -> SpooledImage:
+    """
+    Copy an upload into a SpooledImage chunk by chunk, failing with UploadTooLarge
+    as soon as more than `max_bytes` have been read.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    image = SpooledImage(upload.filename or "uploaded_image.jpg", upload.content_type)
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if image.size + len(chunk) > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            image._write(chunk, spool_threshold)
+        image._finish()
+    except BaseException:
+        image.close()
+        raise
+    return image
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects oversized request bodies for the given paths with 413 before they are parsed:
+    immediately when Content-Length is too large, otherwise as soon as the streamed body
+    crosses the limit.
+    """
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"Request body exceeds the maximum size of {self.max_bytes} bytes"},
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Request body exceeds the maximum size of {self.max_bytes} bytes",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
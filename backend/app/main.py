@@ -1,7 +1,13 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config.services import services
+from app.config.settings import settings
+from app.pipelines.job_worker import job_workers
+from app.pipelines.outbox_relay import outbox_relay
 from app.api import router
+from app.infra.tracing import ServerTimingMiddleware
+from app.infra.uploads import MaxBodySizeMiddleware
 import logging
 
 logging.basicConfig(
@@ -16,9 +22,29 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):
     # Startup
     await services.start()
+    if settings.OUTBOX_RELAY_ENABLED:
+        await outbox_relay.start()
+    if settings.JOB_WORKERS_ENABLED:
+        await job_workers.start()
+    # Serving starts now, so /healthz answers; /readyz waits until the warm-up has opened connections.
+    warmup = asyncio.create_task(services.warm())
     yield
     # Shutdown
+    services.ready = False
+    warmup.cancel()
+    await job_workers.stop()
+    # After the workers, so the vectors of jobs finished during shutdown are applied too.
+    await outbox_relay.stop()
     await services.stop()
 
 app = FastAPI(lifespan=lifespan)
+# Leave room for the multipart envelope and form fields around the image itself.
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_bytes=settings.UPLOAD_MAX_BYTES + 64 * 1024,
+    paths=["/submit_found_item"],
+)
+if settings.TRACING_ENABLED:
+    # Added last, so it wraps everything else and its total covers the whole request.
+    app.add_middleware(ServerTimingMiddleware)
 app.include_router(router)
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Union
+from app.infra.uploads import SpooledImage
 
 class ImageProcessingService(ABC):
     @abstractmethod
-    async def process_found_image(self, image_bytes: bytes) -> Dict:
+    async def process_found_image(self, image: Union[bytes, SpooledImage]) -> Dict:
         """
-        Process an image from a found item. Return standardized dict with:
+        Process an image from a found item, given as bytes or as a spooled upload.
+        Return standardized dict with:
         - type: 'text' or 'image'
         - embedding: List[float]
         - metadata (e.g. caption if relevant)
@@ -15,4 +17,11 @@ class ImageProcessingService(ABC):
 class TextEmbeddingService(ABC):
     @abstractmethod
     async def embed_text(self, text: str) -> List[float]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts in as few upstream calls as possible; results are in input order.
+        """
+        pass
@@ -0,0 +1,182 @@
+import asyncio
+import io
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+from app.config.settings import settings
+from app.infra.uploads import SpooledImage
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow is optional; without it images pass through unchanged
+    Image = None
+    ImageOps = None
+
+try:
+    # Registers a HEIC/HEIF decoder with Pillow when available (iPhone uploads).
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+_OUTPUT_FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+# Formats the vision model accepts as is; anything else (HEIC) must be converted before it is sent.
+VISION_MIME_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+
+
+def sniff_mime_type(data: bytes) -> str:
+    """Best-effort content type from magic bytes; defaults to JPEG."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[4:12] in (b"ftypheic", b"ftypheix", b"ftypheif", b"ftypmif1", b"ftypmsf1", b"ftyphevc"):
+        return "image/heic"
+    return "image/jpeg"
+
+
+def preprocess_image_bytes(
+    data: Union[bytes, str], max_edge: int, output_format: str, quality: int
+) -> Tuple[bytes, str]:
+    """
+    Normalize EXIF orientation, downscale so the longest edge is at most `max_edge`,
+    and re-encode without metadata. Runs in a worker process.
+
+    `data` is either the image bytes or a path to the image file; passing a path keeps
+    large uploads from being copied through the parent process.
+    """
+    pil_format, mime_type = _OUTPUT_FORMATS[output_format]
+    with Image.open(io.BytesIO(data) if isinstance(data, bytes) else data) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        out = io.BytesIO()
+        # No exif= argument, so EXIF (GPS, device info) is not carried over.
+        img.save(out, format=pil_format, quality=quality, optimize=True)
+    return out.getvalue(), mime_type
+
+
+def _warm_worker() -> int:
+    """Runs once in each worker process at startup: loads the JPEG codec before the first upload does."""
+    Image.new("RGB", (8, 8)).save(io.BytesIO(), format="JPEG")
+    return os.getpid()
+
+
+@dataclass
+class PreprocessedImage:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    seconds: float
+
+
+class ImagePreprocessor:
+    """
+    Shrinks uploads before they are sent to the vision model. Decoding and resizing are
+    CPU-bound, so they run in a process pool and never block the event loop.
+    """
+
+    def __init__(
+        self,
+        max_edge: int = settings.IMAGE_MAX_EDGE,
+        output_format: str = settings.IMAGE_OUTPUT_FORMAT,
+        quality: int = settings.IMAGE_QUALITY,
+        workers: int = settings.IMAGE_PREPROCESS_WORKERS,
+    ):
+        if output_format not in _OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{output_format}', expected one of {list(_OUTPUT_FORMATS)}")
+        self.max_edge = max_edge
+        self.output_format = output_format
+        self.quality = quality
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.images = 0
+        self.failures = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    @property
+    def cache_tag(self) -> str:
+        """Identifies the preprocessing options, for content-addressed caches."""
+        return f"{self.output_format}:{self.max_edge}:{self.quality}"
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def warm(self) -> None:
+        """Start every worker process now; spawning them on the first uploads adds to those requests."""
+        if Image is None:
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        # Submitted together, each task finds no idle worker, so the pool spawns one per task up to `workers`.
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_worker) for _ in range(self.workers)))
+
+    async def preprocess(self, image: Union[bytes, SpooledImage]) -> PreprocessedImage:
+        started = time.perf_counter()
+        if isinstance(image, SpooledImage):
+            source = image.read_bytes() if image.in_memory else image.path
+            original_size = image.size
+        else:
+            source = image
+            original_size = len(image)
+
+        result: Optional[Tuple[bytes, str]] = None
+        if Image is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(
+                    self._get_pool(),
+                    preprocess_image_bytes,
+                    source,
+                    self.max_edge,
+                    self.output_format,
+                    self.quality,
+                )
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Image preprocessing failed, sending original bytes: {e}")
+        # Never send something bigger than what we were given, unless the model can't read the original.
+        if result is None or len(result[0]) >= original_size:
+            data = source if isinstance(source, bytes) else image.read_bytes()
+            mime_type = sniff_mime_type(data)
+            if mime_type in VISION_MIME_TYPES:
+                result = (data, mime_type)
+            elif result is None:
+                raise ValueError(f"Cannot decode {mime_type} image to convert it for captioning (is pillow_heif installed?)")
+
+        elapsed = time.perf_counter() - started
+        self.images += 1
+        self.bytes_in += original_size
+        self.bytes_out += len(result[0])
+        self.seconds += elapsed
+        return PreprocessedImage(data=result[0], mime_type=result[1], original_bytes=original_size, seconds=elapsed)
+
+    def stats(self) -> Dict:
+        return {
+            "images": self.images,
+            "failures": self.failures,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "total_seconds": round(self.seconds, 4),
+            "avg_ms": round(1000 * self.seconds / self.images, 2) if self.images else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
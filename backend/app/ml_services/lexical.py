@@ -0,0 +1,81 @@
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+# Hashed vocabulary size. Collisions are rare at this size and need no shared vocabulary,
+# so every pod computes identical sparse vectors without coordination.
+VOCAB_BITS = 20
+_VOCAB_MASK = (1 << VOCAB_BITS) - 1
+
+# BM25 term-frequency saturation; IDF is applied by Qdrant (Modifier.IDF) from collection stats.
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_DOC_TOKENS = 40.0
+
+# Letters/digits runs, keeping things like "a1789", "sn-4471" and "3.5mm" together.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was with".split()
+)
+
+
+@dataclass
+class LexicalVector:
+    indices: List[int]
+    values: List[float]
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(token)
+        # Also index the parts of compound tokens, so "sn-4471" matches "4471".
+        if any(sep in token for sep in "-./"):
+            tokens.extend(part for part in re.split(r"[-./]", token) if part and part not in _STOPWORDS)
+    return tokens
+
+
+def token_id(token: str) -> int:
+    return zlib.crc32(token.encode()) & _VOCAB_MASK
+
+
+def lexical_vector(text: str) -> LexicalVector:
+    """Sparse BM25-style term weights over a hashed vocabulary (no IDF)."""
+    tokens = tokenize(text)
+    if not tokens:
+        return LexicalVector(indices=[], values=[])
+    counts = Counter(token_id(t) for t in tokens)
+    length_norm = 1 - BM25_B + BM25_B * len(tokens) / AVG_DOC_TOKENS
+    indices = sorted(counts)
+    values = [counts[i] * (BM25_K1 + 1) / (counts[i] + BM25_K1 * length_norm) for i in indices]
+    return LexicalVector(indices=indices, values=values)
+
+
+def lexical_scores(query: LexicalVector, candidates: List[LexicalVector]) -> np.ndarray:
+    """
+    Dot product of the query's sparse vector with each candidate's, for all candidates at once:
+    candidate terms are flattened into one array and matched against the sorted query terms.
+    """
+    scores = np.zeros(len(candidates), dtype=np.float32)
+    if not query.indices or not candidates:
+        return scores
+    q_idx = np.asarray(query.indices, dtype=np.int64)
+    q_val = np.asarray(query.values, dtype=np.float32)
+    lengths = np.fromiter((len(c.indices) for c in candidates), dtype=np.int64, count=len(candidates))
+    if lengths.sum() == 0:
+        return scores
+    c_idx = np.concatenate([np.asarray(c.indices, dtype=np.int64) for c in candidates])
+    c_val = np.concatenate([np.asarray(c.values, dtype=np.float32) for c in candidates])
+    owner = np.repeat(np.arange(len(candidates)), lengths)
+
+    pos = np.searchsorted(q_idx, c_idx)
+    pos_clipped = np.minimum(pos, len(q_idx) - 1)
+    hit = q_idx[pos_clipped] == c_idx
+    np.add.at(scores, owner[hit], c_val[hit] * q_val[pos_clipped[hit]])
+    return scores
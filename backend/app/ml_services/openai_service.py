@@ -1,18 +1,70 @@
+import hashlib
+from typing import List, Optional, Union
+from app.config.settings import settings
 from app.ml_services.base import ImageProcessingService, TextEmbeddingService
+from app.ml_services.result_cache import ImageResultCache
+from app.ml_services.image_preprocess import ImagePreprocessor
 from app.infra.openai_client import openai_client
+from app.infra.uploads import SpooledImage
 import base64
 
 class OpenAIImageService(ImageProcessingService):
-    async def process_found_image(self, image_bytes: bytes):
+    def __init__(
+        self,
+        cache: Optional[ImageResultCache] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+    ):
+        self.cache = cache
+        self.preprocessor = preprocessor
+
+    def _cache_key(self, image: Union[bytes, SpooledImage]) -> str:
+        image_sha256 = image.sha256 if isinstance(image, SpooledImage) else hashlib.sha256(image).hexdigest()
+        return ImageResultCache.make_key(
+            image_sha256,
+            settings.OPENAI_MODEL,
+            settings.OPENAI_EMBED_MODEL,
+            openai_client.default_prompt.strip(),
+            self.preprocessor.cache_tag if self.preprocessor else "raw",
+        )
+
+    async def process_found_image(self, image: Union[bytes, SpooledImage]):
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(image)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                cached["metadata"]["cached"] = True
+                return cached
+
+        metadata = {"cached": False}
+        mime_type = "image/jpeg"
+        if self.preprocessor is not None:
+            # Only the (much smaller) preprocessed image is held in memory and base64-encoded.
+            prepared = await self.preprocessor.preprocess(image)
+            image_bytes, mime_type = prepared.data, prepared.mime_type
+            metadata["preprocess"] = {
+                "bytes_in": prepared.original_bytes,
+                "bytes_out": len(prepared.data),
+                "ms": round(prepared.seconds * 1000, 2),
+            }
+        else:
+            image_bytes = image.read_bytes() if isinstance(image, SpooledImage) else image
+
         image_base64 = base64.b64encode(image_bytes)
-        caption = await openai_client.caption_image_base64(image_base64)
+        caption = await openai_client.caption_image_base64(image_base64, mime_type=mime_type)
         embedding = await openai_client.get_text_embedding(caption)
-        return {
+        result = {
             "type": "text",
             "embedding": embedding,
-            "metadata": {"caption": caption}
+            "metadata": {"caption": caption, **metadata}
         }
+        if cache_key is not None:
+            await self.cache.set(cache_key, result)
+        return result
 
 class OpenAITextService(TextEmbeddingService):
     async def embed_text(self, text: str):
         return await openai_client.get_text_embedding(text)
+
+    async def embed_texts(self, texts: List[str]):
+        return await openai_client.get_text_embeddings(texts)
@@ -0,0 +1,82 @@
+import copy
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from app.data_services.base.cache_interface import ImageResultStore
+from app.infra.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class ImageResultCache:
+    """
+    Content-addressed cache for image processing results.
+
+    Two tiers: a bounded in-memory LRU, and an optional persistent store that survives
+    restarts and is shared between workers. Persistent-tier errors are logged and treated
+    as misses so a cache outage never fails a submission.
+    """
+
+    def __init__(self, max_size: int, store: Optional[ImageResultStore] = None):
+        self._memory = LRUCache(max_size)
+        self._store = store
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    @staticmethod
+    def make_key(image_sha256: str, *parts: str) -> str:
+        """
+        Build a cache key from the image content hash (sha256 hex) plus everything that
+        affects the result (models, prompt, preprocessing options).
+        """
+        h = hashlib.sha256()
+        h.update(bytes.fromhex(image_sha256))
+        for part in parts:
+            h.update(b"\x00")
+            h.update(part.encode())
+        return h.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        result = self._memory.get(key)
+        if result is not None:
+            return copy.deepcopy(result)
+        if self._store is None:
+            return None
+        try:
+            result = await self._store.get_result(key)
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Persistent image cache lookup failed, treating as miss: {e}")
+            return None
+        if result is None:
+            return None
+        self.persistent_hits += 1
+        self._memory.set(key, result)
+        return copy.deepcopy(result)
+
+    async def set(self, key: str, result: Dict) -> None:
+        self._memory.set(key, copy.deepcopy(result))
+        if self._store is None:
+            return
+        try:
+            await self._store.put_result(key, result)
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Persistent image cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        memory = self._memory.stats
+        # A memory miss that the persistent tier served is still a hit overall.
+        misses = memory.misses - self.persistent_hits
+        lookups = memory.hits + self.persistent_hits + misses
+        return {
+            "memory_hits": memory.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": misses,
+            "hit_ratio": (memory.hits + self.persistent_hits) / lookups if lookups else 0.0,
+            "evictions": memory.evictions,
+            "persistent_errors": self.persistent_errors,
+            "size": len(self._memory),
+            "max_size": self._memory.max_size,
+        }
@@ -5,10 +5,15 @@ from sqlalchemy import (
     Text,
     DateTime,
     Float,
+    REAL,
+    BigInteger,
+    Integer,
     ForeignKey,
     CheckConstraint,
+    Index,
+    UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -21,6 +26,7 @@ class FoundItem(Base):
     finder_user_id = Column(UUID(as_uuid=True), nullable=True)
     image_bucket = Column(String(255), nullable=False)
     image_path = Column(String(255), nullable=False)
+    image_sha256 = Column(String(64), nullable=True, index=True)
     caption_text = Column(Text, nullable=False)
     caption_model = Column(String(50), nullable=True)
     found_at = Column(DateTime(timezone=True), nullable=True)
@@ -36,6 +42,8 @@ class FoundItem(Base):
             status.in_(['active', 'claimed', 'archived']),
             name='found_items_status_check'
         ),
+        # Keyset pagination for GET /found_items (newest first).
+        Index('found_items_created_at_id_idx', 'created_at', 'id'),
     )
 
 class LostReport(Base):
@@ -57,6 +65,8 @@ class LostReport(Base):
             status.in_(['open', 'resolved', 'archived']),
             name='lost_reports_status_check'
         ),
+        # Keyset pagination for GET /lost_reports (newest first).
+        Index('lost_reports_created_at_id_idx', 'created_at', 'id'),
     )
 
 class Match(Base):
@@ -70,4 +80,67 @@ class Match(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     lost_report = relationship("LostReport", back_populates="matches")
-    found_item = relationship("FoundItem", back_populates="matches")
\ No newline at end of file
+    found_item = relationship("FoundItem", back_populates="matches")
+
+    __table_args__ = (
+        # Target of insert_matches' ON CONFLICT: one row per pair, holding its best score.
+        UniqueConstraint('lost_report_id', 'found_item_id', name='matches_lost_found_key'),
+        # Best-first keyset pagination for GET /lost_reports/{id}/matches.
+        Index('matches_lost_score_id_idx', 'lost_report_id', 'score', 'id'),
+    )
+
+class ImageCaptionCacheEntry(Base):
+    __tablename__ = 'image_caption_cache'
+
+    # sha256(image bytes) combined with caption model, embedding model and prompt
+    cache_key = Column(String(64), primary_key=True)
+    caption_text = Column(Text, nullable=False)
+    embedding = Column(ARRAY(Float), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class IngestJob(Base):
+    __tablename__ = 'ingest_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False, server_default='found_item')
+    status = Column(String(20), nullable=False, server_default='queued')
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, server_default='0')
+    max_attempts = Column(Integer, nullable=False, server_default='5')
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    stage_timings = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(
+            status.in_(['queued', 'running', 'succeeded', 'failed']),
+            name='ingest_jobs_status_check'
+        ),
+        # Workers poll for runnable jobs by status and due time.
+        Index('ingest_jobs_claim_idx', 'status', 'next_attempt_at'),
+    )
+
+class VectorOutboxEntry(Base):
+    __tablename__ = 'vector_outbox'
+
+    # Written in the same transaction as the item row; the relay upserts it to the vector index and deletes it.
+    # After OUTBOX_MAX_ATTEMPTS failures an entry is parked (failed_at set) and left for an operator;
+    # `UPDATE vector_outbox SET failed_at = NULL, attempts = 0 WHERE ...` puts it back in the queue.
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    vector = Column(ARRAY(REAL), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    text = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, server_default='0')
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('vector_outbox_due_idx', 'next_attempt_at', 'id', postgresql_where=failed_at.is_(None)),
+    )
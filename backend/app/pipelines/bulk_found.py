@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+import zipfile
+from dataclasses import dataclass, field, asdict
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+from app.config.services import Services
+from app.config.settings import settings
+from app.data_services.match_scope import MatchScope, scope_payload
+from app.infra.uploads import SpooledImage
+from app.pipelines.hydrate import SEARCH_PAYLOAD_FIELDS, hydrate_lost_matches
+from app.pipelines.outbox_relay import outbox_relay
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif", ".gif"}
+
+# Bulk-ingested items get IDs derived from their content hash, so a retried chunk
+# overwrites the same Qdrant points and Postgres IDs instead of creating orphans.
+BULK_ID_NAMESPACE = uuid.UUID("0b6f2c1e-5a43-4a8e-9c59-3f1d2b7e8a10")
+
+
+@dataclass
+class BulkImage:
+    filename: str
+    data: Union[bytes, SpooledImage]  # spooled for request parts, so large ones stay on disk
+
+    @property
+    def sha256(self) -> str:
+        if isinstance(self.data, SpooledImage):
+            return self.data.sha256
+        return hashlib.sha256(self.data).hexdigest()
+
+    def close(self) -> None:
+        if isinstance(self.data, SpooledImage):
+            self.data.close()
+
+
+@dataclass
+class BulkItemResult:
+    filename: str
+    status: str  # "ok" | "skipped" | "error"
+    image_sha256: Optional[str] = None
+    found_item_id: Optional[str] = None
+    image_path: Optional[str] = None
+    caption: Optional[str] = None
+    top_matches: List[Dict] = field(default_factory=list)
+    stage: Optional[str] = None  # stage that failed, when status == "error"
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class _Pending:
+    image: BulkImage
+    result: BulkItemResult
+    embedding: Optional[List[float]] = None
+
+
+def is_image_filename(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
+
+
+def iter_zip_images(archive: BinaryIO) -> Iterator[BulkImage]:
+    """Yield image members of a zip archive one at a time, so only the current chunk is held in memory."""
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or name.startswith(".") or not is_image_filename(name):
+                continue
+            yield BulkImage(filename=name, data=zf.read(info))
+
+
+def iter_directory_images(directory: str) -> Iterator[BulkImage]:
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path) or not is_image_filename(name):
+            continue
+        with open(path, "rb") as f:
+            yield BulkImage(filename=name, data=f.read())
+
+
+async def _chunks(
+    images: Union[Iterable[BulkImage], AsyncIterable[BulkImage]], size: int
+) -> AsyncIterator[List[BulkImage]]:
+    if not hasattr(images, "__aiter__"):
+        images = _aiter(images)
+    chunk: List[BulkImage] = []
+    try:
+        async for image in images:
+            chunk.append(image)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    except BaseException:
+        # e.g. a request part over the size limit: drop the spooled parts read so far.
+        for image in chunk:
+            image.close()
+        raise
+    if chunk:
+        yield chunk
+
+
+async def _aiter(images: Iterable[BulkImage]) -> AsyncIterator[BulkImage]:
+    for image in images:
+        yield image
+
+
+async def ingest_found_images(
+    services: Services,
+    images: Union[Iterable[BulkImage], AsyncIterable[BulkImage]],
+    location_hint: str = "unknown",
+    top_k: int = 5,
+    chunk_size: Optional[int] = None,
+) -> List[BulkItemResult]:
+    """
+    Ingest many found-item photos, given as a plain or async iterable (e.g. request parts
+    being spooled as they are consumed).
+
+    Images are processed in chunks. Within a chunk, uploads and captioning run concurrently
+    with separate bounded parallelism, matches are computed with one batched search, and then
+    the rows, their vector upserts (via the outbox) and their matches are written in one
+    transaction.
+
+    Ingestion is resumable: images whose content hash is already stored are reported as
+    "skipped" with the existing found_item_id, so re-running a partially failed batch only
+    processes what is missing. Failures are reported per item and never abort the batch.
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    upload_limit = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+    caption_limit = asyncio.Semaphore(settings.BULK_CAPTION_CONCURRENCY)
+
+    results: List[BulkItemResult] = []
+    async for chunk in _chunks(images, chunk_size):
+        try:
+            results.extend(
+                await _ingest_chunk(services, chunk, location_hint, top_k, upload_limit, caption_limit)
+            )
+        finally:
+            for image in chunk:
+                image.close()
+    return results
+
+
+async def _ingest_chunk(
+    services: Services,
+    images: List[BulkImage],
+    location_hint: str,
+    top_k: int,
+    upload_limit: asyncio.Semaphore,
+    caption_limit: asyncio.Semaphore,
+) -> List[BulkItemResult]:
+    bucket = settings.SUPABASE_BUCKET
+    results: List[BulkItemResult] = []
+    pending: List[_Pending] = []
+    hashes = [image.sha256 for image in images]
+
+    # Resumability: skip anything already ingested, including duplicates within this chunk.
+    try:
+        existing = await services.db_service.get_found_item_ids_by_hashes(list(set(hashes)))
+    except Exception as e:
+        return [
+            BulkItemResult(filename=image.filename, status="error", image_sha256=h, stage="dedupe", error=str(e))
+            for image, h in zip(images, hashes)
+        ]
+    seen = set()
+    for image, image_hash in zip(images, hashes):
+        result = BulkItemResult(filename=image.filename, status="ok", image_sha256=image_hash)
+        results.append(result)
+        if image_hash in existing:
+            result.status = "skipped"
+            result.found_item_id = existing[image_hash]
+        elif image_hash in seen:
+            result.status = "skipped"
+            result.error = "duplicate of another image in this batch"
+        else:
+            seen.add(image_hash)
+            pending.append(_Pending(image=image, result=result))
+
+    async def upload(item: _Pending) -> None:
+        # Keyed by content hash: if a later stage fails, the retry overwrites this object
+        # instead of leaving it orphaned and uploading a second copy.
+        key = f"{item.result.image_sha256}{os.path.splitext(item.image.filename)[1].lower()}"
+        data = item.image.data
+        body = data.open() if isinstance(data, SpooledImage) else data
+        try:
+            async with upload_limit:
+                item.result.image_path = await services.storage_service.upload_image(
+                    body, item.image.filename, key=key
+                )
+        finally:
+            if not isinstance(body, bytes):
+                body.close()
+
+    async def caption(item: _Pending) -> None:
+        async with caption_limit:
+            processed = await services.image_service.process_found_image(item.image.data)
+        item.embedding = processed["embedding"]
+        item.result.caption = processed["metadata"].get("caption", "")
+
+    async def prepare(item: _Pending) -> None:
+        upload_outcome, caption_outcome = await asyncio.gather(
+            upload(item), caption(item), return_exceptions=True
+        )
+        for stage, outcome in (("upload", upload_outcome), ("caption", caption_outcome)):
+            if isinstance(outcome, BaseException):
+                item.result.status = "error"
+                item.result.stage = item.result.stage or stage
+                item.result.error = item.result.error or str(outcome)
+
+    await asyncio.gather(*(prepare(item) for item in pending))
+    ready = [item for item in pending if item.result.status == "ok"]
+    if not ready:
+        return results
+
+    def fail(items: List[_Pending], stage: str, error: Exception) -> None:
+        logger.error(f"Bulk ingestion stage '{stage}' failed for {len(items)} items: {error}")
+        for item in items:
+            item.result.status = "error"
+            item.result.found_item_id = None
+            item.result.stage = stage
+            item.result.error = str(error)
+
+    for item in ready:
+        item.result.found_item_id = str(uuid.uuid5(BULK_ID_NAMESPACE, item.result.image_sha256))
+    scope_fields = scope_payload(location_hint)
+
+    try:
+        scope = MatchScope.around(location_hint, scope_fields["event_at"])
+        matches = await services.vector_service.search_scoped_batch(
+            [item.embedding for item in ready],
+            [scope] * len(ready),
+            top_k=top_k,
+            filter_payload={"type": "lost"},
+            payload_fields=SEARCH_PAYLOAD_FIELDS,
+            query_texts=[item.result.caption or "" for item in ready],
+        )
+    except Exception as e:
+        # Items are still stored; only their matches are missing (the re-matching job fills them in).
+        logger.error(f"Bulk match search failed for {len(ready)} items: {e}")
+        matches = [[] for _ in ready]
+        for item in ready:
+            item.result.error = f"match search failed: {e}"
+
+    # Rows, outbox entries for their vectors and matches commit together. The row (and its image
+    # hash) is what marks an item as done, so a failed chunk leaves its items eligible for a retry.
+    try:
+        async with services.db_service.unit_of_work() as uow:
+            await uow.insert_found_items([
+                {
+                    "id": item.result.found_item_id,
+                    "image_bucket": bucket,
+                    "image_path": item.result.image_path,
+                    "image_sha256": item.result.image_sha256,
+                    "caption_text": item.result.caption or "",
+                    "caption_model": settings.OPENAI_MODEL,
+                    "location_hint": location_hint,
+                }
+                for item in ready
+            ])
+            await uow.enqueue_vector_upserts([
+                {
+                    "id": item.result.found_item_id,
+                    "vector": item.embedding,
+                    "payload": {
+                        "type": "found",
+                        **scope_fields,
+                    },
+                    "text": item.result.caption,
+                }
+                for item in ready
+            ])
+            await uow.insert_matches([
+                {"found_item_id": item.result.found_item_id, "lost_report_id": m["id"], "score": m["score"]}
+                for item, item_matches in zip(ready, matches)
+                for m in item_matches
+            ])
+    except Exception as e:
+        fail(ready, "insert", e)
+        return results
+    outbox_relay.notify()
+    for item, item_matches in zip(ready, matches):
+        item.result.top_matches = item_matches
+
+    try:
+        hydrated = await hydrate_lost_matches(services, matches)
+    except Exception as e:
+        logger.error(f"Loading matched lost reports failed for {len(ready)} items: {e}")
+    else:
+        for item, item_matches in zip(ready, hydrated):
+            item.result.top_matches = item_matches
+
+    return results
+
+
+def summarize(results: List[BulkItemResult]) -> Dict[str, int]:
+    summary = {"total": len(results), "ok": 0, "skipped": 0, "error": 0}
+    for result in results:
+        summary[result.status] += 1
+    return summary
@@ -0,0 +1,213 @@
+import codecs
+import csv
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config.services import Services
+from app.config.settings import settings
+from app.data_services.match_scope import MatchScope, scope_payload
+from app.pipelines.hydrate import SEARCH_PAYLOAD_FIELDS
+from app.pipelines.outbox_relay import outbox_relay
+from app.pipelines.progress import ImportProgress
+
+logger = logging.getLogger(__name__)
+
+# (line number, parsed record) on success, (line number, error message) otherwise
+ParsedRow = Tuple[int, Optional[Dict], Optional[str]]
+
+# Mirrors lost_reports_status_check, so a bad status is reported per row instead of failing the batch's COPY.
+LOST_REPORT_STATUSES = ("open", "resolved", "archived")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering more than one partial line."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        yield line_no, record, None
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """
+    Parse CSV with a header row. A quoted field may span lines; lines are accumulated until
+    the quotes balance, so only one record is buffered at a time.
+    """
+    header: Optional[List[str]] = None
+    pending = ""
+    line_no = 0
+    record_line = 0
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            record_line = line_no
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending.rstrip("\r"), ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield record_line, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield record_line, dict(zip(header, values)), None
+    if pending:
+        yield record_line, None, "unterminated quoted field"
+
+
+def to_lost_report(record: Dict) -> Dict:
+    """Validate one input record and map it onto lost_reports columns."""
+    description = record.get("description") or record.get("description_text") or ""
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("missing description")
+    description = description.strip()
+    location_hint = record.get("location_hint") or "unknown"
+    if not isinstance(location_hint, str):
+        raise ValueError(f"invalid location_hint {location_hint!r}; expected text")
+    reporter_user_id = record.get("reporter_user_id") or None
+    if reporter_user_id is not None:
+        try:
+            reporter_user_id = str(uuid.UUID(str(reporter_user_id)))
+        except ValueError:
+            raise ValueError(f"invalid reporter_user_id {reporter_user_id!r}; expected a UUID") from None
+    lost_at = record.get("lost_at") or None
+    if isinstance(lost_at, str):
+        lost_at = datetime.fromisoformat(lost_at)
+    elif lost_at is not None and not isinstance(lost_at, datetime):
+        raise ValueError(f"invalid lost_at {lost_at!r}; expected an ISO 8601 timestamp")
+    status = str(record.get("status") or "").strip() or "open"
+    if status not in LOST_REPORT_STATUSES:
+        raise ValueError(f"invalid status {status!r}; expected one of {', '.join(LOST_REPORT_STATUSES)}")
+    return {
+        "id": str(uuid.uuid4()),
+        "reporter_user_id": reporter_user_id,
+        "description_text": description,
+        "lost_at": lost_at,
+        "location_hint": location_hint,
+        "status": status,
+    }
+
+
+async def import_lost_reports(
+    services: Services,
+    rows: AsyncIterator[ParsedRow],
+    progress: ImportProgress,
+    batch_size: Optional[int] = None,
+    match_top_k: int = 5,
+) -> ImportProgress:
+    """
+    Import a stream of lost reports in batches: one embeddings call, one batched match search,
+    then one transaction with a COPY into lost_reports, the outbox entries for their vectors
+    and one insert_matches per batch.
+    Rows that fail validation are counted and reported; a failing batch stops the import.
+    """
+    batch_size = batch_size or settings.LOST_IMPORT_BATCH_SIZE
+    batch: List[Tuple[int, Dict]] = []
+    try:
+        async for line_no, record, error in rows:
+            progress.rows_read += 1
+            if error is None:
+                try:
+                    batch.append((line_no, to_lost_report(record)))
+                except (ValueError, TypeError) as e:
+                    error = str(e)
+            if error is not None:
+                progress.add_error(line_no, error)
+            if len(batch) >= batch_size:
+                await _import_batch(services, batch, progress, match_top_k)
+                batch = []
+        if batch:
+            await _import_batch(services, batch, progress, match_top_k)
+        progress.status = "completed"
+    except Exception as e:
+        progress.status = "failed"
+        progress.error = str(e)
+        logger.error(f"Lost report import {progress.import_id} failed: {e}")
+        raise
+    finally:
+        progress.finished_at = time.time()
+        logger.info(f"Lost report import {progress.import_id}: {progress.as_dict()}")
+    return progress
+
+
+async def _import_batch(
+    services: Services, batch: List[Tuple[int, Dict]], progress: ImportProgress, match_top_k: int
+) -> None:
+    started = time.perf_counter()
+    reports = [report for _, report in batch]
+
+    embeddings = await services.text_service.embed_texts([r["description_text"] for r in reports])
+    report_ids = [r["id"] for r in reports]
+
+    match_records: List[Dict] = []
+    if match_top_k > 0:
+        matches = await services.vector_service.search_scoped_batch(
+            embeddings,
+            [MatchScope.around(r["location_hint"], r["lost_at"]) for r in reports],
+            top_k=match_top_k,
+            filter_payload={"type": "found"},
+            payload_fields=SEARCH_PAYLOAD_FIELDS,
+            query_texts=[r["description_text"] for r in reports],
+        )
+        match_records = [
+            {"lost_report_id": report_id, "found_item_id": m["id"], "score": m["score"]}
+            for report_id, report_matches in zip(report_ids, matches)
+            for m in report_matches
+        ]
+
+    # Rows, their outbox entries and their matches commit together, so a failed batch leaves nothing behind.
+    async with services.db_service.unit_of_work() as uow:
+        await uow.insert_lost_reports(reports)
+        await uow.enqueue_vector_upserts([
+            {
+                "id": report_id,
+                "vector": embedding,
+                "payload": {
+                    "type": "lost",
+                    **scope_payload(report["location_hint"], report["lost_at"]),
+                },
+                "text": report["description_text"],
+            }
+            for report_id, report, embedding in zip(report_ids, reports, embeddings)
+        ])
+        await uow.insert_matches(match_records)
+    outbox_relay.notify()
+    progress.matches += len(match_records)
+
+    progress.rows_imported += len(reports)
+    progress.batches += 1
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Lost report import {progress.import_id}: batch {progress.batches} "
+        f"({len(reports)} rows in {elapsed:.2f}s, {progress.rows_imported} imported so far)"
+    )
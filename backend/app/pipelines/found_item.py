@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional
+
+from app.config.services import Services
+from app.config.settings import settings
+from app.data_services.match_scope import MatchScope, scope_payload
+from app.infra.uploads import SpooledImage
+from app.pipelines.hydrate import SEARCH_PAYLOAD_FIELDS, hydrate_lost_matches
+from app.pipelines.outbox_relay import outbox_relay
+from app.pipelines.stage_graph import StageGraph
+
+
+def build_found_item_graph(
+    services: Services,
+    image: SpooledImage,
+    location_hint: str,
+    top_k: int = 5,
+    image_path: Optional[str] = None,
+    item_id: Optional[str] = None,
+) -> StageGraph:
+    """
+    Stage graph for one found item:
+
+        upload ──────────────────────┐
+        caption_embed ──┬─> search ──┴─> persist
+                        │     └────────> hydrate_matches
+                        └────────────────┘
+
+    Storage upload and captioning don't depend on each other, and the match search only
+    needs the embedding. `persist` writes the item row, its outbox entry for the vector
+    upsert and its matches in one transaction, so a failure leaves nothing half-written.
+    """
+    bucket = settings.SUPABASE_BUCKET
+    scope_fields = scope_payload(location_hint)
+
+    async def upload(_: Dict) -> str:
+        if image_path is not None:
+            return image_path
+        body = image.open()
+        try:
+            return await services.storage_service.upload_image(body, image.filename, image.content_type)
+        finally:
+            if not isinstance(body, bytes):
+                body.close()
+
+    async def caption_embed(_: Dict) -> Dict:
+        return await services.image_service.process_found_image(image)
+
+    async def search(results: Dict) -> List[Dict]:
+        return await services.vector_service.search_scoped(
+            vector=results["caption_embed"]["embedding"],
+            scope=MatchScope.around(location_hint, scope_fields["event_at"]),
+            top_k=top_k,
+            filter_payload={"type": "lost"},
+            payload_fields=SEARCH_PAYLOAD_FIELDS,
+            query_text=results["caption_embed"]["metadata"].get("caption"),
+        )
+
+    async def persist(results: Dict) -> str:
+        caption = results["caption_embed"]["metadata"].get("caption", "")
+        async with services.db_service.unit_of_work() as uow:
+            found_item_id = await uow.insert_found_item({
+                "id": item_id,
+                "image_bucket": bucket,
+                "image_path": results["upload"],
+                "image_sha256": image.sha256,
+                "caption_text": caption,
+                "caption_model": settings.OPENAI_MODEL,
+                "location_hint": location_hint,
+            })
+            await uow.enqueue_vector_upserts([{
+                "id": found_item_id,
+                "vector": results["caption_embed"]["embedding"],
+                "payload": {"type": "found", **scope_fields},
+                "text": caption or None,
+            }])
+            await uow.insert_matches([
+                {"found_item_id": found_item_id, "lost_report_id": m["id"], "score": m["score"]}
+                for m in results["search"]
+            ])
+        # Read-your-writes: return once the relay has made this item searchable (bounded wait).
+        await outbox_relay.wait_applied([found_item_id])
+        return found_item_id
+
+    async def hydrate_matches(results: Dict) -> List[Dict]:
+        return (await hydrate_lost_matches(services, [results["search"]]))[0]
+
+    return (
+        StageGraph()
+        .add("upload", upload)
+        .add("caption_embed", caption_embed)
+        .add("search", search, depends_on=["caption_embed"])
+        .add("persist", persist, depends_on=["upload", "caption_embed", "search"])
+        .add("hydrate_matches", hydrate_matches, depends_on=["search"])
+    )
+
+
+async def run_found_item_pipeline(
+    services: Services,
+    image: SpooledImage,
+    location_hint: str,
+    top_k: int = 5,
+) -> Dict:
+    graph = build_found_item_graph(services, image, location_hint, top_k)
+    results = await graph.run()
+    return {
+        "found_item_id": results["persist"],
+        "image_bucket": settings.SUPABASE_BUCKET,
+        "image_path": results["upload"],
+        "caption": results["caption_embed"]["metadata"].get("caption", ""),
+        "top_matches": results["hydrate_matches"],
+        "stage_timings": graph.timings,
+    }
@@ -0,0 +1,36 @@
+from typing import Awaitable, Callable, Dict, List
+
+from app.config.services import Services
+
+# Vector payloads only carry the fields searches filter on; match responses get the
+# item details from Postgres instead, so searches don't need to return payloads at all.
+SEARCH_PAYLOAD_FIELDS: List[str] = []
+
+# Search-hit keys kept in hydrated matches (hybrid searches add the component scores).
+_HIT_KEYS = ("id", "score", "fused_score", "dense_score", "lexical_score")
+
+
+async def _hydrate(
+    fetch: Callable[[List[str]], Awaitable[List[Dict]]], match_lists: List[List[Dict]], key: str
+) -> List[List[Dict]]:
+    ids = list(dict.fromkeys(m["id"] for matches in match_lists for m in matches))
+    rows = {str(row["id"]): row for row in await fetch(ids)} if ids else {}
+    hydrated = []
+    for matches in match_lists:
+        # Hits without a row (deleted, or a bulk item whose insert failed) are dropped.
+        hydrated.append([
+            {**{k: m[k] for k in _HIT_KEYS if k in m}, key: rows[m["id"]]}
+            for m in matches
+            if m["id"] in rows
+        ])
+    return hydrated
+
+
+async def hydrate_found_matches(services: Services, match_lists: List[List[Dict]]) -> List[List[Dict]]:
+    """Attach the found_items row to every hit, for any number of result lists, in one query."""
+    return await _hydrate(services.db_service.get_found_items_by_ids, match_lists, "found_item")
+
+
+async def hydrate_lost_matches(services: Services, match_lists: List[List[Dict]]) -> List[List[Dict]]:
+    """Attach the lost_reports row to every hit, for any number of result lists, in one query."""
+    return await _hydrate(services.db_service.get_lost_reports_by_ids, match_lists, "lost_report")
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.config.services import Services, services
+from app.config.settings import settings
+from app.infra.uploads import SpooledImage
+from app.pipelines.found_item import build_found_item_graph
+from app.pipelines.stage_graph import StageFailed
+
+logger = logging.getLogger(__name__)
+
+FOUND_ITEM_JOB = "found_item"
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, capped at JOB_RETRY_MAX_SECONDS."""
+    ceiling = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+class JobWorkerPool:
+    """
+    A pool of asyncio workers that claim queued found-item jobs from Postgres
+    (SELECT ... FOR UPDATE SKIP LOCKED, so several pods can share the queue) and run the
+    caption/embed -> search -> persist stages for them.
+    """
+
+    def __init__(self, services: Services, concurrency: Optional[int] = None):
+        self._services = services
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+        self.jobs_retried = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        logger.info(f"Started {self.concurrency} job workers.")
+
+    async def stop(self) -> None:
+        """Stop claiming new jobs and wait for jobs in progress to finish."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job workers stopped.")
+
+    def notify(self) -> None:
+        """Wake idle workers immediately (e.g. right after enqueueing a job in this process)."""
+        self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                jobs = await self._services.job_queue.claim_jobs(
+                    FOUND_ITEM_JOB, limit=1, lease_seconds=settings.JOB_LEASE_SECONDS
+                )
+            except Exception as e:
+                logger.error(f"Job worker {index} failed to claim jobs: {e}")
+                jobs = []
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for job in jobs:
+                await self._run_job(job)
+
+    async def _run_job(self, job: Dict) -> None:
+        job_id = job["id"]
+        payload = job["payload"]
+        timings: Dict[str, float] = {}
+        try:
+            if job["attempts"] > job["max_attempts"]:
+                raise RuntimeError("exceeded max attempts (lease expired on the last attempt)")
+            image_bytes = await self._services.storage_service.download_image(payload["image_path"])
+            graph = build_found_item_graph(
+                self._services,
+                SpooledImage.from_bytes(image_bytes, payload["filename"]),
+                payload["location_hint"],
+                image_path=payload["image_path"],
+                item_id=job_id,  # the found item takes the job's id, so retries are idempotent
+            )
+            try:
+                results = await graph.run()
+            finally:
+                timings = {stage: round(seconds, 4) for stage, seconds in graph.timings.items()}
+            result = {
+                "found_item_id": results["persist"],
+                "image_bucket": settings.SUPABASE_BUCKET,
+                "image_path": results["upload"],
+                "caption": results["caption_embed"]["metadata"].get("caption", ""),
+                "top_matches": results["hydrate_matches"],
+            }
+            await self._services.job_queue.complete_job(job_id, result, timings)
+            self.jobs_succeeded += 1
+        except Exception as e:
+            error = str(e.error) if isinstance(e, StageFailed) else str(e)
+            stage = e.stage if isinstance(e, StageFailed) else None
+            retry_at = None
+            if job["attempts"] < job["max_attempts"]:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=retry_delay(job["attempts"]))
+                self.jobs_retried += 1
+            else:
+                self.jobs_failed += 1
+            logger.error(f"Job {job_id} attempt {job['attempts']} failed at {stage or 'setup'}: {error}")
+            try:
+                await self._services.job_queue.fail_job(
+                    job_id, f"{stage}: {error}" if stage else error, timings, retry_at
+                )
+            except Exception:
+                # The lease will expire and another worker will pick the job up again.
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "succeeded": self.jobs_succeeded,
+            "retried": self.jobs_retried,
+            "failed": self.jobs_failed,
+        }
+
+
+async def enqueue_found_item_job(services: Services, image: SpooledImage, location_hint: str) -> str:
+    """Store the image and queue the rest of the found-item pipeline for the workers."""
+    body = image.open()
+    try:
+        image_path = await services.storage_service.upload_image(body, image.filename, image.content_type)
+    finally:
+        if not isinstance(body, bytes):
+            body.close()
+    return await services.job_queue.enqueue_job(
+        FOUND_ITEM_JOB,
+        {"image_path": image_path, "filename": image.filename, "location_hint": location_hint},
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+# Singleton
+job_workers = JobWorkerPool(services)
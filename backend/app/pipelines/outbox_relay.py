@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.config.services import Services, services
+from app.config.settings import settings
+from app.infra.cache import LRUCache
+from app.infra.tracing import OUTBOX_APPLY_ITEMS, OUTBOX_APPLY_SECONDS, Span
+
+logger = logging.getLogger(__name__)
+
+# Item IDs applied recently, so a submit whose vector was applied before it started waiting returns at once.
+_APPLIED_IDS_KEPT = 4096
+
+
+class VectorOutboxRelay:
+    """
+    Background task that applies committed vector upserts from the outbox to the vector index
+    in batches. Request handlers call `notify()` after committing, so the index usually trails
+    Postgres by one batch; the poll interval only matters for writes made by other processes.
+    Entries committed by concurrent requests while a batch is in flight go out together in the
+    next one, so bursts of submissions turn into a few large upserts.
+
+    This is the only writer to the vector index. Submissions keep read-your-writes by calling
+    `wait_applied()` for their own item after committing: it returns once the relay has applied
+    that item, or after OUTBOX_READ_YOUR_WRITES_TIMEOUT_SECONDS (e.g. while the index is down),
+    in which case the vector becomes searchable when a later drain applies it. A global rematch
+    (app/cli/rematch.py) picks up pairs missed that way.
+    """
+
+    def __init__(self, services: Services, batch_size: Optional[int] = None):
+        self._services = services
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._consecutive_failures = 0
+        self.batches = 0
+        self.entries_applied = 0
+        self.failures = 0
+        self.write_waits = 0
+        self.write_wait_timeouts = 0
+        self.last_apply_ms: Optional[float] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._applied = LRUCache(_APPLIED_IDS_KEPT)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("Vector outbox relay started.")
+
+    async def stop(self) -> None:
+        """Stop polling, then apply whatever is still due so a clean shutdown leaves nothing behind."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Vector outbox flush on shutdown failed; the next relay will retry: {e}")
+        logger.info("Vector outbox relay stopped.")
+
+    def notify(self) -> None:
+        """Wake the relay right away (e.g. right after a unit of work committed outbox entries)."""
+        self._wakeup.set()
+
+    async def wait_applied(self, item_ids: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wake the relay and wait until it has applied the vectors of `item_ids` (just committed by
+        the caller) to the index. Returns False on timeout, or right away when the relay isn't
+        running in this process; the entries stay queued either way.
+        """
+        self.notify()
+        timeout = settings.OUTBOX_READ_YOUR_WRITES_TIMEOUT_SECONDS if timeout is None else timeout
+        if self._task is None or timeout <= 0:
+            return False
+        loop = asyncio.get_running_loop()
+        pending: Dict[str, asyncio.Future] = {}
+        for item_id in map(str, item_ids):
+            if item_id not in pending and self._applied.get(item_id) is None:
+                pending[item_id] = loop.create_future()
+                self._waiters.setdefault(item_id, []).append(pending[item_id])
+        if not pending:
+            return True
+        self.write_waits += 1
+        try:
+            with Span("outbox_relay.wait_applied", "relay"):
+                await asyncio.wait_for(asyncio.gather(*pending.values()), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.write_wait_timeouts += 1
+            logger.warning(f"Vectors of {sorted(pending)} not applied within {timeout}s; they stay queued.")
+            return False
+        finally:
+            for item_id, future in pending.items():
+                waiters = self._waiters.get(item_id)
+                if waiters is not None and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._waiters[item_id]
+
+    async def _apply(self, items: List[Dict]) -> None:
+        started = time.perf_counter()
+        try:
+            await self._services.vector_service.insert_item_vectors(items)
+        except BaseException:
+            OUTBOX_APPLY_SECONDS.labels("error").observe(time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        OUTBOX_APPLY_SECONDS.labels("ok").observe(elapsed)
+        OUTBOX_APPLY_ITEMS.observe(len(items))
+        self.last_apply_ms = round(elapsed * 1000, 2)
+        for item in items:
+            item_id = str(item["id"])
+            self._applied.set(item_id, True)
+            for waiter in self._waiters.pop(item_id, ()):
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _retry_seconds(self) -> float:
+        """Exponential backoff with full jitter, capped at OUTBOX_RETRY_MAX_SECONDS."""
+        ceiling = min(
+            settings.OUTBOX_RETRY_MAX_SECONDS,
+            settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** self._consecutive_failures),
+        )
+        return random.uniform(0, ceiling)
+
+    async def drain_once(self) -> int:
+        try:
+            applied = await self._services.vector_outbox.drain(
+                self._apply,
+                self.batch_size,
+                self._retry_seconds(),
+                settings.OUTBOX_MAX_ATTEMPTS,
+                settings.OUTBOX_LEASE_SECONDS,
+            )
+        except Exception:
+            self._consecutive_failures += 1
+            self.failures += 1
+            raise
+        self._consecutive_failures = 0
+        if applied:
+            self.batches += 1
+            self.entries_applied += applied
+        return applied
+
+    async def flush(self) -> int:
+        """Apply due entries until none are left (used by CLIs before they exit)."""
+        total = 0
+        while True:
+            applied = await self.drain_once()
+            total += applied
+            if applied < self.batch_size:
+                return total
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # Cleared before draining, so a notify() for entries committed during the drain isn't lost.
+            self._wakeup.clear()
+            try:
+                applied = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Vector outbox relay failed: {e}")
+                applied = 0
+            if applied >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "batches": self.batches,
+            "entries_applied": self.entries_applied,
+            "failures": self.failures,
+            "awaiting_writes": sum(len(waiters) for waiters in self._waiters.values()),
+            "write_waits": self.write_waits,
+            "write_wait_timeouts": self.write_wait_timeouts,
+            "last_apply_ms": self.last_apply_ms,
+        }
+
+
+# Singleton
+outbox_relay = VectorOutboxRelay(services)
@@ -0,0 +1,63 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.infra.cache import LRUCache
+
+
+@dataclass
+class ImportProgress:
+    import_id: str
+    status: str = "running"  # "running" | "completed" | "failed"
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    batches: int = 0
+    matches: int = 0
+    errors: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    # Only the first few row errors are kept, so a bad file can't grow this without bound.
+    MAX_ERRORS = 100
+
+    def add_error(self, line: int, message: str) -> None:
+        self.rows_failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "import_id": self.import_id,
+            "status": self.status,
+            "rows_read": self.rows_read,
+            "rows_imported": self.rows_imported,
+            "rows_failed": self.rows_failed,
+            "batches": self.batches,
+            "matches": self.matches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_imported / elapsed, 1) if elapsed > 0 else 0.0,
+            "errors": self.errors,
+            "error": self.error,
+        }
+
+
+class ImportProgressRegistry:
+    """Keeps the most recent imports so their progress can be polled while they run."""
+
+    def __init__(self, max_imports: int = 256):
+        self._imports = LRUCache(max_imports)
+
+    def start(self, import_id: str) -> ImportProgress:
+        progress = ImportProgress(import_id=import_id)
+        self._imports.set(import_id, progress)
+        return progress
+
+    def get(self, import_id: str) -> Optional[ImportProgress]:
+        return self._imports.get(import_id)
+
+
+# Singleton
+import_progress = ImportProgressRegistry()
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.config.services import Services
+from app.config.settings import settings
+from app.data_services.base.vector_interface import VectorSearchService
+
+logger = logging.getLogger(__name__)
+
+MATCH_METHOD = "rematch"
+
+# A stored pair only changes when the recomputed score beats it by more than this;
+# insert_matches keeps the higher score anyway.
+SCORE_EPSILON = 1e-4
+
+
+@dataclass
+class RematchStats:
+    lost_reports: int = 0
+    found_items: int = 0
+    lost_without_vector: int = 0
+    found_without_vector: int = 0
+    pairs_scored: int = 0
+    matches_new: int = 0
+    matches_changed: int = 0
+    matches_unchanged: int = 0
+    dry_run: bool = False
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> Dict:
+        stats = asdict(self)
+        stats["elapsed_seconds"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        return stats
+
+
+def top_k_chunk(queries: np.ndarray, corpus: np.ndarray, top_k: int, corpus_chunk: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k corpus rows by dot product for each query row, scanning the corpus `corpus_chunk`
+    rows at a time. Each block's candidates are cut to k with `argpartition` and merged into
+    a running (queries x k) best list, so memory is one (queries x corpus_chunk) score block.
+    Returns (indices, scores), both (queries x k) and sorted best-first; unused slots are -1 / -inf.
+    """
+    n = queries.shape[0]
+    best_scores = np.full((n, top_k), -np.inf, dtype=np.float32)
+    best_indices = np.full((n, top_k), -1, dtype=np.int64)
+    for start in range(0, corpus.shape[0], corpus_chunk):
+        block = np.asarray(corpus[start:start + corpus_chunk], dtype=np.float32)
+        scores = queries @ block.T
+        k = min(top_k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), (n, scores.shape[1]))
+        merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, candidates, axis=1)], axis=1)
+        merged_indices = np.concatenate([best_indices, candidates + start], axis=1)
+        keep = np.argpartition(-merged_scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_indices, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def top_k_all_pairs(
+    queries: np.ndarray, corpus: np.ndarray, top_k: int, query_chunk: int, corpus_chunk: int
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (first query row, indices, scores) per chunk of `query_chunk` query rows."""
+    for start in range(0, queries.shape[0], query_chunk):
+        block = np.asarray(queries[start:start + query_chunk], dtype=np.float32)
+        indices, scores = top_k_chunk(block, corpus, top_k, corpus_chunk)
+        yield start, indices, scores
+
+
+async def load_unit_vectors(
+    vector_service: VectorSearchService, item_ids: List[str], path: str, fetch_batch: int
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Fetch vectors for `item_ids` in batches into an L2-normalized float32 memmap at `path`.
+    Only the current batch is held in memory; IDs without a stored vector are dropped.
+    """
+    kept: List[str] = []
+    matrix: Optional[np.ndarray] = None
+    for start in range(0, len(item_ids), fetch_batch):
+        batch_ids = item_ids[start:start + fetch_batch]
+        vectors = await vector_service.get_vectors(batch_ids)
+        found = [item_id for item_id in batch_ids if item_id in vectors]
+        if not found:
+            continue
+        block = np.asarray([vectors[item_id] for item_id in found], dtype=np.float32)
+        if matrix is None:
+            matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(len(item_ids), block.shape[1]))
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[len(kept):len(kept) + len(found)] = block / np.where(norms == 0, 1, norms)
+        kept.extend(found)
+    if matrix is None:
+        return [], np.empty((0, 0), dtype=np.float32)
+    matrix.flush()
+    return kept, matrix[: len(kept)]
+
+
+async def rematch_all(
+    services: Services,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    lost_chunk: Optional[int] = None,
+    found_chunk: Optional[int] = None,
+    dry_run: bool = False,
+) -> RematchStats:
+    """
+    Re-score every open lost report against every active found item and store each report's
+    top-k pairs that are new or now score higher. Vectors are staged in temporary memmaps,
+    then scored one chunk of lost reports at a time against chunks of found items.
+    """
+    top_k = top_k or settings.REMATCH_TOP_K
+    min_score = settings.REMATCH_MIN_SCORE if min_score is None else min_score
+    lost_chunk = lost_chunk or settings.REMATCH_LOST_CHUNK
+    found_chunk = found_chunk or settings.REMATCH_FOUND_CHUNK
+    stats = RematchStats(dry_run=dry_run)
+
+    lost_ids = await services.db_service.get_lost_report_ids("open")
+    found_ids = await services.db_service.get_found_item_ids("active")
+    stats.lost_reports, stats.found_items = len(lost_ids), len(found_ids)
+
+    with tempfile.TemporaryDirectory(prefix="rematch-") as workdir:
+        lost_ids, lost_matrix = await load_unit_vectors(
+            services.vector_service, lost_ids, os.path.join(workdir, "lost.npy"), settings.REMATCH_FETCH_BATCH
+        )
+        found_ids, found_matrix = await load_unit_vectors(
+            services.vector_service, found_ids, os.path.join(workdir, "found.npy"), settings.REMATCH_FETCH_BATCH
+        )
+        stats.lost_without_vector = stats.lost_reports - len(lost_ids)
+        stats.found_without_vector = stats.found_items - len(found_ids)
+        if not lost_ids or not found_ids:
+            stats.finished_at = time.time()
+            return stats
+
+        for start in range(0, len(lost_ids), lost_chunk):
+            block = lost_matrix[start:start + lost_chunk]
+            # The matmul releases the GIL, so scoring runs off the event loop.
+            indices, scores = await asyncio.to_thread(top_k_chunk, np.asarray(block), found_matrix, top_k, found_chunk)
+            stats.pairs_scored += block.shape[0] * len(found_ids)
+
+            chunk_lost_ids = lost_ids[start:start + block.shape[0]]
+            existing = await services.db_service.get_match_scores(chunk_lost_ids)
+            records = []
+            for row, lost_id in enumerate(chunk_lost_ids):
+                for index, score in zip(indices[row], scores[row]):
+                    if index < 0 or score < min_score:
+                        continue
+                    found_id = found_ids[index]
+                    previous = existing.get((lost_id, found_id))
+                    if previous is not None and float(score) <= previous + SCORE_EPSILON:
+                        stats.matches_unchanged += 1
+                        continue
+                    if previous is None:
+                        stats.matches_new += 1
+                    else:
+                        stats.matches_changed += 1
+                    records.append({
+                        "lost_report_id": lost_id,
+                        "found_item_id": found_id,
+                        "score": float(score),
+                        "method": MATCH_METHOD,
+                    })
+            if records and not dry_run:
+                await services.db_service.insert_matches(records)
+            logger.info(
+                f"Re-matched {min(start + lost_chunk, len(lost_ids))}/{len(lost_ids)} lost reports "
+                f"({len(records)} rows written)."
+            )
+
+        del lost_matrix, found_matrix
+
+    stats.finished_at = time.time()
+    return stats
@@ -1,5 +1,9 @@
+from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel
 
 class LostItemInput(BaseModel):
     description: str
     location_hint: str = "unknown"
+    lost_at: Optional[datetime] = None
@@ -0,0 +1,145 @@
+"""
+Cold start of a fresh API process against the offline stand-ins of benchmarks.load_e2e (fake
+OpenAI server, Qdrant ":memory:", local storage, DB_BACKEND=memory unless --db postgres).
+
+Each run spawns `uvicorn app.main:app` in a new interpreter and measures the time until
+/healthz answers (imports and startup done) and until /readyz turns 200 (warm-up done), plus the
+latency of the first found-item and lost-item submissions. Runs alternate with
+STARTUP_WARMUP_ENABLED on and off:
+    python -m benchmarks.cold_start --runs 5 --latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_openai import add_config_args, config_from_args, create_app, describe, running
+from benchmarks.load_e2e import make_image
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(client: httpx.AsyncClient, path: str, started: float, deadline: float) -> Optional[Dict]:
+    """Poll `path` until it answers 200; returns the body and the seconds since `started`."""
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get(path)
+            if response.status_code == 200:
+                return {"seconds": round(time.perf_counter() - started, 4), "body": response.json()}
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.005)
+    return None
+
+
+async def first_requests(client: httpx.AsyncClient, seed: int, edge: int) -> Dict:
+    timings = {}
+    started = time.perf_counter()
+    response = await client.post("/submit_lost_item", json={"description": describe(seed), "location_hint": "library"})
+    timings["first_lost_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    timings["first_lost_status"] = response.status_code
+
+    image = make_image(seed, edge)
+    started = time.perf_counter()
+    response = await client.post(
+        "/submit_found_item", files={"image": ("found.jpg", image, "image/jpeg")}, data={"location_hint": "library"}
+    )
+    timings["first_found_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    timings["first_found_status"] = response.status_code
+    return timings
+
+
+async def measure(args: argparse.Namespace, env: Dict[str, str], run: int) -> Dict:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if not args.verbose else None,
+    )
+    try:
+        deadline = started + args.timeout
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout) as client:
+            live = await wait_for(client, "/healthz", started, deadline)
+            ready = await wait_for(client, "/readyz", started, deadline)
+            if live is None or ready is None:
+                raise RuntimeError(f"server on port {port} did not become ready within {args.timeout}s")
+            result = {
+                "warmup": env["STARTUP_WARMUP_ENABLED"] == "true",
+                "live_seconds": live["seconds"],
+                "ready_seconds": ready["seconds"],
+                "startup": ready["body"]["startup"],
+            }
+            result.update(await first_requests(client, 1000 + run, args.image_edge))
+            return result
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    def mean(key: str) -> float:
+        return round(sum(run[key] for run in runs) / len(runs), 4) if runs else 0.0
+
+    return {
+        "runs": len(runs),
+        "live_seconds": mean("live_seconds"),
+        "ready_seconds": mean("ready_seconds"),
+        "first_lost_ms": mean("first_lost_ms"),
+        "first_found_ms": mean("first_found_ms"),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = create_app(config_from_args(args))
+    with running(fake) as openai_url, tempfile.TemporaryDirectory(prefix="cold-start-") as storage_path:
+        env = {
+            **os.environ,
+            "OPENAI_BASE_URL": openai_url,
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "fake",
+            "VECTOR_BACKEND": "qdrant",
+            "QDRANT_URL": args.qdrant_url,
+            "QDRANT_VECTOR_SIZE": str(args.dim),
+            "STORAGE_BACKEND": "local",
+            "STORAGE_LOCAL_PATH": storage_path,
+            "DB_BACKEND": args.db,
+        }
+        runs = []
+        for run in range(args.runs):
+            for warmup in ("true", "false"):
+                runs.append(await measure(args, {**env, "STARTUP_WARMUP_ENABLED": warmup}, run))
+
+    print(json.dumps({
+        "warm": summarize([run for run in runs if run["warmup"]]),
+        "cold": summarize([run for run in runs if not run["warmup"]]),
+        "runs": runs,
+    }, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Process starts per mode")
+    parser.add_argument("--db", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--image-edge", type=int, default=1024)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="Show the server's stderr")
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,288 @@
+"""
+Local stand-in for the OpenAI API (embeddings and chat completions) for load tests.
+
+Responses carry x-ratelimit-* headers from per-model request/token buckets, calls over budget
+get a real-looking 429, and latency and extra 429s/5xxs can be injected. Embeddings are hashed
+bag-of-words vectors, so texts sharing words land close together; captions are picked
+deterministically from the image bytes out of a small item vocabulary.
+
+Point the app at it with OPENAI_BASE_URL:
+    python -m benchmarks.fake_openai --port 8100 --rpm 600 --latency-ms 200 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+COLORS = ["black", "brown", "red", "blue", "green", "silver", "white", "pink", "grey", "yellow"]
+ITEMS = [
+    "leather wallet with card slots",
+    "backpack with a laptop sleeve",
+    "umbrella with a curved handle",
+    "water bottle with stickers",
+    "set of keys on a ring",
+    "wireless earbuds in a charging case",
+    "wool scarf with fringed ends",
+    "smartphone in a rubber case",
+    "pair of prescription glasses",
+    "baseball cap with an embroidered logo",
+    "notebook with a spiral binding",
+    "puffer jacket with a hood",
+]
+BRANDS = ["", "Nike", "Apple", "Hydro Flask", "North Face", "Samsung", "Ray-Ban", "Moleskine"]
+
+
+def describe(seed: int) -> str:
+    """Deterministic item description for `seed`; shared with load generators writing lost reports."""
+    rng = random.Random(seed)
+    brand = rng.choice(BRANDS)
+    return f"A {rng.choice(COLORS)} {brand + ' ' if brand else ''}{rng.choice(ITEMS)}, slightly worn."
+
+
+@lru_cache(maxsize=65536)
+def _word_vector(word: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def embed(text: str, dim: int) -> List[float]:
+    words = [w.strip(".,").lower() for w in text.split()] or [""]
+    vector = sum(_word_vector(w, dim) for w in words)
+    norm = float(np.linalg.norm(vector)) or 1.0
+    return (vector / norm).tolist()
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class Budget:
+    """Server-side per-minute limit as a token bucket holding `burst_seconds` worth of budget."""
+
+    def __init__(self, per_minute: int, burst_seconds: float):
+        self.limit = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds) if per_minute else 0.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float) -> Tuple[bool, float]:
+        """(allowed, seconds until `amount` would be available)."""
+        if not self.limit:
+            return True, 0.0
+        self._refill()
+        if self.level >= amount:
+            self.level -= amount
+            return True, 0.0
+        return False, (min(amount, self.capacity) - self.level) / self.rate
+
+    def headers(self, kind: str) -> Dict[str, str]:
+        if not self.limit:
+            return {}
+        self._refill()
+        remaining = int(self.level)
+        reset = (self.capacity - self.level) / self.rate
+        return {
+            f"x-ratelimit-limit-{kind}": str(self.limit),
+            f"x-ratelimit-remaining-{kind}": str(max(remaining, 0)),
+            f"x-ratelimit-reset-{kind}": f"{reset:.3f}s",
+        }
+
+
+@dataclass
+class FakeConfig:
+    rpm: int = 0
+    tpm: int = 0
+    burst_seconds: float = 60.0
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    per_input_ms: float = 0.5
+    error_rate: float = 0.0
+    server_error_rate: float = 0.0
+    dim: int = 1536
+
+
+@dataclass
+class FakeStats:
+    requests: int = 0
+    ok: int = 0
+    throttled: int = 0
+    injected_throttled: int = 0
+    injected_errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    embedded_inputs: int = 0
+    by_model: Dict[str, int] = field(default_factory=dict)
+
+
+def create_app(config: Optional[FakeConfig] = None) -> FastAPI:
+    config = config or FakeConfig()
+    app = FastAPI(title="fake-openai")
+    app.state.config = config
+    app.state.stats = FakeStats()
+    budgets: Dict[str, Tuple[Budget, Budget]] = {}
+
+    def budgets_for(model: str) -> Tuple[Budget, Budget]:
+        if model not in budgets:
+            budgets[model] = (Budget(config.rpm, config.burst_seconds), Budget(config.tpm, config.burst_seconds))
+        return budgets[model]
+
+    async def serve(model: str, tokens: int, inputs: int, body: Dict) -> JSONResponse:
+        stats: FakeStats = app.state.stats
+        stats.requests += 1
+        stats.by_model[model] = stats.by_model.get(model, 0) + 1
+        requests, token_budget = budgets_for(model)
+        ok_requests, wait_requests = requests.take(1)
+        ok_tokens, wait_tokens = token_budget.take(tokens) if ok_requests else (True, 0.0)
+        if ok_requests and not ok_tokens:
+            requests.level += 1  # the rejected call doesn't spend a request
+        headers = {**requests.headers("requests"), **token_budget.headers("tokens")}
+        if not (ok_requests and ok_tokens) or random.random() < config.error_rate:
+            wait = max(wait_requests, wait_tokens)
+            if ok_requests and ok_tokens:
+                stats.injected_throttled += 1
+                wait = random.uniform(0.05, 0.5)
+            stats.throttled += 1
+            return JSONResponse(
+                {"error": {"message": f"Rate limit reached for {model}.", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={**headers, "retry-after-ms": str(int(wait * 1000))},
+            )
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            delay = config.latency_ms + random.uniform(0, config.jitter_ms) + config.per_input_ms * inputs
+            await asyncio.sleep(delay / 1000.0)
+        finally:
+            stats.in_flight -= 1
+        if random.random() < config.server_error_rate:
+            stats.injected_errors += 1
+            return JSONResponse({"error": {"message": "The server had an error.", "type": "server_error"}}, status_code=500)
+        stats.ok += 1
+        return JSONResponse(body, headers=headers)
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        payload = await request.json()
+        inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        tokens = sum(count_tokens(text) for text in inputs)
+        app.state.stats.embedded_inputs += len(inputs)
+        body = {
+            "object": "list",
+            "model": payload["model"],
+            "data": [
+                {"object": "embedding", "index": i, "embedding": embed(text, config.dim)} for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+        return await serve(payload["model"], tokens, len(inputs), body)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        prompt_tokens = 0
+        seed_source = b""
+        for message in payload["messages"]:
+            content = message["content"]
+            parts = content if isinstance(content, list) else [{"type": "text", "text": content}]
+            for part in parts:
+                if part["type"] == "text":
+                    prompt_tokens += count_tokens(part["text"])
+                elif part["type"] == "image_url":
+                    prompt_tokens += 765
+                    seed_source += part["image_url"]["url"].encode()
+        caption = describe(int.from_bytes(hashlib.sha256(seed_source).digest()[:8], "little"))
+        completion_tokens = count_tokens(caption)
+        body = {
+            "id": f"chatcmpl-fake-{random.getrandbits(48):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload["model"],
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": caption}, "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+        return await serve(payload["model"], prompt_tokens + completion_tokens, 1, body)
+
+    @app.get("/v1/models/{model}")
+    async def retrieve_model(model: str):
+        # Target of the app's startup warm-up; costs no tokens, so it sits outside the model budgets.
+        return {"id": model, "object": "model", "created": 0, "owned_by": "fake"}
+
+    return app
+
+
+@contextmanager
+def running(app: FastAPI, host: str = "127.0.0.1", port: int = 0, lifespan: str = "off") -> Iterator[str]:
+    """Serve `app` from a background thread; yields the OpenAI-style base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan=lifespan))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("server failed to start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}/v1"
+    finally:
+        server.should_exit = True
+        # Long enough for an app lifespan to drain its background work on shutdown.
+        thread.join(timeout=30)
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute per model (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute per model (0 = unlimited)")
+    parser.add_argument("--burst-seconds", type=float, default=60.0, help="Bucket depth, in seconds of budget")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--per-input-ms", type=float, default=0.5, help="Extra latency per embedding input")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with an injected 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction of calls answered with a 500")
+    parser.add_argument("--dim", type=int, default=1536)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    return FakeConfig(
+        rpm=args.rpm,
+        tpm=args.tpm,
+        burst_seconds=args.burst_seconds,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        per_input_ms=args.per_input_ms,
+        error_rate=args.error_rate,
+        server_error_rate=args.server_error_rate,
+        dim=args.dim,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_config_args(parser)
+    cli_args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(cli_args)), host=cli_args.host, port=cli_args.port, log_level="warning")
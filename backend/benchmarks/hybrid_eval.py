@@ -0,0 +1,155 @@
+"""
+Offline evaluation of dense-only versus hybrid (dense + lexical, RRF-fused, reranked) matching.
+
+By default a synthetic lost-and-found corpus is generated whose dense vectors capture item
+category and colour but blur brand names and serial numbers, which is the failure mode hybrid
+retrieval targets. Pass --dataset to evaluate real data instead:
+
+    {"items":   [{"id": "...", "text": "...", "vector": [...]}, ...],
+     "queries": [{"text": "...", "vector": [...], "relevant": ["item id", ...]}, ...]}
+
+Runs against embedded Qdrant by default (QDRANT_URL=":memory:"):
+    python -m benchmarks.hybrid_eval --items 5000 --queries 500 --k 1 5 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import numpy as np
+
+from app.config.settings import settings
+
+CATEGORIES = ["iphone", "android phone", "backpack", "wallet", "keys", "headphones", "water bottle", "laptop", "umbrella", "jacket"]
+COLORS = ["black", "white", "blue", "red", "green", "grey", "silver", "pink"]
+BRANDS = ["apple", "samsung", "nike", "adidas", "sony", "bose", "hydroflask", "dell", "lenovo", "northface", "patagonia", "herschel"]
+
+
+def synthetic_dataset(n_items: int, n_queries: int, dim: int, seed: int) -> Dict:
+    rng = np.random.default_rng(seed)
+    rand = random.Random(seed)
+    unit = lambda v: v / np.linalg.norm(v)
+    category_vecs = {c: unit(rng.standard_normal(dim)) for c in CATEGORIES}
+    color_vecs = {c: unit(rng.standard_normal(dim)) for c in COLORS}
+    brand_vecs = {b: unit(rng.standard_normal(dim)) for b in BRANDS}
+
+    def dense(category: str, color: str, brand: str) -> List[float]:
+        v = category_vecs[category] + 0.5 * color_vecs[color] + 0.1 * brand_vecs[brand] + 0.35 * unit(rng.standard_normal(dim))
+        return unit(v).astype(np.float32).tolist()
+
+    items = []
+    for _ in range(n_items):
+        category, color, brand = rand.choice(CATEGORIES), rand.choice(COLORS), rand.choice(BRANDS)
+        serial = f"sn-{rand.randint(1000, 99999)}" if rand.random() < 0.5 else None
+        text = f"A {color} {brand} {category}" + (f", serial number {serial} engraved on the back" if serial else "") + "."
+        items.append({
+            "id": str(uuid.uuid4()), "text": text, "vector": dense(category, color, brand),
+            "category": category, "color": color, "brand": brand, "serial": serial,
+        })
+
+    queries = []
+    for item in rand.sample(items, min(n_queries, len(items))):
+        parts = [f"lost my {item['color']} {item['category']}", f"it's a {item['brand']}"]
+        if item["serial"]:
+            parts.append(f"serial {item['serial'].split('-')[1]}")
+        rand.shuffle(parts)
+        queries.append({
+            "text": ", ".join(parts),
+            "vector": dense(item["category"], item["color"], item["brand"]),
+            "relevant": [item["id"]],
+        })
+    return {"items": items, "queries": queries}
+
+
+def evaluate(results: List[List[str]], queries: List[Dict], ks: List[int]) -> Dict:
+    report = {}
+    for k in ks:
+        hits = [bool(set(ids[:k]) & set(q["relevant"])) for ids, q in zip(results, queries)]
+        report[f"recall@{k}"] = round(sum(hits) / len(hits), 4)
+    reciprocal = []
+    for ids, q in zip(results, queries):
+        rank = next((i + 1 for i, item_id in enumerate(ids) if item_id in q["relevant"]), None)
+        reciprocal.append(1 / rank if rank else 0.0)
+    report["mrr"] = round(statistics.fmean(reciprocal), 4)
+    return report
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.dataset:
+        with open(args.dataset) as f:
+            data = json.load(f)
+    else:
+        data = synthetic_dataset(args.items, args.queries, args.dim, args.seed)
+    dim = len(data["items"][0]["vector"])
+
+    settings.MATCH_MODE = "hybrid"
+    settings.QDRANT_VECTOR_SIZE = dim
+    settings.QDRANT_COLLECTION = args.collection
+    if args.url:
+        settings.QDRANT_URL = args.url
+    elif not settings.QDRANT_URL:
+        settings.QDRANT_URL = ":memory:"
+
+    from app.infra.qdrant_client import qdrant_client
+    from app.data_services.qdrant_service import QdrantVectorService
+
+    await qdrant_client.init()
+    service = QdrantVectorService(args.collection)
+    try:
+        await service.insert_item_vectors([
+            {"id": item["id"], "vector": item["vector"], "payload": {"type": "found"}, "text": item["text"]}
+            for item in data["items"]
+        ])
+
+        top_k = max(args.k)
+        report = {"items": len(data["items"]), "queries": len(data["queries"]), "modes": {}}
+        for mode in ("dense", "hybrid"):
+            latencies, results = [], []
+            for query in data["queries"]:
+                started = time.perf_counter()
+                hits = await service.search_similar(
+                    query["vector"],
+                    top_k=top_k,
+                    filter_payload={"type": "found"},
+                    query_text=query["text"] if mode == "hybrid" else None,
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                results.append([hit["id"] for hit in hits])
+            report["modes"][mode] = {**evaluate(results, data["queries"], args.k), **latency_summary(latencies)}
+    finally:
+        if not args.keep:
+            await qdrant_client.get_client().delete_collection(args.collection)
+        await qdrant_client.close()
+
+    print(json.dumps(report, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=None, help="JSON dataset with items and queries (default: synthetic)")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=256, help="Dense dimension for the synthetic dataset")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="Qdrant URL (default: QDRANT_URL, else embedded :memory:)")
+    parser.add_argument("--collection", default="bench_hybrid_eval")
+    parser.add_argument("--keep", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
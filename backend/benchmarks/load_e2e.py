@@ -0,0 +1,317 @@
+"""
+End-to-end load test of the API, fully offline: the real app (uvicorn, lifespan, middleware,
+outbox relay, job workers) served from a background thread with local stand-ins for every
+external service:
+    - OpenAI: the fake server from benchmarks.fake_openai (latency, 429s and 5xxs configurable)
+    - Qdrant: local mode, QDRANT_URL=":memory:" (or --qdrant-url for a real one)
+    - Postgres: DB_BACKEND=memory, or --db postgres against SUPABASE_DB_DIRECT_URL (schema applied)
+    - Storage: STORAGE_BACKEND=local, in a temporary directory
+
+Drives POST /submit_found_item (generated JPEGs, each distinct so no cache hides the work) and
+POST /submit_lost_item (descriptions from the fake server's item vocabulary, so they match)
+interleaved at --concurrency, and reports throughput, latency percentiles and a per-stage
+breakdown from the Server-Timing headers. Results are JSON; pass --baseline to compare with an
+earlier run (exit status 1 if throughput or p95 regressed by more than --tolerance):
+    python -m benchmarks.load_e2e --found 300 --lost 300 --concurrency 32 --output run.json
+    python -m benchmarks.load_e2e --found 300 --lost 300 --concurrency 32 --baseline run.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+from app.config.settings import settings
+from benchmarks.fake_openai import add_config_args, config_from_args, create_app, describe, running
+
+LOCATIONS = ["library", "main_station", "campus_gym", "city_park", "airport_t2", "museum"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+def latency_summary(seconds: List[float]) -> Dict:
+    return {
+        "mean_ms": round(sum(seconds) / len(seconds) * 1000, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(seconds, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(seconds, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(seconds, 0.99) * 1000, 2),
+        "max_ms": round(max(seconds, default=0.0) * 1000, 2),
+    }
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """{stage: seconds} from a Server-Timing header (repeated stages are already summed)."""
+    stages = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, *params = entry.split(";")
+        for param in params:
+            if param.startswith("dur="):
+                stages[name] = float(param[4:]) / 1000.0
+    return stages
+
+
+def make_image(seed: int, edge: int) -> bytes:
+    """A distinct photo-sized JPEG: a random base colour plus noise, so it doesn't compress to nothing."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=3)
+    pixels = np.clip(base + rng.normal(0, 40, size=(edge, edge, 3)), 0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.stages: Dict[str, Dict[str, List[float]]] = {}
+
+    def record(self, endpoint: str, seconds: float, status: str, timing: Optional[str] = None) -> None:
+        statuses = self.statuses.setdefault(endpoint, {})
+        statuses[status] = statuses.get(status, 0) + 1
+        if not status.startswith("2"):
+            return
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        stages = self.stages.setdefault(endpoint, {})
+        for name, duration in parse_server_timing(timing or "").items():
+            stages.setdefault(name, []).append(duration)
+
+    def error(self, endpoint: str, detail: str) -> None:
+        errors = self.errors.setdefault(endpoint, {})
+        errors[detail] = errors.get(detail, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for endpoint, statuses in sorted(self.statuses.items()):
+            latencies = self.latencies.get(endpoint, [])
+            stages = self.stages.get(endpoint, {})
+            endpoints[endpoint] = {
+                "requests": sum(statuses.values()),
+                "ok": len(latencies),
+                "statuses": statuses,
+                "errors": self.errors.get(endpoint, {}),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                **latency_summary(latencies),
+                # Per request: how long each stage took in total; "calls" is how many requests ran it.
+                "stages": {
+                    name: {"calls": len(durations), **latency_summary(durations)}
+                    for name, durations in sorted(stages.items(), key=lambda kv: -sum(kv[1]))
+                },
+            }
+        ok = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "seconds": round(elapsed, 3),
+            "ok": ok,
+            "throughput_rps": round(ok / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+
+async def submit_found(client: httpx.AsyncClient, recorder: Recorder, args: argparse.Namespace, image: bytes, i: int) -> None:
+    endpoint = "submit_found_item (async)" if args.found_async else "submit_found_item"
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/submit_found_item",
+            files={"image": (f"found_{i}.jpg", image, "image/jpeg")},
+            data={"location_hint": LOCATIONS[i % len(LOCATIONS)], "async_mode": str(args.found_async).lower()},
+        )
+    except httpx.HTTPError as e:
+        recorder.record(endpoint, time.perf_counter() - started, "transport_error")
+        recorder.error(endpoint, type(e).__name__)
+        return
+    if response.status_code >= 300:
+        recorder.error(endpoint, response.text[:200])
+    recorder.record(endpoint, time.perf_counter() - started, str(response.status_code), response.headers.get("server-timing"))
+    if args.found_async and response.status_code == 202:
+        await wait_for_job(client, recorder, response.json()["status_url"], started)
+
+
+async def wait_for_job(client: httpx.AsyncClient, recorder: Recorder, status_url: str, started: float) -> None:
+    """Poll an async submission until its job finishes; recorded as the "found_item job" endpoint."""
+    while True:
+        await asyncio.sleep(0.05)
+        try:
+            job = (await client.get(status_url)).json()
+        except httpx.HTTPError:
+            continue
+        if job["status"] in ("succeeded", "failed"):
+            status = "200" if job["status"] == "succeeded" else "failed"
+            timing = ", ".join(f"job.{name};dur={seconds * 1000:.1f}" for name, seconds in job["stage_timings"].items())
+            if job["status"] == "failed":
+                recorder.error("found_item job", (job.get("error") or "")[:200])
+            recorder.record("found_item job", time.perf_counter() - started, status, timing)
+            return
+
+
+async def submit_lost(client: httpx.AsyncClient, recorder: Recorder, i: int) -> None:
+    endpoint = "submit_lost_item"
+    lost_at = datetime.now(timezone.utc) - timedelta(hours=i % 72)
+    started = time.perf_counter()
+    try:
+        response = await client.post(
+            "/submit_lost_item",
+            json={
+                "description": f"{describe(i)} Lost it around the {LOCATIONS[i % len(LOCATIONS)].replace('_', ' ')}.",
+                "location_hint": LOCATIONS[i % len(LOCATIONS)],
+                "lost_at": lost_at.isoformat(),
+            },
+        )
+    except httpx.HTTPError as e:
+        recorder.record(endpoint, time.perf_counter() - started, "transport_error")
+        recorder.error(endpoint, type(e).__name__)
+        return
+    if response.status_code >= 300:
+        recorder.error(endpoint, response.text[:200])
+    recorder.record(endpoint, time.perf_counter() - started, str(response.status_code), response.headers.get("server-timing"))
+
+
+async def drive(base_url: str, args: argparse.Namespace, requests: List[Tuple[str, int]], images: Dict[int, bytes]) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    work: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        work.put_nowait(request)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+
+        async def worker() -> None:
+            while not work.empty():
+                kind, i = work.get_nowait()
+                if kind == "found":
+                    await submit_found(client, recorder, args, images[i], i)
+                else:
+                    await submit_lost(client, recorder, i)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return recorder, time.perf_counter() - started
+
+
+def build_requests(args: argparse.Namespace, offset: int, found: int, lost: int) -> List[Tuple[str, int]]:
+    requests = [("found", offset + i) for i in range(found)] + [("lost", offset + i) for i in range(lost)]
+    random.Random(args.seed + offset).shuffle(requests)
+    return requests
+
+
+def configure(args: argparse.Namespace, openai_url: str, storage_path: str) -> None:
+    """Point the app at the stand-ins. Runs before app.main is imported, which reads settings at import."""
+    settings.OPENAI_BASE_URL = openai_url
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "fake"
+    settings.VECTOR_BACKEND = "qdrant"
+    settings.QDRANT_URL = args.qdrant_url
+    settings.QDRANT_VECTOR_SIZE = args.dim
+    settings.STORAGE_BACKEND = "local"
+    settings.STORAGE_LOCAL_PATH = storage_path
+    settings.DB_BACKEND = args.db
+    settings.TRACING_ENABLED = True
+    settings.JOB_WORKERS_ENABLED = True
+    if args.job_workers:
+        settings.JOB_WORKER_CONCURRENCY = args.job_workers
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Endpoints whose throughput fell, or whose p95 rose, by more than `tolerance` against the baseline."""
+    regressions = []
+    for endpoint, current in result["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: throughput {before['throughput_rps']} -> {current['throughput_rps']} rps")
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+    return regressions
+
+
+async def run(args: argparse.Namespace, base_url: str, fake_stats) -> Dict:
+    images = {i: make_image(args.seed + i, args.image_edge) for i in range(args.warmup + args.found)}
+    if args.warmup:
+        # Not recorded: opens connections, creates the collection and fills the lazy services.
+        await drive(base_url, args, build_requests(args, 0, args.warmup, args.warmup), images)
+    recorder, elapsed = await drive(base_url, args, build_requests(args, args.warmup, args.found, args.lost), images)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        app_stats = (await client.get("/stats/cache")).json()
+    return {
+        "run": {
+            "label": args.label,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "found": args.found,
+            "lost": args.lost,
+            "found_async": args.found_async,
+            "concurrency": args.concurrency,
+            "image_edge": args.image_edge,
+            "image_kb": round(sum(len(images[i]) for i in images) / len(images) / 1024, 1) if images else 0,
+            "db": args.db,
+            "qdrant_url": args.qdrant_url,
+            "fake_openai": vars(config_from_args(args)),
+        },
+        **recorder.summary(elapsed),
+        "fake_openai_stats": {k: v for k, v in vars(fake_stats).items() if k != "in_flight"},
+        "app_stats": app_stats,
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    fake = create_app(config_from_args(args))
+    with running(fake) as openai_url, tempfile.TemporaryDirectory(prefix="load-e2e-") as storage_path:
+        configure(args, openai_url, storage_path)
+        from app.main import app
+
+        # One line per request from both the harness and the app's OpenAI client would drown the results.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        with running(app, lifespan="on") as app_url:
+            result = asyncio.run(run(args, app_url.removesuffix("/v1"), fake.state.stats))
+
+    text = json.dumps(result, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--found", type=int, default=200, help="Found-item submissions")
+    parser.add_argument("--lost", type=int, default=200, help="Lost-item submissions")
+    parser.add_argument("--found-async", action="store_true", help="Submit found items with async_mode and wait for the jobs")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--warmup", type=int, default=10, help="Unrecorded requests of each kind first")
+    parser.add_argument("--image-edge", type=int, default=1024, help="Generated image size in pixels per side")
+    parser.add_argument("--db", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--job-workers", type=int, default=0, help="JOB_WORKER_CONCURRENCY override (0 = settings)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default="", help="Free-form name stored with the results")
+    parser.add_argument("--output", help="Write the JSON results here")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression vs. the baseline, as a fraction")
+    add_config_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
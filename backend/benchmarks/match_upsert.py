@@ -0,0 +1,98 @@
+"""
+Rows/second of PostgresRepository.insert_matches for small and large batches, for a first
+write and for a re-run of the same pairs (every row takes the ON CONFLICT path).
+
+Runs in a scratch schema, so the real tables are untouched. Needs a reachable Postgres:
+    SUPABASE_DB_DIRECT_URL=postgresql://... python -m benchmarks.match_upsert --sizes 10 1000 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from app.config.settings import settings
+from app.data_services.postgres_db import PostgresRepository
+
+SCHEMA = "bench_match_upsert"
+
+
+class ScratchDatabase:
+    """Minimal stand-in for app.infra.database.Database bound to the scratch schema."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+
+    @asynccontextmanager
+    async def get_connection(self):
+        async with self._pool.acquire() as conn:
+            yield conn
+
+
+async def main(args: argparse.Namespace) -> None:
+    dsn = settings.SUPABASE_DB_DIRECT_URL or settings.SUPABASE_DB_POOLER_URL
+    if not dsn:
+        raise SystemExit("Set SUPABASE_DB_DIRECT_URL or SUPABASE_DB_POOLER_URL.")
+    async with asyncpg.create_pool(dsn, min_size=1, max_size=2) as admin:
+        await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+        await admin.execute(
+            f"""
+            CREATE TABLE {SCHEMA}.matches (
+                id uuid PRIMARY KEY,
+                lost_report_id uuid NOT NULL,
+                found_item_id uuid NOT NULL,
+                score double precision NOT NULL,
+                method varchar(50),
+                created_at timestamptz NOT NULL DEFAULT now(),
+                CONSTRAINT matches_lost_found_key UNIQUE (lost_report_id, found_item_id)
+            )
+            """
+        )
+    results = []
+    try:
+        async with asyncpg.create_pool(dsn, min_size=1, max_size=2, server_settings={"search_path": SCHEMA}) as pool:
+            repository = PostgresRepository(ScratchDatabase(pool))
+            for size in args.sizes:
+                lost_ids = [str(uuid.uuid4()) for _ in range(max(1, size // args.per_report))]
+                matches = [
+                    {
+                        "lost_report_id": lost_ids[i % len(lost_ids)],
+                        "found_item_id": str(uuid.uuid4()),
+                        "score": random.random(),
+                        "method": "bench",
+                    }
+                    for i in range(size)
+                ]
+                row = {"rows": size}
+                for phase in ("insert", "rerun"):
+                    timings = []
+                    for _ in range(args.repeat if phase == "rerun" else 1):
+                        started = time.perf_counter()
+                        await repository.insert_matches(matches)
+                        timings.append(time.perf_counter() - started)
+                    best = min(timings)
+                    row[phase] = {"seconds": round(best, 4), "rows_per_second": round(size / best)}
+                async with pool.acquire() as conn:
+                    row["stored_rows"] = await conn.fetchval("SELECT count(*) FROM matches")
+                    await conn.execute("TRUNCATE matches")
+                results.append(row)
+    finally:
+        async with asyncpg.create_pool(dsn, min_size=1, max_size=1) as admin:
+            await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    print(json.dumps(results, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--per-report", type=int, default=5, help="Matches per lost report")
+    parser.add_argument("--repeat", type=int, default=3, help="Re-runs timed per size (best is reported)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,97 @@
+"""
+Embedding-call storm against the fake OpenAI server, with the client-side limiter off and on.
+
+Every call gets a distinct text, so caching and deduplication don't hide anything. Reports
+successes, failures, 429s served, retries and call latency. With the limiter on, 429s should
+drop to a handful per adjustment and tail latency should fall, because callers queue locally
+instead of burning retries:
+    python -m benchmarks.openai_limiter --calls 2000 --callers 200 --rpm 1200 --burst-seconds 2
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from app.config.settings import settings
+from benchmarks.fake_openai import add_config_args, config_from_args, create_app, running
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def storm(args: argparse.Namespace, base_url: str, limiter: bool, run: int) -> Dict:
+    settings.OPENAI_BASE_URL = base_url
+    settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "fake"
+    settings.OPENAI_LIMITER_ENABLED = limiter
+    settings.OPENAI_DEADLINE_SECONDS = args.deadline
+    settings.EMBED_BATCHING_ENABLED = False
+    from app.infra.openai_client import OpenAIClient
+
+    client = OpenAIClient()
+    await client.init()
+    gate = asyncio.Semaphore(args.callers)
+    latencies: List[float] = []
+    failures: Dict[str, int] = {}
+
+    async def call(i: int) -> None:
+        async with gate:
+            started = time.perf_counter()
+            try:
+                await client.get_text_embedding(f"run {run} item {i} lost near the library")
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                failures[type(e).__name__] = failures.get(type(e).__name__, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(args.calls)))
+    elapsed = time.perf_counter() - started
+    stats = client.limiter_stats()
+    await client.close()
+    return {
+        "limiter": limiter,
+        "ok": len(latencies),
+        "failed": failures,
+        "seconds": round(elapsed, 2),
+        "calls_per_second": round(len(latencies) / elapsed, 1),
+        "retries": stats["retries"],
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "limits": stats["models"],
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    results = []
+    for run, limiter in enumerate(args.modes):
+        # A fresh server per run, so each starts with a full budget.
+        app = create_app(config_from_args(args))
+        with running(app) as base_url:
+            result = await storm(args, base_url, limiter == "on", run)
+        served = app.state.stats
+        result["server"] = {
+            "requests": served.requests,
+            "throttled": served.throttled,
+            "injected_throttled": served.injected_throttled,
+            "max_in_flight": served.max_in_flight,
+        }
+        results.append(result)
+    print(json.dumps(results, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--callers", type=int, default=200, help="Concurrent callers")
+    parser.add_argument("--deadline", type=float, default=60.0, help="Per-call deadline in seconds")
+    parser.add_argument("--modes", nargs="+", choices=["off", "on"], default=["off", "on"])
+    add_config_args(parser)
+    parser.set_defaults(rpm=1200, burst_seconds=2.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
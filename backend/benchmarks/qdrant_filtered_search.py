@@ -0,0 +1,148 @@
+"""
+Compare filtered search latency and memory for a plain Qdrant collection versus one
+created with the managed settings (keyword payload indexes, HNSW tuning, int8 scalar
+quantization with rescoring, on-disk float vectors).
+
+Needs a real Qdrant server (local mode ignores indexes and quantization):
+    QDRANT_URL=http://localhost:6333 python -m benchmarks.qdrant_filtered_search --points 100000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+from qdrant_client.async_qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    VectorParams,
+)
+
+from app.config.settings import settings
+from app.infra.qdrant_client import quantization_config, search_params
+
+
+async def resident_memory_bytes() -> Optional[int]:
+    """Best-effort server RSS from Qdrant's Prometheus endpoint."""
+    headers = {"api-key": settings.QDRANT_API_KEY} if settings.QDRANT_API_KEY else {}
+    try:
+        async with httpx.AsyncClient(timeout=5) as http:
+            response = await http.get(f"{settings.QDRANT_URL.rstrip('/')}/metrics", headers=headers)
+        for line in response.text.splitlines():
+            if line.startswith("memory_resident_bytes"):
+                return int(float(line.split()[-1]))
+    except Exception:
+        pass
+    return None
+
+
+async def load(client: AsyncQdrantClient, name: str, vectors: np.ndarray, managed: bool, batch: int) -> None:
+    if await client.collection_exists(name):
+        await client.delete_collection(name)
+    if managed:
+        await client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE, on_disk=settings.QDRANT_ON_DISK_VECTORS),
+            hnsw_config=HnswConfigDiff(m=settings.QDRANT_HNSW_M, ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT),
+            quantization_config=quantization_config(),
+        )
+        for field in ("type", "location_hint"):
+            await client.create_payload_index(name, field_name=field, field_schema=PayloadSchemaType.KEYWORD)
+    else:
+        await client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE),
+        )
+
+    for start in range(0, len(vectors), batch):
+        points = [
+            PointStruct(
+                id=str(uuid.uuid4()),
+                vector=vectors[i].tolist(),
+                payload={"type": "found" if i % 2 else "lost", "location_hint": f"site-{i % 20}"},
+            )
+            for i in range(start, min(start + batch, len(vectors)))
+        ]
+        await client.upsert(collection_name=name, points=points, wait=True)
+
+    # Let the optimizer finish building HNSW / quantized segments before timing searches.
+    while (await client.get_collection(name)).status.value != "green":
+        await asyncio.sleep(1)
+
+
+async def time_searches(
+    client: AsyncQdrantClient, name: str, queries: np.ndarray, managed: bool, top_k: int
+) -> List[float]:
+    query_filter = Filter(must=[FieldCondition(key="type", match=MatchValue(value="lost"))])
+    params = search_params() if managed else None
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        await client.search(
+            collection_name=name, query_vector=query.tolist(), limit=top_k, query_filter=query_filter, search_params=params
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    client = AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY or None)
+
+    report = {"points": args.points, "dim": args.dim, "queries": args.queries, "variants": {}}
+    for variant, managed in (("baseline", False), ("managed", True)):
+        name = f"bench_filtered_{variant}"
+        before = await resident_memory_bytes()
+        await load(client, name, vectors, managed, args.batch)
+        after = await resident_memory_bytes()
+        latencies = await time_searches(client, name, queries, managed, args.top_k)
+        in_ram_bytes_per_vector = args.dim * (1 if managed and quantization_config() else 4)
+        if not managed or not settings.QDRANT_ON_DISK_VECTORS:
+            in_ram_bytes_per_vector = args.dim * 4 + (args.dim if managed and quantization_config() else 0)
+        report["variants"][variant] = {
+            **summarize(latencies),
+            "estimated_vector_ram_mb": round(args.points * in_ram_bytes_per_vector / 2**20, 1),
+            "server_rss_delta_mb": round((after - before) / 2**20, 1) if before and after else None,
+        }
+        if not args.keep:
+            await client.delete_collection(name)
+
+    print(json.dumps(report, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections afterwards")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,80 @@
+"""
+Throughput and peak memory of the chunked all-pairs top-k kernel used by the re-matching job.
+
+Lost and found matrices are random unit vectors staged in memmaps, as the job does:
+    python -m benchmarks.rematch_allpairs --lost 100000 --found 100000 --dim 1536
+"""
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from app.pipelines.rematch import top_k_all_pairs
+
+
+def random_unit_memmap(path: str, rows: int, dim: int, rng: np.random.Generator, batch: int = 8192) -> np.ndarray:
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(rows, dim))
+    for start in range(0, rows, batch):
+        block = rng.standard_normal((min(batch, rows - start), dim)).astype(np.float32)
+        matrix[start:start + block.shape[0]] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    matrix.flush()
+    return matrix
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory(prefix="rematch-bench-") as workdir:
+        lost = random_unit_memmap(os.path.join(workdir, "lost.npy"), args.lost, args.dim, rng)
+        found = random_unit_memmap(os.path.join(workdir, "found.npy"), args.found, args.dim, rng)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        started = time.perf_counter()
+        rows = 0
+        for _, indices, _ in top_k_all_pairs(lost, found, args.top_k, args.lost_chunk, args.found_chunk):
+            rows += indices.shape[0]
+        elapsed = time.perf_counter() - started
+
+        if args.verify:
+            # Exact check of the first chunk against a dense argsort.
+            sample = np.asarray(lost[: min(64, args.lost)])
+            expected = np.argsort(-(sample @ np.asarray(found).T), axis=1)[:, : args.top_k]
+            got = next(top_k_all_pairs(sample, found, args.top_k, 64, args.found_chunk))[1]
+            assert np.array_equal(expected, got), "chunked top-k disagrees with exact top-k"
+
+        pairs = args.lost * args.found
+        print(json.dumps({
+            "lost": args.lost,
+            "found": args.found,
+            "dim": args.dim,
+            "top_k": args.top_k,
+            "lost_chunk": args.lost_chunk,
+            "found_chunk": args.found_chunk,
+            "rows": rows,
+            "elapsed_seconds": round(elapsed, 3),
+            "pairs_per_second": round(pairs / elapsed),
+            "gflops": round(2 * pairs * args.dim / elapsed / 1e9, 2),
+            "max_rss_mb_before": round(rss_before / 1024, 1),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }, indent=2))
+        del lost, found
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lost", type=int, default=100_000)
+    parser.add_argument("--found", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--lost-chunk", type=int, default=2048)
+    parser.add_argument("--found-chunk", type=int, default=8192)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
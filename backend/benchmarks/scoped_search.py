@@ -0,0 +1,109 @@
+"""
+Compare match-search latency with and without location/time scoping as total history grows.
+
+Items are spread over --locations campuses and --days of history; each query looks for
+recent items at one location. Scoped latency should stay roughly flat as --points grows,
+while unscoped latency grows with the whole inventory.
+
+In-process (NumPy backend) by default; pass --qdrant to use QDRANT_URL (or embedded :memory:):
+    python -m benchmarks.scoped_search --points 20000 100000 400000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import numpy as np
+
+from app.config.settings import settings
+from app.data_services.match_scope import MatchScope, scope_payload
+
+
+async def build_service(args: argparse.Namespace, collection: str):
+    if not args.qdrant:
+        from app.data_services.numpy_vector_service import NumpyVectorService
+        return NumpyVectorService()
+    settings.QDRANT_VECTOR_SIZE = args.dim
+    settings.QDRANT_URL = settings.QDRANT_URL or ":memory:"
+    from app.infra.qdrant_client import qdrant_client
+    from app.data_services.qdrant_service import QdrantVectorService
+    await qdrant_client.init()
+    await qdrant_client.ensure_collection(collection)
+    return QdrantVectorService(collection)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+async def run_size(args: argparse.Namespace, points: int) -> Dict:
+    rng = np.random.default_rng(args.seed)
+    now = time.time()
+    locations = [f"campus {i}" for i in range(args.locations)]
+    service = await build_service(args, f"bench_scoped_{points}")
+
+    for start in range(0, points, args.batch):
+        n = min(args.batch, points - start)
+        vectors = rng.standard_normal((n, args.dim)).astype(np.float32)
+        ages = rng.uniform(0, args.days * 86400, n)
+        where = rng.integers(0, args.locations, n)
+        await service.insert_item_vectors([
+            {
+                "id": str(uuid.uuid4()),
+                "vector": vectors[i].tolist(),
+                "payload": {"type": "found", **scope_payload(locations[where[i]], now - ages[i])},
+            }
+            for i in range(n)
+        ])
+
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32).tolist()
+    scopes = [MatchScope.around(locations[i % args.locations], now) for i in range(args.queries)]
+    report: Dict = {"points": points}
+    for mode in ("unscoped", "scoped"):
+        latencies = []
+        for vector, scope in zip(queries, scopes):
+            started = time.perf_counter()
+            if mode == "scoped":
+                await service.search_scoped(vector, scope, top_k=args.top_k, filter_payload={"type": "found"})
+            else:
+                await service.search_similar(vector, top_k=args.top_k, filter_payload={"type": "found"})
+            latencies.append((time.perf_counter() - started) * 1000)
+        report[mode] = {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+        }
+    await service.close()
+    return report
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.MATCH_SCOPE_ENABLED = True
+    results = [await run_size(args, points) for points in args.points]
+    print(json.dumps({
+        "locations": args.locations,
+        "days": args.days,
+        "window_days": settings.MATCH_TIME_WINDOW_DAYS,
+        "results": results,
+    }, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--qdrant", action="store_true", help="Use Qdrant instead of the in-process NumPy index")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,144 @@
+"""
+Image upload throughput for the storage backends.
+
+`--target fake` (default) serves a minimal stand-in for the Supabase Storage REST API from a
+background thread, so the HTTP backend can be measured offline. It is measured twice: on the
+shared pooled client, and with a fresh client per upload (the connection churn of the old
+supabase-py path). `--target supabase` uploads to the configured project (SUPABASE_* settings);
+`--backends local` measures the filesystem stand-in.
+    python -m benchmarks.storage_upload --uploads 500 --concurrency 32 --size-kb 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from fastapi import FastAPI, Request, Response
+
+from app.config.settings import settings
+from benchmarks.fake_openai import running
+
+
+def create_fake_storage(latency_ms: float) -> FastAPI:
+    app = FastAPI(title="fake-storage")
+    app.state.objects = {}
+    app.state.connections = set()
+
+    @app.post("/storage/v1/object/{bucket}/{key:path}")
+    async def upload(bucket: str, key: str, request: Request):
+        app.state.connections.add((request.client.host, request.client.port))
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        await asyncio.sleep(latency_ms / 1000.0)
+        app.state.objects[f"{bucket}/{key}"] = (size, request.headers.get("content-type"))
+        return {"Key": f"{bucket}/{key}"}
+
+    @app.get("/storage/v1/object/{bucket}/{key:path}")
+    async def download(bucket: str, key: str):
+        size, content_type = app.state.objects[f"{bucket}/{key}"]
+        return Response(b"\0" * size, media_type=content_type)
+
+    return app
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+async def run(args: argparse.Namespace, name: str, upload) -> Dict:
+    payload = b"\xff\xd8\xff" + os.urandom(args.size_kb * 1024 - 3)
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as spooled:
+        spooled.write(payload)
+        spooled.flush()
+
+        async def one(i: int) -> None:
+            async with gate:
+                started = time.perf_counter()
+                if args.from_file:
+                    with open(spooled.name, "rb") as body:
+                        await upload(body, f"bench_{i}.jpg")
+                else:
+                    await upload(payload, f"bench_{i}.jpg")
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.uploads)))
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": name,
+        "uploads": len(latencies),
+        "seconds": round(elapsed, 3),
+        "uploads_per_second": round(len(latencies) / elapsed, 1),
+        "mb_per_second": round(len(latencies) * len(payload) / elapsed / 1e6, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.data_services.local_storage import LocalStorageService
+    from app.data_services.supabase_storage import SupabaseStorageService
+    from app.infra.supabase_client import create_storage_http_client, supabase_client
+
+    results = []
+    if "local" in args.backends:
+        with tempfile.TemporaryDirectory(prefix="storage-bench-") as root:
+            results.append(await run(args, "local", LocalStorageService(root).upload_image))
+
+    if "supabase" in args.backends:
+        fake = create_fake_storage(args.latency_ms) if args.target == "fake" else None
+
+        async def measure() -> None:
+            service = SupabaseStorageService()
+            await supabase_client.init()
+            try:
+                result = await run(args, "supabase (pooled client)", service.upload_image)
+                if fake is not None:
+                    result["connections_opened"] = len(fake.state.connections)
+                results.append(result)
+            finally:
+                await supabase_client.close()
+            if fake is None:
+                return
+            fake.state.connections.clear()
+
+            async def unpooled(body, filename):
+                # A fresh client per upload: new connection (and TLS handshake, remotely) every time.
+                async with create_storage_http_client() as client:
+                    return await SupabaseStorageService(client=client).upload_image(body, filename)
+
+            result = await run(args, "supabase (client per upload)", unpooled)
+            result["connections_opened"] = len(fake.state.connections)
+            results.append(result)
+
+        if fake is None:
+            await measure()
+        else:
+            with running(fake) as base_url:
+                settings.SUPABASE_PROJECT_URL = base_url.removesuffix("/v1")
+                settings.SUPABASE_KEY = settings.SUPABASE_KEY or "fake"
+                await measure()
+    print(json.dumps(results, indent=2))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--size-kb", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake server latency per upload")
+    parser.add_argument("--from-file", action="store_true", help="Upload from an open file (streamed) instead of bytes")
+    parser.add_argument("--backends", nargs="+", choices=["supabase", "local"], default=["supabase", "local"])
+    parser.add_argument("--target", choices=["fake", "supabase"], default="fake")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
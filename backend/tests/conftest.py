@@ -0,0 +1,43 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# The app is imported as the top-level `app` package from backend/, as uvicorn runs it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.data_services.local_storage import LocalStorageService
+from app.data_services.memory_db import InMemoryRepository, MemoryStore
+
+
+class EmptyVectorService:
+    """A vector index with nothing in it."""
+
+    async def search_scoped(self, vector, scope, top_k=5, filter_payload=None, payload_fields=None, query_text=None):
+        return []
+
+    async def search_scoped_batch(self, vectors, scopes, top_k=5, filter_payload=None, payload_fields=None, query_texts=None):
+        return [[] for _ in vectors]
+
+
+@pytest.fixture
+def fake_services(tmp_path):
+    """
+    Builds the stand-in for `Services` that pipelines take: an in-memory database, local storage
+    under tmp_path and an empty vector index, plus whatever services a test passes (which also
+    replace those defaults). Returns `(services, store)`.
+    """
+
+    def build(**overrides):
+        store = MemoryStore()
+        services = SimpleNamespace(
+            storage_service=LocalStorageService(str(tmp_path / "storage")),
+            vector_service=EmptyVectorService(),
+            db_service=InMemoryRepository(store),
+        )
+        for name, service in overrides.items():
+            setattr(services, name, service)
+        return services, store
+
+    return build
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import io
+import os
+import zipfile
+
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api import router
+from app.config.services import get_services
+from app.config.settings import settings
+from app.infra.uploads import SpooledImage, spool_upload
+from app.pipelines.bulk_found import BulkImage, ingest_found_images
+
+
+class FlakyImageService:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = 0
+
+    async def process_found_image(self, image):
+        self.calls += 1
+        data = image.read_bytes() if isinstance(image, SpooledImage) else image
+        if data in self.failing:
+            raise RuntimeError("vision API unavailable")
+        return {"embedding": [1.0, 0.0, 0.0], "metadata": {"caption": data.decode()}}
+
+
+def images():
+    return [BulkImage(filename=f"photo{i}.JPG", data=f"image {i}".encode()) for i in range(3)]
+
+
+def test_retried_ingestion_overwrites_stored_images_instead_of_orphaning_them(fake_services):
+    services, _ = fake_services(image_service=FlakyImageService(failing={b"image 1"}))
+
+    first = asyncio.run(ingest_found_images(services, images(), "library"))
+    assert [r.status for r in first] == ["ok", "error", "ok"]
+    assert first[1].stage == "caption"
+
+    services.image_service.failing.clear()
+    second = asyncio.run(ingest_found_images(services, images(), "library"))
+    assert [r.status for r in second] == ["skipped", "ok", "skipped"]
+
+    # One object per image, named after its content hash.
+    expected = {hashlib.sha256(f"image {i}".encode()).hexdigest() + ".jpg" for i in range(3)}
+    assert set(os.listdir(services.storage_service.root)) == expected
+    assert second[1].image_path.endswith(hashlib.sha256(b"image 1").hexdigest() + ".jpg")
+
+
+def test_spooled_images_from_an_async_source_are_closed_after_ingestion(fake_services):
+    services, _ = fake_services(image_service=FlakyImageService())
+    spooled = []
+
+    async def source():
+        for i in range(5):
+            upload = UploadFile(io.BytesIO(f"image {i}".encode()), filename=f"photo{i}.jpg")
+            image = await spool_upload(upload, max_bytes=1024, spool_threshold=0)
+            assert not image.in_memory
+            spooled.append(image)
+            yield BulkImage(filename=image.filename, data=image)
+
+    results = asyncio.run(ingest_found_images(services, source(), "library", chunk_size=2))
+    assert [r.status for r in results] == ["ok"] * 5
+    assert all(image.path is None for image in spooled)
+
+
+def bulk_client(services):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_services] = lambda: services
+    return TestClient(app)
+
+
+def test_bulk_endpoint_ingests_parts_and_zip_members(fake_services):
+    image_service = FlakyImageService()
+    services, _ = fake_services(image_service=image_service)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("zipped.png", b"image z")
+        zf.writestr("notes.txt", b"not an image")
+
+    response = bulk_client(services).post(
+        "/bulk/found_items",
+        files=[
+            ("images", ("a.jpg", b"image a", "image/jpeg")),
+            ("images", ("b.jpg", b"image b", "image/jpeg")),
+            ("archive", ("batch.zip", archive.getvalue(), "application/zip")),
+        ],
+        data={"location_hint": "library"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"] == {"total": 3, "ok": 3, "skipped": 0, "error": 0}
+    assert [item["caption"] for item in body["items"]] == ["image a", "image b", "image z"]
+
+
+def test_bulk_endpoint_rejects_oversized_part(fake_services, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 8)
+    image_service = FlakyImageService()
+    services, _ = fake_services(image_service=image_service)
+
+    response = bulk_client(services).post(
+        "/bulk/found_items",
+        files=[
+            ("images", ("small.jpg", b"image a", "image/jpeg")),
+            ("images", ("large.jpg", b"a much larger image", "image/jpeg")),
+        ],
+    )
+
+    assert response.status_code == 413
+    assert image_service.calls == 0
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from app.pipelines.bulk_lost import import_lost_reports, iter_ndjson_rows, to_lost_report
+from app.pipelines.progress import ImportProgress
+
+
+class FakeTextService:
+    async def embed_texts(self, texts):
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+async def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record)
+
+
+@pytest.mark.parametrize("status, expected", [(None, "open"), ("", "open"), (" resolved ", "resolved"), ("archived", "archived")])
+def test_to_lost_report_accepts_known_statuses(status, expected):
+    assert to_lost_report({"description": "Blue umbrella", "status": status})["status"] == expected
+
+
+def test_to_lost_report_rejects_unknown_status():
+    with pytest.raises(ValueError, match="invalid status 'lost'"):
+        to_lost_report({"description": "Blue umbrella", "status": "lost"})
+
+
+@pytest.mark.parametrize("record, error", [
+    ({"description": "x", "reporter_user_id": "not-a-uuid"}, "invalid reporter_user_id"),
+    ({"description": "x", "lost_at": 12345}, "invalid lost_at"),
+    ({"description": "x", "lost_at": "yesterday"}, "Invalid isoformat"),
+    ({"description": "x", "location_hint": 7}, "invalid location_hint"),
+    ({"description": 42}, "missing description"),
+    ({"description": "x", "status": 3}, "invalid status"),
+])
+def test_to_lost_report_rejects_values_the_copy_would_choke_on(record, error):
+    with pytest.raises(ValueError, match=error):
+        to_lost_report(record)
+
+
+def test_to_lost_report_normalizes_reporter_and_lost_at():
+    report = to_lost_report({
+        "description": "x",
+        "reporter_user_id": "7C9E6679-7425-40DE-944B-E07FC1F90AE7",
+        "lost_at": "2026-10-01T12:00:00+00:00",
+    })
+    assert report["reporter_user_id"] == "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+    assert report["lost_at"].year == 2026
+
+
+def test_import_reports_bad_rows_as_invalid_and_imports_the_rest(fake_services):
+    services, store = fake_services(text_service=FakeTextService())
+    records = [
+        {"description": "Blue umbrella", "status": "open"},
+        {"description": "Red scarf", "status": "closed"},
+        {"description": "Green gloves", "reporter_user_id": "not-a-uuid", "lost_at": 12345},
+        {"description": "Keys on a ring"},
+    ]
+
+    progress = asyncio.run(import_lost_reports(
+        services, iter_ndjson_rows(ndjson_lines(records)), ImportProgress(import_id="test"), match_top_k=0
+    ))
+
+    assert progress.status == "completed"
+    assert (progress.rows_read, progress.rows_imported, progress.rows_failed) == (4, 2, 2)
+    assert [error["line"] for error in progress.errors] == [2, 3]
+    assert "invalid status 'closed'" in progress.errors[0]["error"]
+    assert "invalid reporter_user_id" in progress.errors[1]["error"]
+    assert sorted(r["description_text"] for r in store.lost_reports.values()) == ["Blue umbrella", "Keys on a ring"]
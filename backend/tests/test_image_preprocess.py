@@ -0,0 +1,43 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from app.ml_services.image_preprocess import ImagePreprocessor, sniff_mime_type
+
+pillow_heif = pytest.importorskip("pillow_heif")
+
+
+def heic_bytes(size=(400, 300)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(out, format="HEIF")
+    return out.getvalue()
+
+
+@pytest.fixture
+def preprocessor():
+    preprocessor = ImagePreprocessor(max_edge=512, output_format="jpeg", quality=95, workers=1)
+    yield preprocessor
+    preprocessor.close()
+
+
+def test_heic_is_converted_even_when_the_jpeg_is_larger(preprocessor):
+    data = heic_bytes()
+    assert sniff_mime_type(data) == "image/heic"
+
+    prepared = asyncio.run(preprocessor.preprocess(data))
+
+    # A flat HEIC compresses far better than JPEG, so size alone would have kept the original.
+    assert len(prepared.data) > len(data)
+    assert prepared.mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(prepared.data)) as img:
+        assert img.format == "JPEG" and img.size == (400, 300)
+
+
+def test_undecodable_heic_is_rejected_instead_of_sent_as_is(preprocessor):
+    data = heic_bytes()[:40]
+
+    with pytest.raises(ValueError, match="Cannot decode image/heic"):
+        asyncio.run(preprocessor.preprocess(data))
+    assert preprocessor.failures == 1
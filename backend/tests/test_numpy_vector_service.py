@@ -0,0 +1,119 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.data_services.match_scope import MatchScope, scope_payload
+from app.data_services.numpy_vector_service import NumpyVectorService
+
+DIM = 16
+
+
+def random_vectors(rng, n):
+    return rng.standard_normal((n, DIM)).astype(np.float32).tolist()
+
+
+def test_threaded_search_is_consistent_while_upserts_grow_the_index():
+    rng = np.random.default_rng(0)
+    service = NumpyVectorService(initial_capacity=16)
+    # Past the thread offload threshold, so searches run in worker threads.
+    service._upsert("lost-0", [1.0] + [0.0] * (DIM - 1), {"type": "lost", **scope_payload("library")})
+    for i, vector in enumerate(random_vectors(rng, 60_000)):
+        service._upsert(f"seed-{i}", vector, {"type": "found"})
+
+    async def upsert_while_searching(search):
+        vectors = random_vectors(rng, 20_000)
+        for i in range(0, len(vectors), 500):
+            # New rows regrow the matrix and masks, and each batch adds a new mask.
+            await service.insert_item_vectors([
+                {"id": f"new-{i + j}", "vector": v, "payload": {"type": "lost", "batch": i}}
+                for j, v in enumerate(vectors[i:i + 500])
+            ])
+            await asyncio.sleep(0)
+        return await search
+
+    async def run():
+        query = [1.0] + [0.0] * (DIM - 1)
+        searches = [
+            service.search_similar(query, top_k=5, filter_payload={"type": "lost"}),
+            service.search_scoped(query, MatchScope.around("library", None), top_k=5, filter_payload={"type": "lost"}),
+            service.search_similar_batch([query] * 3, top_k=5),
+        ]
+        return await asyncio.gather(*(upsert_while_searching(asyncio.ensure_future(s)) for s in searches))
+
+    filtered, scoped, batch = asyncio.run(run())
+
+    assert filtered[0]["id"] == "lost-0"
+    assert all(hit["payload"]["type"] == "lost" for hit in filtered)
+    assert scoped[0]["id"] == "lost-0"
+    for hits in batch:
+        assert hits[0]["id"] == "lost-0"
+        assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+    assert len(service) == 80_001
+
+
+def upserts(n, start=0):
+    rng = np.random.default_rng(start)
+    return [
+        {"id": f"item-{start + i}", "vector": v, "payload": {"type": "lost", "batch": (start + i) % 3}}
+        for i, v in enumerate(random_vectors(rng, n))
+    ]
+
+
+def test_acknowledged_upserts_survive_a_crash(tmp_path):
+    path = str(tmp_path / "index")
+    service = NumpyVectorService(path, save_every=1000)
+    asyncio.run(service.insert_item_vectors(upserts(30)))
+    asyncio.run(service.insert_item_vectors(upserts(30, start=30)))
+    # No close(): the process dies after the outbox already deleted these entries.
+    reopened = NumpyVectorService(path)
+
+    assert len(reopened) == 60
+    expected = asyncio.run(service.get_vectors(["item-45"]))
+    assert asyncio.run(reopened.get_vectors(["item-45"])) == expected
+    assert asyncio.run(reopened.search_similar(expected["item-45"], top_k=1))[0]["id"] == "item-45"
+
+
+def test_saved_masks_load_without_rebuilding_from_payloads(tmp_path, monkeypatch):
+    path = str(tmp_path / "index")
+    service = NumpyVectorService(path)
+    asyncio.run(service.insert_item_vectors(upserts(40)))
+    asyncio.run(service.close())
+    assert not (tmp_path / "index.wal.jsonl").exists()
+
+    monkeypatch.setattr(NumpyVectorService, "_index_payload", lambda *args: pytest.fail("masks were rebuilt"))
+    reopened = NumpyVectorService(path)
+    monkeypatch.undo()
+
+    hits = asyncio.run(reopened.search_similar([1.0] * DIM, top_k=100, filter_payload={"batch": 1}))
+    assert sorted(hit["id"] for hit in hits) == sorted(f"item-{i}" for i in range(40) if i % 3 == 1)
+    assert np.array_equal(reopened._masks[("type", "lost")][:40], np.ones(40, dtype=bool))
+
+
+def test_torn_log_tail_is_dropped_and_later_appends_replay(tmp_path):
+    path = str(tmp_path / "index")
+    asyncio.run(NumpyVectorService(path).insert_item_vectors(upserts(5)))
+    with open(f"{path}.wal.jsonl", "a") as f:
+        f.write('{"id": "torn", "vec')
+
+    service = NumpyVectorService(path)
+    assert len(service) == 5
+    asyncio.run(service.insert_item_vectors(upserts(5, start=5)))
+
+    assert len(NumpyVectorService(path)) == 10
+
+
+def test_index_is_saved_and_log_truncated_after_save_every_upserts(tmp_path):
+    path = str(tmp_path / "index")
+    service = NumpyVectorService(path, save_every=50)
+
+    async def write():
+        await service.insert_item_vectors(upserts(30))
+        assert service._saving is None
+        await service.insert_item_vectors(upserts(30, start=30))
+        await service._saving
+
+    asyncio.run(write())
+    assert (tmp_path / "index.vectors.npy").exists()
+    assert not (tmp_path / "index.wal.jsonl").exists()
+    assert len(NumpyVectorService(path)) == 60
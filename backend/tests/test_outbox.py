@@ -0,0 +1,214 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.data_services.base.outbox_interface import is_unavailable
+from app.config.settings import settings
+from app.data_services.memory_db import InMemoryRepository, InMemoryVectorOutbox, MemoryStore
+from app.pipelines.outbox_relay import VectorOutboxRelay
+
+MAX_ATTEMPTS = 3
+
+
+class FlakyIndex:
+    """Vector index stand-in: fails items listed in `bad`, or every call while `down` is set."""
+
+    def __init__(self, down=None, bad=()):
+        self.down = down
+        self.bad = set(bad)
+        self.calls = []
+        self.vectors = {}
+
+    async def insert_item_vectors(self, items):
+        self.calls.append([item["id"] for item in items])
+        if self.down is not None:
+            raise self.down
+        for item in items:
+            if item["id"] in self.bad:
+                raise ValueError(f"wrong vector dimension for {item['id']}")
+        self.vectors.update({item["id"]: item["vector"] for item in items})
+
+
+class UnexpectedResponse(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Unexpected Response: {status_code}")
+        self.status_code = status_code
+
+
+def enqueue(store, *item_ids):
+    async def write():
+        async with InMemoryRepository(store).unit_of_work() as uow:
+            await uow.enqueue_vector_upserts([{"id": item_id, "vector": [1.0, 0.0], "payload": {}} for item_id in item_ids])
+
+    asyncio.run(write())
+
+
+def drain(outbox, index, limit=256):
+    return asyncio.run(outbox.drain(index.insert_item_vectors, limit, 0, MAX_ATTEMPTS, 60))
+
+
+@pytest.mark.parametrize("error, unavailable", [
+    (ConnectionRefusedError("refused"), True),
+    (asyncio.TimeoutError(), True),
+    (httpx.ConnectTimeout("timed out"), True),
+    (UnexpectedResponse(503), True),
+    (UnexpectedResponse(429), True),
+    (UnexpectedResponse(400), False),
+    (ValueError("wrong vector dimension"), False),
+])
+def test_is_unavailable(error, unavailable):
+    assert is_unavailable(error) is unavailable
+
+
+def test_wrapped_transport_error_is_unavailable():
+    class ResponseHandlingException(Exception):
+        def __init__(self, source):
+            self.source = source
+
+    assert is_unavailable(ResponseHandlingException(httpx.ConnectError("refused")))
+
+
+def test_outage_never_charges_or_parks_a_lone_entry():
+    store = MemoryStore()
+    outbox = InMemoryVectorOutbox(store)
+    enqueue(store, "a")
+    index = FlakyIndex(down=ConnectionRefusedError("qdrant refused the connection"))
+
+    for _ in range(MAX_ATTEMPTS * 3):
+        with pytest.raises(ConnectionRefusedError):
+            drain(outbox, index)
+
+    entry = next(iter(store.outbox.values()))
+    assert entry["attempts"] == 0 and entry["failed_at"] is None
+    assert asyncio.run(outbox.parked()) == 0
+
+    index.down = None
+    assert drain(outbox, index) == 1
+    assert not store.outbox and "a" in index.vectors
+
+
+def test_outage_stops_isolating_after_first_failed_retry():
+    store = MemoryStore()
+    outbox = InMemoryVectorOutbox(store)
+    enqueue(store, *(f"item-{i}" for i in range(50)))
+    index = FlakyIndex(down=UnexpectedResponse(503))
+
+    with pytest.raises(UnexpectedResponse):
+        drain(outbox, index)
+
+    assert len(index.calls) == 1
+    assert all(entry["attempts"] == 0 for entry in store.outbox.values())
+
+
+def test_bad_entry_is_isolated_charged_and_parked():
+    store = MemoryStore()
+    outbox = InMemoryVectorOutbox(store)
+    enqueue(store, "good-1", "bad", "good-2")
+    index = FlakyIndex(bad={"bad"})
+
+    assert drain(outbox, index) == 3
+    assert set(index.vectors) == {"good-1", "good-2"}
+    assert [entry["item_id"] for entry in store.outbox.values()] == ["bad"]
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        drain(outbox, index)
+
+    entry = next(iter(store.outbox.values()))
+    assert entry["attempts"] == MAX_ATTEMPTS and entry["failed_at"] is not None
+    assert "wrong vector dimension" in entry["last_error"]
+    assert (asyncio.run(outbox.backlog()), asyncio.run(outbox.parked())) == (0, 1)
+    # Parked entries are left out of later drains.
+    assert drain(outbox, index) == 0
+
+
+def test_claimed_entries_are_leased_while_the_index_is_called():
+    store = MemoryStore()
+    outbox = InMemoryVectorOutbox(store)
+    enqueue(store, "a", "b")
+    concurrent = []
+
+    async def apply(items):
+        concurrent.append(await outbox.drain(FlakyIndex().insert_item_vectors, 256, 0, MAX_ATTEMPTS, 60))
+
+    assert asyncio.run(outbox.drain(apply, 256, 0, MAX_ATTEMPTS, 60)) == 2
+    assert concurrent == [0]
+    assert not store.outbox
+
+
+def test_relay_picks_up_entries_committed_during_a_drain(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_POLL_INTERVAL_SECONDS", 30.0)
+    store = MemoryStore()
+    index = FlakyIndex()
+    relay = VectorOutboxRelay(SimpleNamespace(vector_outbox=InMemoryVectorOutbox(store), vector_service=index))
+    enqueue(store, "first")
+
+    async def commit_during_drain(items):
+        await FlakyIndex.insert_item_vectors(index, items)
+        if items[0]["id"] == "first":
+            await InMemoryRepository(store).enqueue_vector_upserts([{"id": "second", "vector": [1.0, 0.0], "payload": {}}])
+            relay.notify()
+
+    index.insert_item_vectors = commit_during_drain
+
+    async def run():
+        await relay.start()
+        try:
+            for _ in range(100):
+                if "second" in index.vectors:
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+        finally:
+            await relay.stop()
+
+    # Applied within a second, not after the 30s poll interval (or by the flush in stop()).
+    assert asyncio.run(run())
+    assert relay.entries_applied == 2 and relay.failures == 0
+
+
+def relay_over(store, index):
+    return VectorOutboxRelay(SimpleNamespace(vector_outbox=InMemoryVectorOutbox(store), vector_service=index))
+
+
+def test_wait_applied_returns_once_the_submitted_vector_is_searchable():
+    store = MemoryStore()
+    index = FlakyIndex()
+    relay = relay_over(store, index)
+
+    async def submit():
+        await relay.start()
+        try:
+            await InMemoryRepository(store).enqueue_vector_upserts([{"id": "mine", "vector": [1.0, 0.0], "payload": {}}])
+            applied = await relay.wait_applied(["mine"], timeout=5)
+            return applied, "mine" in index.vectors
+        finally:
+            await relay.stop()
+
+    assert asyncio.run(submit()) == (True, True)
+    assert relay.stats()["write_wait_timeouts"] == 0 and relay.stats()["last_apply_ms"] is not None
+
+
+def test_wait_applied_gives_up_after_timeout_while_the_index_is_down():
+    store = MemoryStore()
+    index = FlakyIndex(down=ConnectionRefusedError("qdrant refused the connection"))
+    relay = relay_over(store, index)
+
+    async def submit():
+        await relay.start()
+        try:
+            await InMemoryRepository(store).enqueue_vector_upserts([{"id": "mine", "vector": [1.0, 0.0], "payload": {}}])
+            return await relay.wait_applied(["mine"], timeout=0.2)
+        finally:
+            await relay.stop()
+
+    assert asyncio.run(submit()) is False
+    assert relay.write_wait_timeouts == 1 and relay.stats()["awaiting_writes"] == 0
+    # The entry stays queued, uncharged, for the next drain.
+    assert next(iter(store.outbox.values()))["attempts"] == 0
+
+
+def test_wait_applied_without_a_running_relay_returns_at_once():
+    relay = relay_over(MemoryStore(), FlakyIndex())
+    assert asyncio.run(relay.wait_applied(["mine"])) is False
@@ -0,0 +1,37 @@
+import pytest
+
+from app.infra.openai_client import ModelRateLimiter
+from app.infra.rate_limit import TokenBucket, parse_duration
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m3.5s", 3723.5), ("0.250s", 0.25), ("2.5", 2.5),
+    (None, None), ("", None), ("soon", None),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_sync_caps_level_by_reset_time():
+    bucket = TokenBucket()
+    bucket.sync(limit=600, remaining=None, reset_seconds=30)
+    # 600/min refills 10/s, so a budget that is full again in 30s has about 300 left now.
+    assert bucket.level == pytest.approx(300, abs=1)
+    bucket.sync(limit=600, remaining=100, reset_seconds=1)
+    assert bucket.level == pytest.approx(100, abs=1)
+
+
+def test_throttled_without_budget_headers_drains_buckets():
+    limiter = ModelRateLimiter()
+    limiter.on_success({
+        "x-ratelimit-limit-requests": "600", "x-ratelimit-remaining-requests": "599",
+        "x-ratelimit-limit-tokens": "60000", "x-ratelimit-remaining-tokens": "59000",
+        "x-ratelimit-reset-requests": "100ms", "x-ratelimit-reset-tokens": "1s",
+    }, tokens=1000, token_correction=0)
+    assert limiter.requests.level == pytest.approx(599, abs=1)
+
+    limiter.on_throttled({"retry-after": "1"}, tokens=1000)
+
+    assert limiter.requests.level == pytest.approx(0, abs=1)
+    assert limiter.tokens.level == pytest.approx(0, abs=10)
+    assert limiter.throttled == 1
@@ -0,0 +1,59 @@
+import asyncio
+
+from app.infra.response_cache import ResponseCache
+
+
+def test_request_after_a_write_does_not_join_a_load_started_before_it():
+    cache = ResponseCache(max_size=16, ttl_seconds=None)
+    db = {"status": "open"}
+    first_load_started = asyncio.Event()
+    release_first_load = asyncio.Event()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        snapshot = dict(db)
+        if loads == 1:
+            first_load_started.set()
+            await release_first_load.wait()
+        return snapshot
+
+    def get():
+        return asyncio.create_task(cache.get_or_load("report:1", load, lambda value: ["report:1"]))
+
+    async def run():
+        before = get()
+        await first_load_started.wait()
+        db["status"] = "resolved"
+        cache.invalidate("report:1")
+        after = get()
+        await asyncio.sleep(0.01)
+        release_first_load.set()
+        return await before, await after
+
+    before, after = asyncio.run(run())
+
+    assert loads == 2
+    assert before.body == b'{"status":"open"}'
+    assert after.body == b'{"status":"resolved"}'
+    # The pre-write result is never cached over the post-write one.
+    assert cache.get("report:1") == after
+
+
+def test_concurrent_misses_without_a_write_share_one_load():
+    cache = ResponseCache(max_size=16, ttl_seconds=None)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("item:1", load, lambda value: ["item:1"]) for _ in range(5)))
+
+    entries = asyncio.run(run())
+    assert calls == 1 and len({entry.etag for entry in entries}) == 1
+    assert cache.stats()["loads_shared"] == 4
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.infra.uploads import SpooledImage
+from app.pipelines.found_item import build_found_item_graph
+from app.pipelines.stage_graph import StageFailed, StageGraph
+
+UPLOAD_SECONDS = 0.3
+CAPTION_SECONDS = 0.3
+SEARCH_SECONDS = 0.1
+
+
+class SlowStorage:
+    def __init__(self, events):
+        self.events = events
+
+    async def upload_image(self, body, filename, content_type=None, key=None):
+        self.events.append("upload start")
+        try:
+            await asyncio.sleep(UPLOAD_SECONDS)
+        except asyncio.CancelledError:
+            self.events.append("upload cancelled")
+            raise
+        self.events.append("upload end")
+        return f"file:///{filename}"
+
+
+class SlowImageService:
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+
+    async def process_found_image(self, image):
+        self.events.append("caption start")
+        await asyncio.sleep(CAPTION_SECONDS if self.error is None else 0.05)
+        if self.error is not None:
+            raise self.error
+        self.events.append("caption end")
+        return {"embedding": [1.0, 0.0, 0.0], "metadata": {"caption": "A black leather wallet"}}
+
+
+class SlowVectorService:
+    def __init__(self, events):
+        self.events = events
+
+    async def search_scoped(self, vector, scope, top_k=5, filter_payload=None, payload_fields=None, query_text=None):
+        self.events.append("search start")
+        await asyncio.sleep(SEARCH_SECONDS)
+        self.events.append("search end")
+        return []
+
+
+@pytest.fixture
+def slow_services(fake_services):
+    def build(image_error=None):
+        events = []
+        services, store = fake_services(
+            storage_service=SlowStorage(events),
+            image_service=SlowImageService(events, image_error),
+            vector_service=SlowVectorService(events),
+        )
+        return services, store, events
+
+    return build
+
+
+def wallet_image():
+    return SpooledImage.from_bytes(b"\xff\xd8\xff" + b"\0" * 1024, "wallet.jpg", "image/jpeg")
+
+
+def test_found_item_stages_overlap(slow_services):
+    services, store, events = slow_services()
+    graph = build_found_item_graph(services, wallet_image(), "library")
+
+    results = asyncio.run(graph.run())
+
+    # Upload and captioning both start before either finishes; the search only waits for the embedding.
+    assert events.index("upload start") < events.index("caption end")
+    assert events.index("caption start") < events.index("upload end")
+    assert events.index("caption end") < events.index("search start")
+    assert results["persist"] in store.found_items
+    # Stage timings cover only each stage's own work, not the time spent waiting on dependencies.
+    assert graph.timings["upload"] >= UPLOAD_SECONDS
+    assert graph.timings["caption_embed"] >= CAPTION_SECONDS
+    assert graph.timings["search"] >= SEARCH_SECONDS
+    assert graph.timings["search"] < CAPTION_SECONDS
+
+
+def test_found_item_failure_cancels_upload_and_persists_nothing(slow_services):
+    services, store, events = slow_services(image_error=RuntimeError("vision model down"))
+    graph = build_found_item_graph(services, wallet_image(), "library")
+
+    with pytest.raises(StageFailed) as failure:
+        asyncio.run(graph.run())
+
+    assert failure.value.stage == "caption_embed"
+    assert isinstance(failure.value.error, RuntimeError)
+    # The in-flight upload was cancelled instead of running to completion.
+    assert events == ["upload start", "caption start", "upload cancelled"]
+    assert not store.found_items and not store.outbox
+
+
+def test_failing_stage_cancels_the_others():
+    events = []
+
+    async def slow(_):
+        try:
+            await asyncio.sleep(1.0)
+        except asyncio.CancelledError:
+            events.append("slow cancelled")
+            raise
+
+    async def failing(_):
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def downstream(_):
+        events.append("downstream ran")
+
+    graph = (
+        StageGraph()
+        .add("slow", slow)
+        .add("failing", failing)
+        .add("downstream", downstream, depends_on=["failing"])
+    )
+
+    with pytest.raises(StageFailed) as failure:
+        asyncio.run(graph.run())
+
+    assert failure.value.stage == "failing"
+    assert events == ["slow cancelled"]
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import tracemalloc
+from urllib.parse import unquote, urlparse
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.infra.uploads import CHUNK_SIZE, UploadTooLarge, spool_upload
+from app.pipelines.found_item import run_found_item_pipeline
+
+UPLOAD_BYTES = 16 * 1024 * 1024
+SPOOL_THRESHOLD = 1024 * 1024
+
+
+class StreamingImageService:
+    """Reads the image chunk by chunk, as the preprocessor does for spooled uploads."""
+
+    async def process_found_image(self, image):
+        digest = hashlib.sha256()
+        source = image.open()
+        try:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        finally:
+            source.close()
+        return {"embedding": [1.0, 0.0, 0.0], "metadata": {"caption": digest.hexdigest()}}
+
+
+def large_upload(size: int) -> UploadFile:
+    """An UploadFile over a temp file on disk, so the source itself is not held in memory."""
+    source = tempfile.TemporaryFile()
+    block = os.urandom(CHUNK_SIZE)
+    for _ in range(size // CHUNK_SIZE):
+        source.write(block)
+    source.seek(0)
+    return UploadFile(source, size=size, filename="found.jpg", headers=Headers({"content-type": "image/jpeg"}))
+
+
+def test_large_upload_peak_memory_stays_near_spool_threshold(fake_services):
+    upload = large_upload(UPLOAD_BYTES)
+    services, store = fake_services(image_service=StreamingImageService())
+
+    async def submit():
+        image = await spool_upload(upload, max_bytes=2 * UPLOAD_BYTES, spool_threshold=SPOOL_THRESHOLD)
+        try:
+            return image, await run_found_item_pipeline(services, image, "library")
+        finally:
+            image.close()
+
+    # Warm up the lazy imports behind UploadFile.read (anyio's thread pool) so only the upload is traced.
+    warm_up = large_upload(CHUNK_SIZE)
+    asyncio.run(spool_upload(warm_up, max_bytes=CHUNK_SIZE, spool_threshold=CHUNK_SIZE)).close()
+    warm_up.file.close()
+
+    tracemalloc.start()
+    try:
+        image, result = asyncio.run(submit())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        upload.file.close()
+
+    assert image.size == UPLOAD_BYTES
+    # Spooled once past the threshold; nothing ever held the whole upload.
+    assert peak < SPOOL_THRESHOLD + 2 * 1024 * 1024
+    assert peak < UPLOAD_BYTES // 4
+
+    stored = store.found_items[result["found_item_id"]]
+    stored_path = unquote(urlparse(stored["image_path"]).path)
+    assert os.path.getsize(stored_path) == UPLOAD_BYTES
+    assert stored["image_sha256"] == image.sha256
+
+
+def test_spool_upload_rejects_oversized_stream_without_size():
+    upload = large_upload(4 * CHUNK_SIZE)
+    upload.size = None
+    try:
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(spool_upload(upload, max_bytes=2 * CHUNK_SIZE, spool_threshold=CHUNK_SIZE))
+    finally:
+        upload.file.close()